@@ -0,0 +1,302 @@
+"""Benchmarks for run.py against synthetic Facebook export zips.
+
+Generates realistic exports (live_videos.json entries with label_values,
+titles with Facebook's mojibake, same-day duplicates, zero-filled or random
+.mp4 members), times the inbox, metadata, dedup, registry and title-map
+paths, and writes the results as JSON so runs on different commits can be
+compared:
+
+  python bench_run.py --output before.json
+  git checkout <other commit>
+  python bench_run.py --output after.json
+
+Nothing touches the real inbox, registry or YouTube: every run works in a
+temporary directory (or --workdir) and process_inbox() runs as a dry run.
+"""
+import os
+import sys
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+import zipfile
+from contextlib import closing
+from unittest.mock import patch
+
+# Settings the benchmarked code reads; run metrics would only add noise
+os.environ.setdefault('DEFAULT_TITLE', 'En VIVO - Sociedad de Astronomía del Caribe')
+os.environ['METRICS_DIR'] = ''
+
+import run
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+METADATA_MEMBER = "this_profile's_activity_across_facebook/live_videos/live_videos.json"
+VIDEOS_PREFIX = 'your_facebook_activity/live_videos/'
+
+TITLE_WORDS = [
+    'Observación', 'Eclipse', 'lunar', 'Júpiter', 'Saturno', 'Vía Láctea', 'astronomía',
+    'telescopio', 'Conferencia', 'Noche de estrellas', 'Perseidas', 'Marte', 'cometa',
+    'nebulosa', 'Caribe', 'charla', 'planetas', 'Sol', '¿Qué vemos hoy?', 'año', 'niños',
+]
+
+
+def mojibake(text):
+    """Return text the way Facebook exports store it (UTF-8 read as latin-1)."""
+    return text.encode('utf-8').decode('latin-1')
+
+
+def make_entries(count, first_fbid=10000000000000, duplicate_ratio=0.05, untitled_ratio=0.03, seed=0):
+    """Build `count` live_videos.json entries, oldest first.
+
+    Returns (entries, filenames): filenames[i] is entry i's video filename.
+    About duplicate_ratio of the entries repeat the previous entry's title
+    and day with a new fbid, like re-published streams in real exports.
+    """
+    rng = random.Random(seed)
+    entries = []
+    filenames = []
+    timestamp = 1500000000
+    for n in range(count):
+        fbid = first_fbid + n * 7919
+        if entries and rng.random() < duplicate_ratio:
+            previous = entries[-1]
+            title_values = [lv for lv in previous['label_values'] if lv.get('label') == 'Title']
+            stamp = previous['timestamp'] + rng.randint(60, 3600)
+        else:
+            timestamp += rng.randint(3600, 3 * 86400)
+            stamp = timestamp
+            title = ' '.join(rng.sample(TITLE_WORDS, rng.randint(3, 7)))
+            title_values = [] if rng.random() < untitled_ratio else [{'label': 'Title', 'value': mojibake(title)}]
+        filename = f'{n}_{fbid}.mp4'
+        entries.append({
+            'timestamp': stamp,
+            'label_values': title_values + [
+                {'label': 'Video', 'media': [{'uri': VIDEOS_PREFIX + filename, 'creation_timestamp': stamp}]},
+                {'label': 'Duration', 'value': str(rng.randint(600, 7200))},
+            ],
+        })
+        filenames.append(filename)
+    return entries, filenames
+
+
+def write_video(zf, filename, size, fill, rng, chunk_size=1024 * 1024):
+    """Stream one stored .mp4 member of `size` bytes (zero or random fill)."""
+    zero = bytes(min(chunk_size, size))
+    with zf.open(VIDEOS_PREFIX + filename, 'w', force_zip64=size >= 2 ** 31) as member:
+        remaining = size
+        while remaining:
+            step = min(chunk_size, remaining)
+            member.write(rng.randbytes(step) if fill == 'random' else zero[:step])
+            remaining -= step
+
+
+def generate_export(zip_path, entries, filenames, videos, video_bytes, fill='zero', seed=0):
+    """Write a Facebook export zip holding `entries` and the first `videos` members.
+
+    Members are stored uncompressed like real exports; duplicates get
+    slightly different sizes so largest-file selection has work to do.
+    """
+    rng = random.Random(seed)
+    with zipfile.ZipFile(zip_path, 'w', compression=zipfile.ZIP_STORED) as zf:
+        with zf.open(METADATA_MEMBER, 'w') as member:
+            member.write(b'[')
+            for n, entry in enumerate(entries):
+                if n:
+                    member.write(b',\n')
+                member.write(json.dumps(entry).encode('utf-8'))
+            member.write(b']')
+        for filename in filenames[:videos]:
+            write_video(zf, filename, video_bytes + rng.randint(0, 4096), fill, rng)
+    return zip_path
+
+
+def time_call(function, repeat, setup=None):
+    """Run function(*setup()) `repeat` times; return timings in seconds."""
+    runs = []
+    result = None
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        started = time.perf_counter()
+        result = function(*args)
+        runs.append(time.perf_counter() - started)
+    return runs, result
+
+
+def summarize(runs, items=None):
+    best = min(runs)
+    return {
+        'best_s': round(best, 6),
+        'median_s': round(statistics.median(runs), 6),
+        'runs_s': [round(seconds, 6) for seconds in runs],
+        'items': items,
+        'items_per_s': round(items / best, 1) if items and best else None,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPT_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(workdir, entries=5000, videos=200, video_bytes=64 * 1024, zips=2, fbids=10000,
+                   repeat=3, fill='zero', seed=0, only=None):
+    """Generate exports under workdir, run the selected benchmarks and return the report dict."""
+    inbox = os.path.join(workdir, 'inbox')
+    os.makedirs(inbox, exist_ok=True)
+    results = {}
+
+    def selected(name):
+        return not only or any(name.startswith(prefix) for prefix in only)
+
+    # Each zip carries its own slice of fbids, like successive exports
+    started = time.perf_counter()
+    all_entries = []
+    zip_paths = []
+    per_zip = max(entries // zips, 1)
+    member_sizes = {}
+    for z in range(zips):
+        zip_entries, filenames = make_entries(per_zip, first_fbid=10000000000000 + z * 10 ** 9, seed=seed + z)
+        zip_path = os.path.join(inbox, f'facebook-export-{z:03d}.zip')
+        zip_paths.append(generate_export(zip_path, zip_entries, filenames, videos // zips, video_bytes, fill, seed + z))
+        all_entries.extend(zip_entries)
+        with zipfile.ZipFile(zip_path) as zf:
+            member_sizes.update((info.filename.rsplit('/', 1)[-1], info.file_size) for info in zf.infolist())
+    generation_seconds = time.perf_counter() - started
+
+    counter = iter(range(10 ** 9))
+
+    def fresh_path(name):
+        path = os.path.join(workdir, f'{next(counter)}')
+        os.makedirs(path)
+        return os.path.join(path, name)
+
+    quiet = contextlib.redirect_stdout(io.StringIO())
+    with quiet, patch.multiple(run, INBOX_PATH=inbox, INBOX_INDEX_PATH=fresh_path('inbox_index.sqlite3'),
+                               REGISTRY_PATH=fresh_path('registry.json')):
+        if selected('scan_inbox'):
+            runs, pending = time_call(lambda: run.scan_inbox(inbox, set()), repeat)
+            results['scan_inbox'] = summarize(runs, len(pending))
+
+        if selected('parse_metadata'):
+            runs, _ = time_call(lambda: [run.scan_zip_metadata(path) for path in zip_paths], repeat)
+            results['parse_metadata'] = summarize(runs, len(all_entries))
+
+        if selected('select_largest'):
+            runs, _ = time_call(
+                lambda: run.select_largest_video_per_signature(all_entries, member_sizes=member_sizes), repeat
+            )
+            results['select_largest_video_per_signature'] = summarize(runs, len(all_entries))
+
+        if selected('process_inbox'):
+            def cold():
+                run.INBOX_INDEX_PATH = fresh_path('inbox_index.sqlite3')
+                run.REGISTRY_PATH = fresh_path('registry.json')
+                return ()
+
+            runs, _ = time_call(lambda: run.process_inbox(dry_run=True, force=True), repeat, setup=cold)
+            results['process_inbox_dry_run_cold'] = summarize(runs, len(all_entries))
+            runs, _ = time_call(lambda: run.process_inbox(dry_run=True, force=True), repeat)
+            results['process_inbox_dry_run_warm'] = summarize(runs, len(all_entries))
+
+        if selected('registry'):
+            fbid_list = [str(10000000000000 + n) for n in range(fbids)]
+            for backend in ('sqlite', 'json'):
+                def save(path):
+                    with closing(run.open_registry(path, backend=backend)) as registry:
+                        registry.add_fbids(fbid_list)
+                        registry.compact()
+
+                runs, _ = time_call(save, repeat, setup=lambda: (fresh_path('registry.json'),))
+                results[f'registry_save_{backend}'] = summarize(runs, fbids)
+
+                saved = fresh_path('registry.json')
+                save(saved)
+
+                def load():
+                    with closing(run.open_registry(saved, backend=backend)) as registry:
+                        return registry.uploaded_fbids()
+
+                runs, loaded = time_call(load, repeat)
+                results[f'registry_load_{backend}'] = summarize(runs, len(loaded))
+
+        if selected('build_title_to_fbid_map'):
+            def cold_index():
+                run.INBOX_INDEX_PATH = fresh_path('inbox_index.sqlite3')
+                return ()
+
+            runs, titles = time_call(run.build_title_to_fbid_map, repeat, setup=cold_index)
+            results['build_title_to_fbid_map_cold'] = summarize(runs, len(titles))
+            runs, titles = time_call(run.build_title_to_fbid_map, repeat)
+            results['build_title_to_fbid_map_warm'] = summarize(runs, len(titles))
+
+    return {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'params': {
+                'entries': entries, 'videos': videos, 'video_bytes': video_bytes, 'zips': zips,
+                'fbids': fbids, 'repeat': repeat, 'fill': fill, 'seed': seed,
+            },
+            'generation_s': round(generation_seconds, 6),
+            'export_bytes': sum(os.path.getsize(path) for path in zip_paths),
+        },
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark run.py against synthetic Facebook exports.')
+    parser.add_argument('--entries', type=int, default=5000, help='live_videos.json entries in total (default: 5000)')
+    parser.add_argument('--videos', type=int, default=200, help='.mp4 members in total (default: 200)')
+    parser.add_argument('--video-bytes', type=int, default=64 * 1024, help='Approximate size per video (default: 64 KiB)')
+    parser.add_argument('--zips', type=int, default=2, help='Export zips to split entries across (default: 2)')
+    parser.add_argument('--fbids', type=int, default=10000, help='Registry size for load/save (default: 10000)')
+    parser.add_argument('--fill', choices=('zero', 'random'), default='zero', help='Video content (default: zero)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per benchmark (default: 3)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for generated data')
+    parser.add_argument('--only', nargs='+', metavar='NAME', help='Run only benchmarks whose names start with NAME')
+    parser.add_argument('--workdir', help='Keep generated data here instead of a temporary directory')
+    parser.add_argument('--output', '-o', help='Write the JSON report here (default: stdout)')
+    args = parser.parse_args()
+    if min(args.entries, args.zips, args.repeat, args.fbids) < 1 or args.videos < 0:
+        parser.error('sizes and --repeat must be positive')
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='fb-yt-bench-')
+    try:
+        report = run_benchmarks(
+            workdir, entries=args.entries, videos=args.videos, video_bytes=args.video_bytes,
+            zips=args.zips, fbids=args.fbids, repeat=args.repeat, fill=args.fill, seed=args.seed,
+            only=args.only,
+        )
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    for name, result in report['results'].items():
+        print(f"{name:<36} best {result['best_s'] * 1000:10.2f} ms  median {result['median_s'] * 1000:10.2f} ms",
+              file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
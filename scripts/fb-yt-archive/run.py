@@ -4,79 +4,235 @@
 import tempfile
 import datetime
 import zipfile
+import io
+import mmap
+import mimetypes
+import shutil
+import struct
+import bisect
+import codecs
+import hashlib
+import importlib
 from contextlib import contextmanager
-import google_auth_oauthlib
-from googleapiclient import discovery
-import googleapiclient.errors
-import googleapiclient.http
 import json
-from dotenv import load_dotenv
 import pickle
-from google.auth.transport.requests import Request
 import socket
+import sqlite3
 import re
 import time
+import threading
+import queue
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import closing, ExitStack
 
-# Optional colored output (graceful degradation if colorama not installed)
-try:
-    from colorama import Fore, Style, just_fix_windows_console
-    just_fix_windows_console()
-    COLORS_AVAILABLE = True
-except ImportError:
-    COLORS_AVAILABLE = False
-    class Fore:
-        GREEN = RED = YELLOW = CYAN = MAGENTA = ''
-    class Style:
-        RESET_ALL = ''
-
-# Force IPv4 for all socket connections (FIXED VERSION)
+# Google client libraries are imported where they are first needed
+# (authentication, client construction, uploads), so --help, --dry-run and
+# the inbox index never pay for loading them.
+
+# Get script directory for relative paths (CONF-02: registry stored in script directory)
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def env_flag(value):
+    return value == '1'
+
+
+def env_list(value):
+    return value.split(',')
+
+
+def parse_time_of_day(value):
+    """Parse 'HH:MM' into minutes after midnight ('24:00' is end of day)."""
+    hours, _, minutes = value.strip().partition(':')
+    total = int(hours) * 60 + int(minutes or 0)
+    if not 0 <= total <= 24 * 60:
+        raise ValueError(f"Invalid time of day: {value!r}")
+    return total
+
+
+def parse_bandwidth_schedule(value):
+    """Parse 'HH:MM-HH:MM=MBITS,...' into (start, end, mbit/s) windows.
+
+    Times are minutes after midnight; a window may wrap past midnight.
+    A rate of 0 or 'unlimited' means full speed during that window.
+    """
+    windows = []
+    for item in value.split(','):
+        if not item.strip():
+            continue
+        span, _, rate = item.partition('=')
+        start, _, end = span.partition('-')
+        if not rate or not end:
+            raise ValueError(f"Invalid bandwidth window {item.strip()!r} (expected HH:MM-HH:MM=MBITS)")
+        rate = rate.strip().lower()
+        mbits = None if rate == 'unlimited' else float(rate)
+        windows.append((parse_time_of_day(start), parse_time_of_day(end), mbits or None))
+    return windows
+
+
+# Setting name -> (environment variable, default, parser). A default of None
+# means the variable is required, but only once the setting is actually read.
+CONFIG_SETTINGS = {
+    'scopes': ('SCOPES', None, json.loads),
+    'token_file': ('TOKEN_FILE', None, str),
+    'default_title': ('DEFAULT_TITLE', None, str),
+    'client_secrets_file': ('CLIENT_SECRETS_FILE', None, str),
+    'facebook_data_dir': ('FACEBOOK_DATA_DIR', None, str),
+    'json_file_name': ('JSON_FILE', None, str),
+    'youtube_category_id': ('YOUTUBE_CATEGORY_ID', '22', str),
+    'youtube_api_version': ('YOUTUBE_API_VERSION', 'v3', str),
+    'youtube_privacy_status': ('YOUTUBE_PRIVACY_STATUS', 'public', str),
+    'upload_chunk_size': ('UPLOAD_CHUNK_SIZE', '-1', int),
+    'upload_chunk_adaptive': ('UPLOAD_CHUNK_ADAPTIVE', '1', env_flag),
+    'upload_chunk_min': ('UPLOAD_CHUNK_MIN', str(1024 * 1024), int),
+    'upload_chunk_max': ('UPLOAD_CHUNK_MAX', str(128 * 1024 * 1024), int),
+    'upload_chunk_target_seconds': ('UPLOAD_CHUNK_TARGET_SECONDS', '8', float),
+    'max_videos_per_run': ('MAX_VIDEOS_PER_RUN', '6', int),
+    'video_file_extensions': ('VIDEO_FILE_EXTENSIONS', '.mp4', env_list),
+    'enable_oauth_insecure_transport': ('OAUTH_INSECURE_TRANSPORT', '1', str),
+    'videos_subpath_parts': ('VIDEOS_SUBPATH', 'your_facebook_activity,live_videos', env_list),
+    'registry_filename': ('REGISTRY_FILENAME', None, str),
+    'inbox_dir': ('INBOX_DIR', 'inbox', str),
+    'upload_workers': ('UPLOAD_WORKERS', '1', int),
+    'upload_prefetch': ('UPLOAD_PREFETCH', '2', int),
+    'registry_backend': ('REGISTRY_BACKEND', 'sqlite', str),
+    'registry_journal_max_entries': ('REGISTRY_JOURNAL_MAX_ENTRIES', '500', int),
+    'zip_spool_max_bytes': ('ZIP_SPOOL_MAX_BYTES', str(64 * 1024 * 1024), int),
+    'content_dedup': ('CONTENT_DEDUP', '1', env_flag),
+    'content_hash_chunk_size': ('CONTENT_HASH_CHUNK_SIZE', str(16 * 1024 * 1024), int),
+    'json_stream_chunk_size': ('JSON_STREAM_CHUNK_SIZE', str(1024 * 1024), int),
+    'http_pool_size': ('HTTP_POOL_SIZE', '4', int),
+    'discovery_mode': ('DISCOVERY_MODE', 'cache', str),
+    'discovery_cache_ttl_hours': ('DISCOVERY_CACHE_TTL_HOURS', '24', float),
+    'token_refresh_margin': ('TOKEN_REFRESH_MARGIN', '300', int),
+    'upload_bandwidth_limit': ('UPLOAD_BANDWIDTH_LIMIT', '0', float),
+    'upload_bandwidth_schedule': ('UPLOAD_BANDWIDTH_SCHEDULE', '', parse_bandwidth_schedule),
+    'watch_poll_seconds': ('WATCH_POLL_SECONDS', '2', float),
+    'watch_settle_seconds': ('WATCH_SETTLE_SECONDS', '5', float),
+    'watch_retry_seconds': ('WATCH_RETRY_SECONDS', '3600', float),
+    'metrics_dir': ('METRICS_DIR', 'metrics', str),
+    'profile_dir': ('PROFILE_DIR', 'profiles', str),
+}
+
+
+class Config:
+    """Script settings, read from the environment (and .env) on first use.
+
+    The .env file is loaded when the first setting is read, and each
+    setting is parsed once when it is first accessed, so importing the
+    script never fails on (or pays for) settings a run does not use.
+    """
+
+    def __init__(self, environ=None):
+        self._environ = environ
+        self._lock = threading.Lock()
+
+    def _env(self):
+        with self._lock:
+            if self._environ is None:
+                from dotenv import load_dotenv
+                load_dotenv()
+                self._environ = os.environ
+        return self._environ
+
+    def __getattr__(self, name):
+        if name not in CONFIG_SETTINGS:
+            raise AttributeError(name)
+        variable, default, parse = CONFIG_SETTINGS[name]
+        raw = self._env().get(variable, default)
+        if raw is None:
+            raise RuntimeError(f"{variable} is not set (see .env.template)")
+        value = parse(raw)
+        self.__dict__[name] = value
+        return value
+
+    @property
+    def json_file(self):
+        return os.path.join(self.facebook_data_dir, self.json_file_name)
+
+    @property
+    def videos_subpath(self):
+        return tuple(self.videos_subpath_parts)
+
+    @property
+    def inbox_path(self):
+        return os.path.join(SCRIPT_DIR, self.inbox_dir)
+
+
+config = Config()
+
+# Lazily imported modules still reachable as run.<name> (e.g. for patching)
+LAZY_MODULES = {
+    'discovery': ('googleapiclient.discovery', 'googleapiclient.discovery'),
+    'googleapiclient': ('googleapiclient', 'googleapiclient.errors', 'googleapiclient.http'),
+    'google_auth_oauthlib': ('google_auth_oauthlib', 'google_auth_oauthlib.flow'),
+}
+
+
+def __getattr__(name):
+    """Module attributes resolved on first use: lazy modules and settings."""
+    if name in LAZY_MODULES:
+        target, *submodules = LAZY_MODULES[name]
+        for module in submodules:
+            importlib.import_module(module)
+        return importlib.import_module(target)
+    if name in CONFIG_SETTINGS or name == 'json_file':
+        return getattr(config, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Set to a path to override INBOX_DIR (tests, embedding)
+INBOX_PATH = None
+REGISTRY_PATH = os.path.join(SCRIPT_DIR, 'registry.json')
+# Per-zip metadata index cache, kept next to the registry
+INBOX_INDEX_PATH = os.path.join(SCRIPT_DIR, 'inbox_index.sqlite3')
+
+
+def get_inbox_path():
+    """Return the inbox directory (INBOX_PATH override, else INBOX_DIR)."""
+    return INBOX_PATH or config.inbox_path
+
+
+# Force IPv4 for all socket connections (applied before the first API call)
 orig_getaddrinfo = socket.getaddrinfo
 def ipv4_getaddrinfo(host, port, family=0, socktype=0, proto=0, flags=0):
     return orig_getaddrinfo(host, port, socket.AF_INET, socktype, proto, flags)
-socket.getaddrinfo = ipv4_getaddrinfo
 
-# load environment variables
-load_dotenv()
 
-# Get script directory for relative paths (CONF-02: registry stored in script directory)
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+def force_ipv4():
+    socket.getaddrinfo = ipv4_getaddrinfo
+
+
+# Optional colored output (graceful degradation if colorama not installed),
+# imported with the first status line
+_status_colors = None
+
+
+def get_status_colors():
+    """Return {status: (color, reset)}; empty when colorama is missing."""
+    global _status_colors
+    if _status_colors is None:
+        try:
+            from colorama import Fore, Style, just_fix_windows_console
+        except ImportError:
+            _status_colors = {}
+        else:
+            just_fix_windows_console()
+            _status_colors = {
+                status: (color, Style.RESET_ALL) for status, color in (
+                    ('success', Fore.GREEN),
+                    ('error', Fore.RED),
+                    ('warning', Fore.YELLOW),
+                    ('info', Fore.CYAN),
+                    ('skip', Fore.MAGENTA),
+                )
+            }
+    return _status_colors
 
-scopes = json.loads(os.getenv('SCOPES'))
-token_file = os.getenv('TOKEN_FILE')
-default_title = os.getenv('DEFAULT_TITLE')
-client_secrets_file = os.getenv('CLIENT_SECRETS_FILE')
-facebook_data_dir = os.getenv('FACEBOOK_DATA_DIR')
-json_file_name = os.getenv('JSON_FILE')
-json_file = os.path.join(facebook_data_dir, json_file_name)
-youtube_category_id = os.getenv('YOUTUBE_CATEGORY_ID', '22')
-youtube_api_version = os.getenv('YOUTUBE_API_VERSION', 'v3')
-youtube_privacy_status = os.getenv('YOUTUBE_PRIVACY_STATUS', 'public')
-upload_chunk_size = int(os.getenv('UPLOAD_CHUNK_SIZE', '-1'))
-max_videos_per_run = int(os.getenv('MAX_VIDEOS_PER_RUN', '6'))
-video_file_extensions = os.getenv('VIDEO_FILE_EXTENSIONS', '.mp4').split(',')
-enable_oauth_insecure_transport = os.getenv('OAUTH_INSECURE_TRANSPORT', '1')
-videos_subpath_parts = os.getenv('VIDEOS_SUBPATH', 'your_facebook_activity,live_videos').split(',')
-registry_filename = os.getenv('REGISTRY_FILENAME')
-inbox_dir = os.getenv('INBOX_DIR', 'inbox')
-
-VIDEOS_SUBPATH = tuple(videos_subpath_parts)
-REGISTRY_FILENAME = registry_filename
-
-# Resolve inbox and registry paths relative to script directory (CONF-02)
-INBOX_PATH = os.path.join(SCRIPT_DIR, inbox_dir)
-REGISTRY_PATH = os.path.join(SCRIPT_DIR, 'registry.json')
 
 def print_status(message, status='info'):
     """Print colored status message."""
-    colors = {
-        'success': Fore.GREEN,
-        'error': Fore.RED,
-        'warning': Fore.YELLOW,
-        'info': Fore.CYAN,
-        'skip': Fore.MAGENTA,
-    }
-    color = colors.get(status, '')
-    reset = Style.RESET_ALL if color else ''
+    color, reset = get_status_colors().get(status, ('', ''))
     print(f"{color}{message}{reset}")
 
 
@@ -178,12 +334,274 @@ def print_summary(
 
 # Helper function
 def get_videos_directory(base_dir):
-    return os.path.join(base_dir, *VIDEOS_SUBPATH)
+    return os.path.join(base_dir, *config.videos_subpath)
 
-# Helper function
-def read_json_file(file_path):
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+
+# ============================================================================
+# RUN METRICS - Per-phase timings and counters (JSON lines + Prometheus)
+# ============================================================================
+
+METRICS_PREFIX = 'fb_yt_archive'
+
+
+class RunMetrics:
+    """Timings and counters recorded during one run.
+
+    observe() adds a timing to its phase's count/sum/max, widens the phase's
+    wall-clock span and, unless log=False (per-chunk timings), keeps it as
+    an event for the run log. Timings are observed as they end, on `clock`.
+    A disabled instance ignores everything, so instrumented code does not
+    care whether a run is being measured.
+    """
+
+    def __init__(self, kind, enabled=True, clock=time.perf_counter):
+        self.kind = kind
+        self.enabled = enabled
+        self.clock = clock
+        self.run_id = f"{kind}-{datetime.datetime.now():%Y%m%dT%H%M%S}-{os.getpid()}"
+        self.started_at = time.time()
+        self.started = clock()
+        self.lock = threading.Lock()
+        self.events = []
+        self.phases = {}  # phase -> [count, total seconds, max seconds]
+        self.spans = {}  # phase -> [first start, last end] on clock
+        self.counters = {}
+
+    def observe(self, phase, seconds, log=True, **fields):
+        if not self.enabled:
+            return
+        ended = self.clock()
+        with self.lock:
+            stats = self.phases.setdefault(phase, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+            span = self.spans.setdefault(phase, [ended - seconds, ended])
+            span[0] = min(span[0], ended - seconds)
+            span[1] = max(span[1], ended)
+            if log:
+                self.events.append({'phase': phase, 'ts': round(time.time(), 3), 'seconds': round(seconds, 6), **fields})
+
+    def count(self, name, amount=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def timer(self, phase, log=True, **fields):
+        """Time the block as `phase`; the yielded dict adds fields to the event."""
+        started = self.clock()
+        try:
+            yield fields
+        finally:
+            self.observe(phase, self.clock() - started, log, **fields)
+
+    def summary(self):
+        """Return the closing 'run' event with durations and counters."""
+        with self.lock:
+            phases = {
+                phase: {'count': count, 'seconds': round(total, 6), 'max_seconds': round(peak, 6)}
+                for phase, (count, total, peak) in sorted(self.phases.items())
+            }
+            counters = dict(sorted(self.counters.items()))
+            first_start, last_end = self.spans.get('upload', (0.0, 0.0))
+        # Uploads overlap across workers, so throughput uses the wall time
+        # from the first upload start to the last upload end, not their sum
+        upload_wall_seconds = last_end - first_start
+        uploaded_bytes = counters.get('uploaded_bytes', 0)
+        return {
+            'phase': 'run',
+            'ts': round(time.time(), 3),
+            'seconds': round(self.clock() - self.started, 6),
+            'phases': phases,
+            'counters': counters,
+            'upload_wall_seconds': round(upload_wall_seconds, 6),
+            'upload_mb_per_s': round(uploaded_bytes / upload_wall_seconds / 1e6, 3) if upload_wall_seconds else None,
+        }
+
+    def log_lines(self):
+        """Return the run's events (summary last) as JSON lines."""
+        header = {'run_id': self.run_id, 'kind': self.kind}
+        with self.lock:
+            events = list(self.events)
+        events.append(self.summary())
+        return ''.join(json.dumps({**header, **event}, ensure_ascii=False) + '\n' for event in events)
+
+    def prometheus_text(self):
+        """Return the run in Prometheus text exposition format (all gauges)."""
+        summary = self.summary()
+        kind = f'kind="{self.kind}"'
+        lines = []
+
+        def gauge(name, help_text, samples):
+            lines.append(f"# HELP {METRICS_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRICS_PREFIX}_{name} gauge")
+            for labels, value in samples:
+                lines.append(f"{METRICS_PREFIX}_{name}{{{labels}}} {value}")
+
+        gauge('last_run_timestamp_seconds', 'Unix time the last run started.', [(kind, round(self.started_at, 3))])
+        gauge('run_duration_seconds', 'Wall time of the last run.', [(kind, summary['seconds'])])
+        phases = summary['phases'].items()
+        gauge('phase_count', 'Timed operations per phase in the last run.',
+              [(f'{kind},phase="{phase}"', stats['count']) for phase, stats in phases])
+        gauge('phase_seconds_sum', 'Seconds spent per phase in the last run.',
+              [(f'{kind},phase="{phase}"', stats['seconds']) for phase, stats in phases])
+        gauge('phase_seconds_max', 'Slowest single operation per phase in the last run.',
+              [(f'{kind},phase="{phase}"', stats['max_seconds']) for phase, stats in phases])
+        for name, value in summary['counters'].items():
+            gauge(name, f'{name.replace("_", " ").capitalize()} in the last run.', [(kind, value)])
+        if summary['upload_mb_per_s'] is not None:
+            gauge('upload_mb_per_s', 'Uploaded MB per second of wall time from the first upload start to the '
+                  'last upload end in the last run.', [(kind, summary['upload_mb_per_s'])])
+        return '\n'.join(lines) + '\n'
+
+
+_idle_metrics = RunMetrics('idle', enabled=False)
+_active_metrics = None
+
+
+def current_metrics():
+    """Return the metrics of the run in progress (a disabled no-op otherwise)."""
+    return _active_metrics or _idle_metrics
+
+
+def write_run_metrics(metrics, metrics_dir):
+    """Append the run to run_log.jsonl and replace its Prometheus textfile."""
+    os.makedirs(metrics_dir, exist_ok=True)
+    with open(os.path.join(metrics_dir, 'run_log.jsonl'), 'a', encoding='utf-8') as f:
+        f.write(metrics.log_lines())
+    # The textfile collector may read at any moment; replace the file atomically
+    write_file_atomic(os.path.join(metrics_dir, f'{METRICS_PREFIX}_{metrics.kind}.prom'), metrics.prometheus_text())
+
+
+@contextmanager
+def collect_run_metrics(kind):
+    """Record metrics for the enclosed run and write them under METRICS_DIR.
+
+    Nothing is written when METRICS_DIR is empty. Runs nested inside an
+    already measured run (e.g. repeated --watch cycles) each get their own.
+    """
+    global _active_metrics
+    metrics_dir = config.metrics_dir
+    metrics = RunMetrics(kind, enabled=bool(metrics_dir))
+    previous, _active_metrics = _active_metrics, metrics
+    try:
+        yield metrics
+    finally:
+        _active_metrics = previous
+        if metrics.enabled:
+            try:
+                write_run_metrics(metrics, os.path.join(SCRIPT_DIR, metrics_dir))
+            except OSError as e:
+                print_status(f"Could not write run metrics: {str(e)[:60]}", 'warning')
+
+
+# ============================================================================
+# STREAMING JSON - Read large live_videos.json arrays one entry at a time
+# ============================================================================
+
+JSON_WHITESPACE = ' \t\n\r\ufeff'  # byte order mark counts as whitespace
+_json_decoder = json.JSONDecoder()
+_json_non_whitespace = re.compile(f'[^{re.escape(JSON_WHITESPACE)}]')
+_json_number_chars = re.compile(r'[-+0-9.eE]*')
+
+
+class JsonStreamBuffer:
+    """Decoded text window over a binary UTF-8 stream.
+
+    Text is decoded incrementally in chunks. Decoding walks an integer
+    position through the window instead of re-slicing it per element, and
+    consumed text is only dropped when the next chunk is appended, so memory
+    stays around one chunk plus the value being decoded. `offset` is the
+    byte position of `pos` in the stream.
+    """
+
+    def __init__(self, stream, chunk_size=None, offset=0):
+        self.stream = stream
+        self.chunk_size = chunk_size or config.json_stream_chunk_size
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.text = ''
+        self.pos = 0
+        self.offset = offset
+        self.eof = False
+
+    def fill(self):
+        """Compact the window and append the next chunk; reads grow with the
+        pending text so a large value is decoded in a linear number of steps.
+        Returns False at EOF."""
+        if self.eof:
+            return False
+        pending = self.text[self.pos:]
+        data = self.stream.read(max(self.chunk_size, len(pending)))
+        self.eof = not data
+        self.text = pending + self.decoder.decode(data, final=self.eof)
+        self.pos = 0
+        return True
+
+    def consume(self, length):
+        end = self.pos + length
+        consumed = self.text[self.pos:end]
+        self.offset += len(consumed) if consumed.isascii() else len(consumed.encode('utf-8'))
+        self.pos = end
+
+    def peek(self):
+        """Skip whitespace and return the next character, or None at EOF."""
+        while True:
+            match = _json_non_whitespace.search(self.text, self.pos)
+            if match:
+                self.consume(match.start() - self.pos)
+                return self.text[self.pos]
+            self.consume(len(self.text) - self.pos)
+            if not self.fill():
+                return None
+
+    def expect(self, chars):
+        char = self.peek()
+        if char is None or char not in chars:
+            raise ValueError(f"Expected one of {chars!r} at byte {self.offset}, found {char!r}")
+        self.consume(1)
+        return char
+
+    def decode_value(self):
+        """Decode and consume the JSON value at the current position."""
+        char = self.peek()
+        while True:
+            # A number reaching the end of the window may continue in the next
+            # chunk ("1." or "-1.5e" would decode short), so read on first
+            if (char is not None and char in '-0123456789'
+                    and _json_number_chars.match(self.text, self.pos).end() == len(self.text)
+                    and self.fill()):
+                continue
+            try:
+                value, end = _json_decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            self.consume(end - self.pos)
+            return value
+
+
+def iter_json_array(stream, chunk_size=None):
+    """Yield (byte_offset, item) for each element of a top-level JSON array.
+
+    Works on any binary stream (an open file or a zip member) and never
+    holds more than the current element plus one chunk of text.
+
+    Raises:
+        ValueError: If the stream is not a well-formed JSON array
+    """
+    buffer = JsonStreamBuffer(stream, chunk_size)
+    buffer.expect('[')
+    if buffer.peek() == ']':
+        return
+    while True:
+        buffer.peek()
+        offset = buffer.offset
+        yield offset, buffer.decode_value()
+        if buffer.expect(',]') == ']':
+            return
 
 
 def fix_facebook_encoding(text):
@@ -224,45 +642,139 @@ def normalize_fbid_list(fbids):
     return normalized
 
 
-def video_signature(entry):
-    """Build a conservative duplicate signature from date + normalized title."""
-    timestamp = extract_creation_timestamp(entry)
-    title = extract_video_title(entry)
-    if not timestamp or not title:
+class LiveEntry:
+    """A live_videos.json entry parsed once into the fields the script uses.
+
+    Built by parse_live_entry() with a single walk over 'label_values'; the
+    values match extract_fbid(), extract_video_filename(),
+    extract_video_title(), extract_creation_timestamp() and video_signature().
+    """
+
+    __slots__ = ('fbid', 'filename', 'title', 'created', 'signature')
+
+    def __init__(self, fbid, filename, title, created, signature):
+        self.fbid = fbid
+        self.filename = filename
+        self.title = title
+        self.created = created
+        self.signature = signature
+
+
+def parse_live_entry(entry):
+    """Parse a raw metadata entry into a LiveEntry (already parsed ones pass through)."""
+    if isinstance(entry, LiveEntry):
+        return entry
+    video_lv = None
+    title = None
+    title_seen = False
+    for lv in entry.get('label_values', []):
+        label = lv.get('label')
+        if label == 'Video' and video_lv is None:
+            video_lv = lv
+        elif label == 'Title' and not title_seen:
+            title = lv.get('value')
+            title_seen = True
+        if video_lv is not None and title_seen:
+            break
+
+    filename = None
+    if video_lv and video_lv.get('media'):
+        uri = video_lv['media'][0].get('uri')
+        if uri:
+            filename = uri.split('/')[-1]
+
+    created = extract_creation_timestamp(entry)
+    title = fix_facebook_encoding(title or config.default_title)
+    if created:
+        title = f"[{created.strftime('%Y-%m-%d')}] {title}"
+    return LiveEntry(normalize_fbid(filename), filename, title, created, signature_from(created, title))
+
+
+def normalize_title_key(title):
+    """Lowercase a title and drop everything but ASCII letters and digits."""
+    return re.sub(r'[^a-z0-9]+', '', title.lower())
+
+
+def signature_from(created, title):
+    """Duplicate signature for a creation datetime and (date-prefixed) title."""
+    if not created or not title:
         return None
-    title_key = re.sub(r'[^a-z0-9]+', '', title.lower())
+    title_key = normalize_title_key(title)
     if not title_key:
         return None
-    return (timestamp.strftime('%Y-%m-%d'), title_key)
+    return (created.strftime('%Y-%m-%d'), title_key)
+
+
+def video_signature(entry):
+    """Build a conservative duplicate signature from date + normalized title."""
+    return parse_live_entry(entry).signature
+
 
+def select_largest_video_per_signature(entries, videos_dir=None, member_sizes=None):
+    """For same-date/same-title duplicates in one export, keep only the largest file.
 
-def select_largest_video_per_signature(entries, videos_dir):
-    """For same-date/same-title duplicates in one export, keep only the largest file."""
+    Entries may be raw metadata dicts or LiveEntry records. Sizes come from
+    member_sizes (filename -> bytes, e.g. from the zip central directory)
+    when given, otherwise from files on disk under videos_dir.
+    """
     selected = {}
-    for entry in entries:
-        signature = video_signature(entry)
-        filename = extract_video_filename(entry)
+    for entry in map(parse_live_entry, entries):
+        signature = entry.signature
+        filename = entry.filename
         if not signature or not filename:
             continue
-        video_path = os.path.join(videos_dir, filename)
-        try:
-            size = os.path.getsize(video_path)
-        except OSError:
-            continue
+        if member_sizes is not None:
+            size = member_sizes.get(filename)
+            if size is None:
+                continue
+        else:
+            video_path = os.path.join(videos_dir, filename)
+            try:
+                size = os.path.getsize(video_path)
+            except OSError:
+                continue
         current = selected.get(signature)
         if current is None or size > current["size"]:
             selected[signature] = {
-                "fbid": extract_fbid(entry),
+                "fbid": entry.fbid,
                 "filename": filename,
                 "size": size,
             }
     return selected
 
 
+@contextmanager
+def open_json_source(source):
+    """Yield a binary stream for a metadata path or an already-open stream."""
+    if hasattr(source, 'read'):
+        yield source
+    else:
+        with open(source, 'rb') as f:
+            yield f
+
+
+def iter_live_entries(source, chunk_size=None):
+    """Stream live_videos.json entries as (byte_offset, LiveEntry) pairs.
+
+    Args:
+        source: Path to the JSON file, or a binary stream such as zf.open(member)
+        chunk_size: Bytes read per step (default JSON_STREAM_CHUNK_SIZE)
+    """
+    with open_json_source(source) as stream:
+        for offset, entry in iter_json_array(stream, chunk_size):
+            yield offset, parse_live_entry(entry)
+
+
+def sort_key_timestamp(timestamp):
+    """Oldest-first sort key; entries without a timestamp go last."""
+    return timestamp if timestamp is not None else float('inf')
+
+
 # Ensure inbox directory exists
 def ensure_inbox_exists():
-    os.makedirs(INBOX_PATH, exist_ok=True)
-    return INBOX_PATH
+    inbox_path = get_inbox_path()
+    os.makedirs(inbox_path, exist_ok=True)
+    return inbox_path
 
 
 def scan_inbox(inbox_path, processed_zips):
@@ -293,59 +805,566 @@ def scan_inbox(inbox_path, processed_zips):
     return [os.path.join(inbox_path, f) for f in sorted(pending_zips)]
 
 
-@contextmanager
-def extract_zip(zip_path):
-    """Extract zip to temp directory, auto-cleanup on exit (AUTO-02).
+def find_metadata_member(zf):
+    """Locate live_videos.json through the zip central directory (AUTO-03).
+
+    Reading the central directory is cheap, so this never decompresses or
+    extracts anything.
+
+    Args:
+        zf: Open zipfile.ZipFile
+
+    Returns:
+        ZipInfo for the metadata member, or None if not found.
+    """
+    for info in zf.infolist():
+        if info.is_dir():
+            continue
+        if info.filename.split('/')[-1] == 'live_videos.json':
+            return info
+    return None
+
+
+def find_video_members(zf):
+    """Map video basenames to their ZipInfo entries from the central directory.
+
+    Args:
+        zf: Open zipfile.ZipFile
+
+    Returns:
+        Dict of filename -> ZipInfo (first occurrence wins).
+    """
+    extensions = tuple(ext.strip().lower() for ext in config.video_file_extensions)
+    members = {}
+    for info in zf.infolist():
+        if info.is_dir():
+            continue
+        filename = info.filename.split('/')[-1]
+        if filename.lower().endswith(extensions) and filename not in members:
+            members[filename] = info
+    return members
+
+
+# Local file header: signature, version, flags, method, time, date, crc,
+# compressed size, size, filename length, extra length (30 bytes)
+ZIP_LOCAL_HEADER = struct.Struct('<4s5H3I2H')
+ZIP_LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+
+
+class ZipMemberReader(io.RawIOBase):
+    """Seekable, read-only file object over a stored (uncompressed) zip member.
+
+    The zip file is memory-mapped and reads are served straight from the
+    member's byte range, so uploads stream from the archive without a temp copy.
+    """
+
+    def __init__(self, zip_path, member):
+        super().__init__()
+        if member.compress_type != zipfile.ZIP_STORED:
+            raise ValueError(f"{member.filename} is compressed; use a spooled buffer instead")
+        if member.flag_bits & 0x1:
+            raise ValueError(f"{member.filename} is encrypted")
+        self.name = member.filename
+        self._file = open(zip_path, 'rb')
+        try:
+            self._file.seek(member.header_offset)
+            header = self._file.read(ZIP_LOCAL_HEADER.size)
+            if len(header) != ZIP_LOCAL_HEADER.size:
+                raise zipfile.BadZipFile(f"Truncated local header for {member.filename}")
+            fields = ZIP_LOCAL_HEADER.unpack(header)
+            if fields[0] != ZIP_LOCAL_HEADER_SIGNATURE:
+                raise zipfile.BadZipFile(f"Bad local header for {member.filename}")
+            # Local extra field may differ from the central directory copy
+            self._start = member.header_offset + ZIP_LOCAL_HEADER.size + fields[9] + fields[10]
+            self._size = member.file_size
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._pos + offset
+        elif whence == io.SEEK_END:
+            position = self._size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError("Negative seek position")
+        self._pos = position
+        return self._pos
+
+    def read(self, size=-1):
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+        remaining = max(self._size - self._pos, 0)
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        start = self._start + self._pos
+        self._pos += size
+        return self._map[start:start + size]
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def iter_chunks(self, chunk_size):
+        """Yield the member as zero-copy memoryview slices of the mapping.
+
+        Consumers must drop each slice before asking for the next one.
+        """
+        end = self._start + self._size
+        with memoryview(self._map) as view:
+            for start in range(self._start, end, chunk_size):
+                with view[start:min(start + chunk_size, end)] as chunk:
+                    yield chunk
+
+    def close(self):
+        if not self.closed:
+            self._map.close()
+            self._file.close()
+        super().close()
+
+
+def spool_zip_member(zf, member, max_size=None):
+    """Decompress a member into a spooled buffer (memory up to max_size, then disk)."""
+    if max_size is None:
+        max_size = config.zip_spool_max_bytes
+    spool = tempfile.SpooledTemporaryFile(max_size=max_size)
+    try:
+        with zf.open(member) as src:
+            shutil.copyfileobj(src, spool, 1024 * 1024)
+        spool.seek(0)
+    except Exception:
+        spool.close()
+        raise
+    return spool
 
-    Use ignore_cleanup_errors=True for Windows file locking issues.
+
+def open_media_source(zip_path, zf, member):
+    """Open a video member as a seekable media source; the caller closes it.
+
+    Stored members are mapped in place with ZipMemberReader; compressed ones
+    fall back to a bounded spooled buffer.
+    """
+    if member.compress_type == zipfile.ZIP_STORED and not member.flag_bits & 0x1:
+        return ZipMemberReader(zip_path, member)
+    return spool_zip_member(zf, member)
+
+
+# ============================================================================
+# INBOX INDEX - Cache parsed zip metadata keyed by zip name, size and mtime
+# ============================================================================
+
+# Bump when the record layout or parsing rules change to invalidate old rows
+INBOX_INDEX_VERSION = 2
+
+INBOX_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS zips (
+    zip_name TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    settings TEXT NOT NULL,
+    metadata_member TEXT,
+    video_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    zip_name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    fbid TEXT,
+    filename TEXT,
+    member_name TEXT,
+    member_size INTEGER,
+    title TEXT,
+    timestamp REAL,
+    signature_date TEXT,
+    signature_title TEXT,
+    member_crc INTEGER,
+    PRIMARY KEY (zip_name, position)
+);
+CREATE TABLE IF NOT EXISTS content_hashes (
+    zip_name TEXT NOT NULL,
+    member_name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    crc INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    PRIMARY KEY (zip_name, member_name, size, crc)
+);
+"""
+
+
+def get_inbox_index_settings():
+    """Return the parsing settings an index row is only valid for."""
+    return json.dumps([INBOX_INDEX_VERSION, config.default_title, sorted(config.video_file_extensions)])
+
+
+def open_inbox_index(index_path=None):
+    """Open (and create if needed) the SQLite inbox index."""
+    conn = sqlite3.connect(index_path or INBOX_INDEX_PATH)
+    conn.executescript(INBOX_INDEX_SCHEMA)
+    return conn
+
+
+def scan_zip_metadata(zip_path):
+    """Parse one export zip into compact per-entry records.
 
     Args:
         zip_path: Full path to the zip file
 
-    Yields:
-        Path to the temporary directory containing extracted contents
+    Returns:
+        Dict with 'metadata_member' (or None), 'video_count' and 'entries', a
+        list of dicts with fbid, filename, member_name, member_size,
+        member_crc (central-directory CRC32), title, timestamp (unix seconds)
+        and signature (date, title key) per entry.
+
+    Raises:
+        zipfile.BadZipFile: If the zip is corrupted
     """
-    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as temp_dir:
-        with zipfile.ZipFile(zip_path, 'r') as zf:
-            zf.extractall(temp_dir)
-        yield temp_dir
+    records = []
+    with zipfile.ZipFile(zip_path, 'r') as zf:
+        metadata_member = find_metadata_member(zf)
+        video_members = find_video_members(zf)
+        if metadata_member:
+            # Entries are streamed from the member; only compact records are kept
+            with zf.open(metadata_member) as raw:
+                for position, (_, entry) in enumerate(iter_live_entries(raw)):
+                    member = video_members.get(entry.filename) if entry.filename else None
+                    records.append({
+                        "position": position,
+                        "fbid": entry.fbid,
+                        "filename": entry.filename,
+                        "member_name": member.filename if member else None,
+                        "member_size": member.file_size if member else None,
+                        "member_crc": member.CRC if member else None,
+                        "title": entry.title,
+                        "timestamp": entry.created.timestamp() if entry.created else None,
+                        "signature": entry.signature,
+                    })
+
+    return {
+        "metadata_member": metadata_member.filename if metadata_member else None,
+        "video_count": len(video_members),
+        "entries": records,
+    }
+
+
+def load_zip_index(conn, zip_path):
+    """Return the cached scan for zip_path, or None if missing or stale."""
+    stat = os.stat(zip_path)
+    zip_name = os.path.basename(zip_path)
+    row = conn.execute(
+        "SELECT size, mtime_ns, settings, metadata_member, video_count FROM zips WHERE zip_name = ?",
+        (zip_name,)
+    ).fetchone()
+    if not row or row[0] != stat.st_size or row[1] != stat.st_mtime_ns or row[2] != get_inbox_index_settings():
+        return None
+
+    records = []
+    for r in conn.execute(
+        "SELECT position, fbid, filename, member_name, member_size, title, timestamp, "
+        "signature_date, signature_title, member_crc FROM entries WHERE zip_name = ? ORDER BY position",
+        (zip_name,)
+    ):
+        records.append({
+            "position": r[0],
+            "fbid": r[1],
+            "filename": r[2],
+            "member_name": r[3],
+            "member_size": r[4],
+            "member_crc": r[9],
+            "title": r[5],
+            "timestamp": r[6],
+            "signature": (r[7], r[8]) if r[7] is not None else None,
+        })
+    return {"metadata_member": row[3], "video_count": row[4], "entries": records}
+
+
+def store_zip_index(conn, zip_path, scan):
+    """Replace the cached scan for zip_path in a single transaction."""
+    stat = os.stat(zip_path)
+    zip_name = os.path.basename(zip_path)
+    with conn:
+        conn.execute("DELETE FROM entries WHERE zip_name = ?", (zip_name,))
+        conn.execute(
+            "INSERT OR REPLACE INTO zips (zip_name, size, mtime_ns, settings, metadata_member, video_count) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (zip_name, stat.st_size, stat.st_mtime_ns, get_inbox_index_settings(),
+             scan["metadata_member"], scan["video_count"])
+        )
+        conn.executemany(
+            "INSERT INTO entries (zip_name, position, fbid, filename, member_name, member_size, "
+            "title, timestamp, signature_date, signature_title, member_crc) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (zip_name, r["position"], r["fbid"], r["filename"], r["member_name"], r["member_size"],
+                 r["title"], r["timestamp"],
+                 r["signature"][0] if r["signature"] else None,
+                 r["signature"][1] if r["signature"] else None,
+                 r["member_crc"])
+                for r in scan["entries"]
+            ]
+        )
+
+
+def get_zip_scan(zip_path, index_path=None):
+    """Return the parsed scan for a zip, reading the index when it is fresh.
+
+    A zip is only opened and parsed when its name, size or mtime is not in
+    the index yet; the result is then stored for later runs.
+    """
+    with closing(open_inbox_index(index_path)) as conn:
+        scan = load_zip_index(conn, zip_path)
+        if scan is None:
+            scan = scan_zip_metadata(zip_path)
+            store_zip_index(conn, zip_path, scan)
+    return scan
 
 
-def find_metadata_in_extracted(temp_dir):
-    """Find the live_videos.json metadata file in extracted folder (AUTO-03).
+def scan_zips_with_index(zip_paths, jobs=1, index_path=None):
+    """Return scans for several zips, parsing index misses in a process pool.
 
-    Facebook exports have nested structure. Search for live_videos.json.
+    Fresh index entries are read in this process; stale or missing zips are
+    parsed by up to `jobs` worker processes and then written back to the index
+    here, so SQLite only ever has a single writer.
 
     Args:
-        temp_dir: Path to the extracted directory
+        zip_paths: Full paths of the zips to scan
+        jobs: Worker processes for parsing (1 = parse inline)
+        index_path: Optional inbox index path override
 
     Returns:
-        Full path to JSON file, or None if not found.
+        Dict of zip_path -> scan dict, or the exception raised while parsing it
     """
-    for root, dirs, files in os.walk(temp_dir):
-        for filename in files:
-            if filename == 'live_videos.json':
-                return os.path.join(root, filename)
-    return None
+    results = {}
+    with closing(open_inbox_index(index_path)) as conn:
+        misses = []
+        for zip_path in zip_paths:
+            try:
+                scan = load_zip_index(conn, zip_path)
+            except OSError as e:
+                results[zip_path] = e
+                continue
+            if scan is None:
+                misses.append(zip_path)
+            else:
+                results[zip_path] = scan
+
+        if jobs > 1 and len(misses) > 1:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(misses))) as pool:
+                futures = {zip_path: pool.submit(scan_zip_metadata, zip_path) for zip_path in misses}
+                for zip_path, future in futures.items():
+                    try:
+                        results[zip_path] = future.result()
+                    except Exception as e:
+                        results[zip_path] = e
+        else:
+            for zip_path in misses:
+                try:
+                    results[zip_path] = scan_zip_metadata(zip_path)
+                except Exception as e:
+                    results[zip_path] = e
+
+        for zip_path in misses:
+            if not isinstance(results[zip_path], Exception):
+                store_zip_index(conn, zip_path, results[zip_path])
+
+    return results
 
 
-def find_videos_dir_in_extracted(temp_dir):
-    """Find the live_videos directory containing .mp4 files.
+def oldest_first_order(records):
+    """Return [(timestamp, position)] for indexed records, oldest first.
+
+    Ties keep metadata order; records without a timestamp go last.
+    """
+    return sorted((sort_key_timestamp(r["timestamp"]), position) for position, r in enumerate(records))
+
+
+def select_largest_record_per_signature(records):
+    """Indexed-record variant of select_largest_video_per_signature()."""
+    selected = {}
+    for record in records:
+        signature = record["signature"]
+        size = record["member_size"]
+        if not signature or not record["filename"] or size is None:
+            continue
+        current = selected.get(signature)
+        if current is None or size > current["size"]:
+            selected[signature] = {
+                "fbid": record["fbid"],
+                "filename": record["filename"],
+                "size": size,
+            }
+    return selected
+
+
+# ============================================================================
+# CONTENT FINGERPRINTS - Detect the same recording under another fbid/title
+# ============================================================================
+
+def hash_zip_member(zip_path, zf, member, chunk_size=None):
+    """Return the SHA-256 hex digest of a video member's content.
+
+    Stored members are hashed straight from the memory-mapped zip in large
+    chunks; compressed ones are streamed through the decompressor.
+    """
+    chunk_size = chunk_size or config.content_hash_chunk_size
+    digest = hashlib.sha256()
+    if member.compress_type == zipfile.ZIP_STORED and not member.flag_bits & 0x1:
+        with ZipMemberReader(zip_path, member) as reader:
+            for chunk in reader.iter_chunks(chunk_size):
+                digest.update(chunk)
+    else:
+        with zf.open(member) as src:
+            for chunk in iter(lambda: src.read(chunk_size), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_content_fingerprint(zip_path, record, index_path=None):
+    """Return (size, crc32, sha256) for an indexed video record.
+
+    Digests are cached in the inbox index keyed by zip, member, size and
+    CRC, so each video is hashed at most once.
+    """
+    size, crc = record["member_size"], record["member_crc"]
+    key = (os.path.basename(zip_path), record["member_name"], size, crc)
+    with closing(open_inbox_index(index_path)) as conn:
+        row = conn.execute(
+            "SELECT sha256 FROM content_hashes WHERE zip_name = ? AND member_name = ? AND size = ? AND crc = ?",
+            key
+        ).fetchone()
+        if row:
+            return size, crc, row[0]
+        with zipfile.ZipFile(zip_path, 'r') as zf:
+            member = zf.getinfo(record["member_name"])
+            if member.file_size != size or member.CRC != crc:
+                raise ValueError(f"{record['filename']} changed since it was indexed")
+            sha256 = hash_zip_member(zip_path, zf, member)
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO content_hashes (zip_name, member_name, size, crc, sha256) "
+                "VALUES (?, ?, ?, ?, ?)",
+                key + (sha256,)
+            )
+    return size, crc, sha256
+
+
+def find_content_duplicate(registry, zip_path, record, queued=None):
+    """Return the fbid of an uploaded (or queued) video with identical content.
+
+    Size plus the central-directory CRC32 act as a free first-level filter:
+    the video is only hashed when some uploaded or queued video shares both.
+    Backfilled uploads without a SHA-256 are hashed on that first collision.
 
     Args:
-        temp_dir: Path to the extracted directory
+        registry: Open registry store
+        zip_path: Zip holding the record's member
+        record: Indexed record (needs member_name, member_size, member_crc)
+        queued: Optional dict of (size, crc32) -> [(zip_path, record)] for
+            videos already queued this run; record is added when unique
 
     Returns:
-        Full path to directory containing mp4 files, or None if not found.
+        Matching fbid, or None if the content is new.
     """
-    for root, dirs, files in os.walk(temp_dir):
-        # Check if this directory contains mp4 files
-        mp4_files = [f for f in files if f.lower().endswith('.mp4')]
-        if mp4_files:
-            return root
+    key = (record["member_size"], record["member_crc"])
+    if key[1] is None:
+        return None
+    uploaded = registry.find_uploaded_content(*key)
+    earlier = queued.get(key, []) if queued is not None else []
+    duplicate = None
+    if uploaded or earlier:
+        sha256 = get_content_fingerprint(zip_path, record)[2]
+        duplicate = next(
+            (fbid for fbid, digest in uploaded
+             if (digest or uploaded_digest(registry, fbid, *key)) == sha256),
+            None
+        )
+        if duplicate is None:
+            duplicate = next(
+                (other["fbid"] for other_zip, other in earlier
+                 if get_content_fingerprint(other_zip, other)[2] == sha256),
+                None
+            )
+    if duplicate is None and queued is not None:
+        queued.setdefault(key, []).append((zip_path, record))
+    return duplicate
+
+
+def locate_indexed_member(fbid, size, crc32, index_path=None):
+    """Return (zip_path, record) for an inbox zip still holding fbid's video
+    with this size and CRC32, or None."""
+    inbox_path = get_inbox_path()
+    with closing(open_inbox_index(index_path)) as conn:
+        rows = conn.execute(
+            "SELECT zip_name, filename, member_name FROM entries "
+            "WHERE fbid = ? AND member_size = ? AND member_crc = ? ORDER BY zip_name",
+            (fbid, size, crc32)
+        ).fetchall()
+    for zip_name, filename, member_name in rows:
+        zip_path = os.path.join(inbox_path, zip_name)
+        if os.path.exists(zip_path):
+            return zip_path, {
+                "fbid": fbid, "filename": filename, "member_name": member_name,
+                "member_size": size, "member_crc": crc32,
+            }
     return None
 
 
+def uploaded_digest(registry, fbid, size, crc32):
+    """Hash a registered upload known only by size and CRC32 and store it.
+
+    Called on the first size/CRC collision with such an upload. Returns None
+    when its video is no longer in the inbox.
+    """
+    location = locate_indexed_member(fbid, size, crc32)
+    if location is None:
+        return None
+    try:
+        fingerprint = get_content_fingerprint(*location)
+    except Exception as e:
+        print_status(f"  Could not fingerprint uploaded {fbid}: {str(e)[:60]}", 'warning')
+        return None
+    registry.record_content(fbid, fingerprint)
+    return fingerprint[2]
+
+
+def backfill_content_fingerprints(registry, records, verbose=False):
+    """Record size and CRC32 of registered fbids uploaded before content
+    fingerprints were kept, so find_content_duplicate() can match new fbids
+    against them.
+
+    Both values come from the zip's central directory, so nothing is read;
+    the SHA-256 is only computed once a new video collides on both.
+
+    Returns:
+        Number of fingerprints added.
+    """
+    added = 0
+    for record in records:
+        fbid = record["fbid"]
+        if (not fbid or record["member_name"] is None or record["member_crc"] is None
+                or not registry.has_fbid(fbid) or registry.has_content(fbid)):
+            continue
+        registry.record_content(fbid, (record["member_size"], record["member_crc"], None))
+        added += 1
+    if added and verbose:
+        print_status(f"  Backfilled content fingerprints for {added} uploaded video(s)", 'info')
+    return added
+
+
 # Registry structure:
 # {
 #   "uploaded_fbids": ["123456789", "987654321"],
@@ -362,9 +1381,13 @@ def get_empty_registry():
     }
 
 
-def load_registry(registry_file):
-    """Load registry from file, handling migration from old format."""
-    if not os.path.exists(registry_file):
+def load_registry(registry_file, strict=False):
+    """Load registry from file, handling migration from old format.
+
+    A missing or unreadable file gives an empty registry, unless strict is
+    set, in which case the read or parse error is raised.
+    """
+    if not os.path.exists(registry_file) and not strict:
         return get_empty_registry()
 
     try:
@@ -390,24 +1413,30 @@ def load_registry(registry_file):
 
         return data
     except (json.JSONDecodeError, IOError):
+        if strict:
+            raise
         return get_empty_registry()
 
 
-def save_registry_atomic(registry_file, data):
-    """Save registry with atomic write to prevent corruption on crash."""
-    dir_path = os.path.dirname(registry_file)
+def write_file_atomic(path, content):
+    """Write str or bytes content to path atomically (temp file, fsync, rename)."""
+    dir_path = os.path.dirname(path)
     if dir_path and not os.path.exists(dir_path):
         os.makedirs(dir_path, exist_ok=True)
 
     # Create temp file in same directory for atomic rename
     fd, temp_path = tempfile.mkstemp(dir=dir_path if dir_path else '.')
     try:
-        with os.fdopen(fd, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
+        if isinstance(content, bytes):
+            f = os.fdopen(fd, 'wb')
+        else:
+            f = os.fdopen(fd, 'w', encoding='utf-8')
+        with f:
+            f.write(content)
             f.flush()
             os.fsync(f.fileno())
         # Atomic rename (works on POSIX and Windows when files on same filesystem)
-        os.replace(temp_path, registry_file)
+        os.replace(temp_path, path)
     except Exception:
         # Clean up temp file on failure
         try:
@@ -417,11 +1446,510 @@ def save_registry_atomic(registry_file, data):
         raise
 
 
+def save_registry_atomic(registry_file, data):
+    """Save registry with atomic write to prevent corruption on crash."""
+    write_file_atomic(registry_file, json.dumps(data, indent=2))
+
+
+# ============================================================================
+# REGISTRY STORE - Indexed SQLite registry (WAL mode)
+# ============================================================================
+
+REGISTRY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploaded_fbids (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    fbid TEXT NOT NULL UNIQUE,
+    uploaded_at TEXT
+);
+CREATE TABLE IF NOT EXISTS processed_zips (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    zip_name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS daily_uploads (
+    day TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS uploaded_content (
+    fbid TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    crc32 INTEGER NOT NULL,
+    sha256 TEXT
+);
+CREATE INDEX IF NOT EXISTS uploaded_content_size_crc ON uploaded_content (size, crc32);
+CREATE TABLE IF NOT EXISTS upload_sessions (
+    fbid TEXT PRIMARY KEY,
+    session_uri TEXT NOT NULL,
+    size INTEGER,
+    confirmed_bytes INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS audited_videos (
+    video_id TEXT PRIMARY KEY,
+    published_at TEXT
+);
+"""
+
+
+def registry_db_path(registry_file):
+    """Return the SQLite registry path that sits next to a JSON registry file."""
+    return os.path.splitext(registry_file)[0] + '.sqlite3'
+
+
+class SqliteRegistry:
+    """Registry backed by SQLite in WAL mode.
+
+    fbid lookups go through a UNIQUE index, each upload is one small durable
+    transaction, and daily upload counters are stored as rows. On first open
+    the legacy JSON registry (any load_registry() format) is imported once.
+    Writes are serialized by a lock (see open_registry()).
+    """
+
+    def __init__(self, db_path, legacy_json_path=None):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # FULL makes every commit durable (fsync of the WAL) before returning
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.executescript(REGISTRY_SCHEMA)
+        if legacy_json_path:
+            self._migrate_from_json(legacy_json_path)
+
+    def _migrate_from_json(self, json_path):
+        """Import a legacy JSON registry once; later JSON edits are ignored.
+
+        Only a successful import is marked, so a JSON registry that is
+        missing or unreadable now is still imported once it is in place.
+        """
+        if self.conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_from'").fetchone():
+            return
+        if not os.path.exists(json_path):
+            return
+        try:
+            data = load_registry(json_path, strict=True)
+        except (ValueError, OSError) as e:
+            print_status(f"Could not import legacy registry {json_path}: {str(e)[:60]}", 'warning')
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO uploaded_fbids (fbid) VALUES (?)",
+                [(fbid,) for fbid in data["uploaded_fbids"]]
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO processed_zips (zip_name) VALUES (?)",
+                [(name,) for name in data["processed_zips"]]
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO daily_uploads (day, count) VALUES (?, ?)",
+                list(data["daily_uploads"].items())
+            )
+            self.conn.execute("INSERT INTO meta (key, value) VALUES ('migrated_from', ?)", (json_path,))
+
+    def has_fbid(self, fbid):
+        return self.conn.execute(
+            "SELECT 1 FROM uploaded_fbids WHERE fbid = ?", (fbid,)
+        ).fetchone() is not None
+
+    def uploaded_fbids(self):
+        return [row[0] for row in self.conn.execute("SELECT fbid FROM uploaded_fbids ORDER BY seq")]
+
+    def processed_zips(self):
+        return [row[0] for row in self.conn.execute("SELECT zip_name FROM processed_zips ORDER BY seq")]
+
+    def uploads_on(self, day):
+        row = self.conn.execute("SELECT count FROM daily_uploads WHERE day = ?", (day,)).fetchone()
+        return row[0] if row else 0
+
+    def record_upload(self, fbid, day, fingerprint=None):
+        """Add fbid, bump the day's counter, store its content fingerprint
+        (size, crc32, sha256) and drop its upload session in one durable
+        transaction."""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO uploaded_fbids (fbid, uploaded_at) VALUES (?, ?)",
+                (fbid, datetime.datetime.now().isoformat(timespec='seconds'))
+            )
+            self.conn.execute(
+                "INSERT INTO daily_uploads (day, count) VALUES (?, 1) "
+                "ON CONFLICT(day) DO UPDATE SET count = count + 1",
+                (day,)
+            )
+            if fingerprint:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO uploaded_content (fbid, size, crc32, sha256) VALUES (?, ?, ?, ?)",
+                    (fbid,) + tuple(fingerprint)
+                )
+            self.conn.execute("DELETE FROM upload_sessions WHERE fbid = ?", (fbid,))
+
+    def find_uploaded_content(self, size, crc32):
+        """Return [(fbid, sha256)] of uploads with this size and CRC32
+        (sha256 is None for backfilled uploads not hashed yet)."""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT fbid, sha256 FROM uploaded_content WHERE size = ? AND crc32 = ?", (size, crc32)
+            ).fetchall()
+
+    def has_content(self, fbid):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT 1 FROM uploaded_content WHERE fbid = ?", (fbid,)
+            ).fetchone() is not None
+
+    def record_content(self, fbid, fingerprint):
+        """Store the (size, crc32, sha256) of an fbid uploaded before
+        fingerprints were kept (sha256 None until first needed); counters
+        are left alone."""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO uploaded_content (fbid, size, crc32, sha256) VALUES (?, ?, ?, ?)",
+                (fbid,) + tuple(fingerprint)
+            )
+
+    def add_fbids(self, fbids):
+        """Add fbids without touching daily counters; returns how many were new."""
+        with self.lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO uploaded_fbids (fbid) VALUES (?)",
+                [(fbid,) for fbid in fbids]
+            )
+            return self.conn.total_changes - before
+
+    def replace_uploaded_fbids(self, fbids):
+        """Make the uploaded fbids exactly `fbids` (save_registry() semantics)."""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM uploaded_fbids")
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO uploaded_fbids (fbid) VALUES (?)",
+                [(fbid,) for fbid in fbids]
+            )
+
+    def mark_zip_processed(self, zip_name):
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO processed_zips (zip_name) VALUES (?)", (zip_name,))
+
+    def get_upload_session(self, fbid):
+        """Return the saved resumable session for fbid, or None."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT session_uri, size, confirmed_bytes FROM upload_sessions WHERE fbid = ?", (fbid,)
+            ).fetchone()
+        if not row:
+            return None
+        return {"session_uri": row[0], "size": row[1], "offset": row[2]}
+
+    def save_upload_session(self, fbid, session_uri, offset, size=None):
+        """Remember a resumable session URI and the last byte offset YouTube confirmed."""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO upload_sessions (fbid, session_uri, size, confirmed_bytes, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (fbid, session_uri, size, offset, datetime.datetime.now().isoformat(timespec='seconds'))
+            )
+
+    def clear_upload_session(self, fbid):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM upload_sessions WHERE fbid = ?", (fbid,))
+
+    def audit_cursor(self):
+        """Return (reconciled video ids, newest reconciled publishedAt or None)."""
+        with self.lock:
+            video_ids = {row[0] for row in self.conn.execute("SELECT video_id FROM audited_videos")}
+            newest = self.conn.execute("SELECT MAX(published_at) FROM audited_videos").fetchone()[0]
+        return video_ids, newest
+
+    def record_audited_videos(self, videos):
+        """Remember (video_id, published_at) pairs as reconciled by an audit."""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO audited_videos (video_id, published_at) VALUES (?, ?)",
+                list(videos)
+            )
+
+    def to_dict(self):
+        """Return the registry in the legacy JSON structure."""
+        return {
+            "uploaded_fbids": self.uploaded_fbids(),
+            "processed_zips": self.processed_zips(),
+            "daily_uploads": dict(self.conn.execute("SELECT day, count FROM daily_uploads ORDER BY day")),
+        }
+
+    def compact(self):
+        """Fold the WAL back into the main database file."""
+        with self.lock:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def registry_journal_path(registry_file):
+    """Return the append-only journal path for a JSON registry file."""
+    return os.path.splitext(registry_file)[0] + '.journal.jsonl'
+
+
+class JournaledJsonRegistry:
+    """Flat-file registry: JSON snapshot plus an append-only upload journal.
+
+    Every change appends one fsynced JSON line to the journal instead of
+    rewriting the snapshot. Loading replays the snapshot plus the journal, and
+    compact() folds the journal into the snapshot via save_registry_atomic().
+    Journal lines carry a sequence number and the snapshot remembers the last
+    one it contains, so a crash mid-compaction never applies a line twice.
+    Appends are serialized by a lock (see open_registry()).
+    """
+
+    def __init__(self, registry_file, journal_path=None, max_journal_entries=None):
+        self.registry_file = registry_file
+        self.journal_path = journal_path or registry_journal_path(registry_file)
+        self.max_journal_entries = (
+            config.registry_journal_max_entries if max_journal_entries is None else max_journal_entries
+        )
+        self.lock = threading.RLock()
+        self.data = load_registry(registry_file)
+        self.seq = self.data.get("journal_seq", 0)
+        self.sessions = dict(self.data.get("upload_sessions", {}))
+        self.audited = dict(self.data.get("audited_videos", {}))  # video_id -> published_at
+        self.content = {}  # fbid -> [size, crc32, sha256]
+        self._content_keys = {}  # (size, crc32) -> {fbid: sha256}
+        for fbid, fingerprint in self.data.get("uploaded_content", {}).items():
+            self._add_content(fbid, fingerprint)
+        self._fbids = set(self.data["uploaded_fbids"])
+        self._zips = set(self.data["processed_zips"])
+        self.journal_entries = 0
+        self._replay_journal()
+        self._journal = None
+
+    def _replay_journal(self):
+        """Apply journal lines newer than the snapshot.
+
+        A torn tail from a crash mid-append (no newline, or not JSON) was
+        never acknowledged; it is cut off here so the next append starts on
+        a clean line instead of being glued onto the fragment.
+        """
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'r+b') as f:
+            good_end = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                good_end += len(line)
+                self.journal_entries += 1
+                if record.get("seq", 0) <= self.seq:
+                    continue
+                self.seq = record["seq"]
+                self._apply(record)
+            if good_end < f.seek(0, os.SEEK_END):
+                print_status(f"Discarding torn tail of registry journal at byte {good_end}", 'warning')
+                f.truncate(good_end)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _apply(self, record):
+        op = record["op"]
+        if op == "upload":
+            self._add_fbid(record["fbid"])
+            daily = self.data["daily_uploads"]
+            daily[record["day"]] = daily.get(record["day"], 0) + 1
+            self.sessions.pop(record["fbid"], None)
+            if record.get("content"):
+                self._add_content(record["fbid"], record["content"])
+        elif op == "add_fbids":
+            for fbid in record["fbids"]:
+                self._add_fbid(fbid)
+        elif op == "replace_fbids":
+            self.data["uploaded_fbids"] = []
+            self._fbids = set()
+            for fbid in record["fbids"]:
+                self._add_fbid(fbid)
+        elif op == "zip":
+            if record["zip"] not in self._zips:
+                self._zips.add(record["zip"])
+                self.data["processed_zips"].append(record["zip"])
+        elif op == "session":
+            self.sessions[record["fbid"]] = {
+                "session_uri": record["session_uri"], "size": record["size"], "offset": record["offset"]
+            }
+        elif op == "clear_session":
+            self.sessions.pop(record["fbid"], None)
+        elif op == "audit":
+            self.audited.update(record["videos"])
+        elif op == "content":
+            self._add_content(record["fbid"], record["content"])
+
+    def _add_content(self, fbid, fingerprint):
+        size, crc32, sha256 = fingerprint
+        self.content[fbid] = [size, crc32, sha256]
+        self._content_keys.setdefault((size, crc32), {})[fbid] = sha256
+
+    def _add_fbid(self, fbid):
+        if fbid in self._fbids:
+            return False
+        self._fbids.add(fbid)
+        self.data["uploaded_fbids"].append(fbid)
+        return True
+
+    def _append(self, record):
+        """Apply a change in memory and make it durable with one journal line."""
+        with self.lock:
+            self.seq += 1
+            record["seq"] = self.seq
+            if self._journal is None:
+                journal_dir = os.path.dirname(self.journal_path)
+                if journal_dir:
+                    os.makedirs(journal_dir, exist_ok=True)
+                self._journal = open(self.journal_path, 'a', encoding='utf-8')
+            self._journal.write(json.dumps(record) + "\n")
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self.journal_entries += 1
+            self._apply(record)
+            if self.max_journal_entries and self.journal_entries >= self.max_journal_entries:
+                self.compact()
+
+    def has_fbid(self, fbid):
+        return fbid in self._fbids
+
+    def uploaded_fbids(self):
+        return list(self.data["uploaded_fbids"])
+
+    def processed_zips(self):
+        return list(self.data["processed_zips"])
+
+    def uploads_on(self, day):
+        return self.data["daily_uploads"].get(day, 0)
+
+    def record_upload(self, fbid, day, fingerprint=None):
+        record = {"op": "upload", "fbid": fbid, "day": day}
+        if fingerprint:
+            record["content"] = list(fingerprint)
+        self._append(record)
+
+    def find_uploaded_content(self, size, crc32):
+        with self.lock:
+            return list(self._content_keys.get((size, crc32), {}).items())
+
+    def has_content(self, fbid):
+        return fbid in self.content
+
+    def record_content(self, fbid, fingerprint):
+        self._append({"op": "content", "fbid": fbid, "content": list(fingerprint)})
+
+    def add_fbids(self, fbids):
+        new_fbids = [fbid for fbid in dict.fromkeys(fbids) if fbid not in self._fbids]
+        if new_fbids:
+            self._append({"op": "add_fbids", "fbids": new_fbids})
+        return len(new_fbids)
+
+    def replace_uploaded_fbids(self, fbids):
+        self._append({"op": "replace_fbids", "fbids": list(fbids)})
+
+    def mark_zip_processed(self, zip_name):
+        if zip_name not in self._zips:
+            self._append({"op": "zip", "zip": zip_name})
+
+    def get_upload_session(self, fbid):
+        with self.lock:
+            session = self.sessions.get(fbid)
+            return dict(session) if session else None
+
+    def save_upload_session(self, fbid, session_uri, offset, size=None):
+        self._append({"op": "session", "fbid": fbid, "session_uri": session_uri, "size": size, "offset": offset})
+
+    def clear_upload_session(self, fbid):
+        if fbid in self.sessions:
+            self._append({"op": "clear_session", "fbid": fbid})
+
+    def audit_cursor(self):
+        with self.lock:
+            published = [value for value in self.audited.values() if value]
+            return set(self.audited), max(published) if published else None
+
+    def record_audited_videos(self, videos):
+        videos = dict(videos)
+        if videos:
+            self._append({"op": "audit", "videos": videos})
+
+    def to_dict(self):
+        return {
+            "uploaded_fbids": list(self.data["uploaded_fbids"]),
+            "processed_zips": list(self.data["processed_zips"]),
+            "daily_uploads": dict(self.data["daily_uploads"]),
+        }
+
+    def compact(self):
+        """Write the snapshot atomically, then truncate the journal."""
+        with self.lock:
+            if not self.journal_entries:
+                return
+            snapshot = self.to_dict()
+            snapshot["journal_seq"] = self.seq
+            if self.sessions:
+                snapshot["upload_sessions"] = dict(self.sessions)
+            if self.content:
+                snapshot["uploaded_content"] = dict(self.content)
+            if self.audited:
+                snapshot["audited_videos"] = dict(self.audited)
+            save_registry_atomic(self.registry_file, snapshot)
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            with open(self.journal_path, 'w', encoding='utf-8') as f:
+                f.flush()
+                os.fsync(f.fileno())
+            self.journal_entries = 0
+
+    def close(self):
+        with self.lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+
+def open_registry(registry_file=None, backend=None):
+    """Open the registry store for a registry file path (default REGISTRY_PATH).
+
+    backend (default REGISTRY_BACKEND env var):
+        'sqlite': database next to the JSON file (registry.json ->
+                  registry.sqlite3), migrated from the JSON file on first open
+        'json':   JSON snapshot plus append-only journal (JournaledJsonRegistry)
+
+    Both stores serialize writes with a lock, so upload workers can
+    checkpoint their resumable sessions while the main thread records
+    results.
+    """
+    registry_file = registry_file or REGISTRY_PATH
+    backend = backend or config.registry_backend
+    if backend == 'json':
+        return JournaledJsonRegistry(registry_file)
+    if backend != 'sqlite':
+        raise ValueError(f"Unknown REGISTRY_BACKEND: {backend!r} (expected 'sqlite' or 'json')")
+    return SqliteRegistry(registry_db_path(registry_file), legacy_json_path=registry_file)
+
+
 def can_upload_today(registry, max_per_day=6):
-    """Check if we can upload more videos today."""
+    """Check if we can upload more videos today.
+
+    Accepts a legacy registry dict or a registry store.
+    """
     today = datetime.date.today().isoformat()
-    daily_uploads = registry.get("daily_uploads", {})
-    return daily_uploads.get(today, 0) < max_per_day
+    if isinstance(registry, dict):
+        daily_uploads = registry.get("daily_uploads", {})
+        return daily_uploads.get(today, 0) < max_per_day
+    return registry.uploads_on(today) < max_per_day
 
 
 # ============================================================================
@@ -450,12 +1978,115 @@ def get_uploads_playlist_id(youtube):
     return None
 
 
-def list_youtube_uploads(youtube, max_results=500):
+def http_error_status(error):
+    """Return the HTTP status of a googleapiclient HttpError, or None for other errors."""
+    from googleapiclient.errors import HttpError
+    return error.resp.status if isinstance(error, HttpError) else None
+
+
+def is_retryable_api_error(error):
+    """Return True for transient API errors worth retrying (rate limits, 5xx, network)."""
+    status = http_error_status(error)
+    if status is not None:
+        return status in (429, 500, 502, 503, 504)
+    return isinstance(error, (TimeoutError, socket.timeout, OSError))
+
+
+def execute_with_retries(request, max_retries=5, description='API request'):
+    """Execute an API request, retrying transient errors with exponential backoff."""
+    attempt = 0
+    while True:
+        started = time.perf_counter()
+        try:
+            response = request.execute()
+            current_metrics().observe('api_call', time.perf_counter() - started, request=description, retries=attempt)
+            return response
+        except Exception as e:
+            attempt += 1
+            if attempt > max_retries or not is_retryable_api_error(e):
+                raise
+            current_metrics().count('api_retries')
+            sleep_seconds = min(2 ** attempt, 60)
+            print_status(f"Retrying {description} after transient error: {str(e)[:100]}", 'warning')
+            time.sleep(sleep_seconds)
+
+
+def iter_playlist_pages(youtube, playlist_id, page_size=50, max_retries=5):
+    """Yield playlistItems.list responses page by page until the last one."""
+    page_token = None
+    while True:
+        response = execute_with_retries(
+            youtube.playlistItems().list(
+                playlistId=playlist_id,
+                part='snippet',
+                maxResults=page_size,
+                pageToken=page_token
+            ),
+            max_retries=max_retries,
+            description='uploads page'
+        )
+        yield response
+        page_token = response.get('nextPageToken')
+        if not page_token:
+            return
+
+
+def prefetch_iterator(iterable, depth=1):
+    """Run an iterator in a background thread, staying up to `depth` items ahead.
+
+    Exceptions from the iterator are re-raised in the consumer. Closing the
+    returned generator early stops the producer after its current item.
+    """
+    items = queue.Queue(maxsize=max(depth, 1))
+    stop = threading.Event()
+
+    def produce():
+        def put(item):
+            while not stop.is_set():
+                try:
+                    items.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+        except Exception as e:
+            put((None, e))
+            return
+        put((PIPELINE_DONE, None))
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            item, error = items.get()
+            if error is not None:
+                raise error
+            if item is PIPELINE_DONE:
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+def list_youtube_uploads(youtube, max_results=None, prefetch=True, max_retries=5):
     """List all videos from the authenticated channel's uploads playlist.
 
+    Pages are streamed with no cap; with prefetch the next page is fetched
+    in a background thread while the caller consumes the current one (on its
+    own pooled connection, see build_youtube_client()). Transient page
+    failures are retried up to max_retries times; after that (or on any
+    other error) the error is raised rather than returning a short listing.
+
     Args:
         youtube: Authenticated YouTube API client
-        max_results: Maximum number of videos to retrieve (default 500)
+        max_results: Optional maximum number of videos to yield (default: all)
+        prefetch: If True, fetch the next page in the background
+        max_retries: Retries per page for transient errors
 
     Yields:
         Dict with video info: {'video_id': str, 'title': str, 'published_at': str}
@@ -465,19 +2096,16 @@ def list_youtube_uploads(youtube, max_results=500):
         print_status("Could not find uploads playlist", 'error')
         return
 
-    page_token = None
-    count = 0
-
-    while count < max_results:
-        try:
-            response = youtube.playlistItems().list(
-                playlistId=uploads_playlist_id,
-                part='snippet',
-                maxResults=min(50, max_results - count),
-                pageToken=page_token
-            ).execute()
+    pages = iter_playlist_pages(youtube, uploads_playlist_id, max_retries=max_retries)
+    if prefetch:
+        pages = prefetch_iterator(pages)
 
+    count = 0
+    try:
+        for response in pages:
             for item in response.get('items', []):
+                if max_results is not None and count >= max_results:
+                    return
                 snippet = item.get('snippet', {})
                 yield {
                     'video_id': snippet.get('resourceId', {}).get('videoId'),
@@ -485,114 +2113,331 @@ def list_youtube_uploads(youtube, max_results=500):
                     'published_at': snippet.get('publishedAt')
                 }
                 count += 1
+    except Exception as e:
+        print_status(f"Error listing videos: {str(e)[:100]}", 'error')
+        raise
+    finally:
+        close = getattr(pages, 'close', None)
+        if close:
+            close()
 
-            page_token = response.get('nextPageToken')
-            if not page_token:
-                break
 
-        except Exception as e:
-            print_status(f"Error listing videos: {str(e)[:100]}", 'error')
-            break
+def list_new_youtube_uploads(youtube, known_video_ids, newest_published_at=None):
+    """List uploads newest first, stopping at the first already-audited video.
+
+    The uploads playlist is ordered newest first, so once a video reconciled
+    by an earlier audit (and not newer than the audit cursor) comes up, the
+    rest was seen before and no further pages are requested. Page prefetch
+    is only used without a cursor, where every page is needed anyway.
+
+    Args:
+        youtube: Authenticated YouTube API client
+        known_video_ids: Video ids reconciled by earlier audits
+        newest_published_at: Newest publishedAt among them (ISO 8601), or None
+
+    Yields:
+        Video dicts as from list_youtube_uploads()
+    """
+    for video in list_youtube_uploads(youtube, prefetch=not known_video_ids):
+        if video['video_id'] in known_video_ids and (
+            newest_published_at is None or (video['published_at'] or '') <= newest_published_at
+        ):
+            return
+        yield video
+
+
+# ============================================================================
+# TITLE MATCHING - Inverted index from YouTube titles back to local fbids
+# ============================================================================
+
+TITLE_DATE_PREFIX = re.compile(r'^\s*\[(\d{4}-\d{2}-\d{2})\]')
+# YouTube cuts titles at 100 characters; only titles that long (give or
+# take a trimmed trailing word break) are matched as prefixes, and never
+# on fewer normalized characters than TITLE_PREFIX_MIN_LENGTH
+YOUTUBE_TITLE_MAX_LENGTH = 100
+TITLE_TRIM_SLACK = 3
+TITLE_PREFIX_MIN_LENGTH = 20
+TITLE_FUZZY_MIN_SCORE = 0.6
+# Candidate lookup only walks this many of the rarest n-grams of a title
+TITLE_FUZZY_PROBE_GRAMS = 3
+
+
+def title_grams(title):
+    """Return the token unigrams and bigrams of a title (video_signature() alphabet)."""
+    tokens = [token for token in re.split(r'[^a-z0-9]+', title.lower()) if token]
+    return set(tokens) | {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+
+
+def title_guard(title):
+    """Return (date prefix or None, numbers after it) of a title.
+
+    Similar-title matches must agree on both: "Parte 1" and "Parte 2", or
+    the same talk on two dates, are different videos however alike.
+    """
+    date = TITLE_DATE_PREFIX.match(title)
+    rest = title[date.end():] if date else title
+    return (date.group(1) if date else None), tuple(int(number) for number in re.findall(r'\d+', rest))
+
+
+class TitleMatch:
+    """Outcome of matching one YouTube title; fbid is None when unmatched."""
+
+    __slots__ = ('fbid', 'title', 'reason', 'score')
+
+    def __init__(self, fbid, title, reason, score=None):
+        self.fbid = fbid
+        self.title = title  # local title that matched, if any
+        self.reason = reason
+        self.score = score
+
 
+class TitleIndex:
+    """Inverted index over local titles for matching YouTube uploads.
 
-def build_title_to_fbid_map(verbose=False):
+    Titles are keyed by the video_signature() normalization, the
+    [YYYY-MM-DD] date prefix and token n-grams, so exact, re-encoded,
+    trimmed and slightly edited titles resolve without comparing every
+    pair. Matching tries, in order: the exact title, the normalized key, a
+    normalized prefix (only for titles at YouTube's length limit), then
+    n-gram similarity among candidates sharing the date or the rarest
+    n-grams. Prefix and similar-title candidates must carry the same
+    [YYYY-MM-DD] prefix (when the YouTube title has one) and the same
+    numbers, see title_guard(). Ties are broken by title and fbid so
+    results are deterministic.
+    """
+
+    def __init__(self, title_to_fbid):
+        self.title_to_fbid = dict(title_to_fbid)
+        self.by_key = {}
+        self.by_date = {}
+        self.by_gram = {}
+        self.grams = {}
+        self.guards = {}
+        for title in sorted(self.title_to_fbid):
+            self.by_key.setdefault(normalize_title_key(title), []).append(title)
+            date = TITLE_DATE_PREFIX.match(title)
+            if date:
+                self.by_date.setdefault(date.group(1), []).append(title)
+            grams = title_grams(title)
+            self.grams[title] = grams
+            self.guards[title] = title_guard(title)
+            for gram in grams:
+                self.by_gram.setdefault(gram, []).append(title)
+        self.sorted_keys = sorted(self.by_key)
+
+    def _unique(self, titles, reason, score=None):
+        fbids = sorted({self.title_to_fbid[title] for title in titles})
+        if len(fbids) == 1:
+            return TitleMatch(fbids[0], titles[0], reason, score)
+        return TitleMatch(None, None, f"ambiguous {reason}: fbids {', '.join(fbids[:3])}", score)
+
+    def _prefix_titles(self, key):
+        titles = []
+        position = bisect.bisect_left(self.sorted_keys, key)
+        while position < len(self.sorted_keys) and self.sorted_keys[position].startswith(key):
+            titles.extend(self.by_key[self.sorted_keys[position]])
+            position += 1
+        return titles
+
+    def _guarded(self, title, candidates, trimmed=False):
+        """Keep candidates agreeing with the title's date prefix and numbers.
+
+        A trimmed title only shows the leading numbers, and its last one may
+        have been cut mid-digits.
+        """
+        date, numbers = title_guard(title)
+        kept = []
+        for candidate in candidates:
+            candidate_date, candidate_numbers = self.guards[candidate]
+            if date is not None and candidate_date != date:
+                continue
+            if not trimmed:
+                if candidate_numbers != numbers:
+                    continue
+            elif numbers and not (
+                len(candidate_numbers) >= len(numbers)
+                and candidate_numbers[:len(numbers) - 1] == numbers[:-1]
+                and str(candidate_numbers[len(numbers) - 1]).startswith(str(numbers[-1]))
+            ):
+                continue
+            kept.append(candidate)
+        return kept
+
+    def _candidates(self, title, grams):
+        date = TITLE_DATE_PREFIX.match(title)
+        if date and date.group(1) in self.by_date:
+            return self.by_date[date.group(1)]
+        probes = sorted((gram for gram in grams if gram in self.by_gram),
+                        key=lambda gram: (len(self.by_gram[gram]), gram))
+        candidates = set()
+        for gram in probes[:TITLE_FUZZY_PROBE_GRAMS]:
+            candidates.update(self.by_gram[gram])
+        return candidates
+
+    def match(self, title):
+        """Return a TitleMatch saying which fbid a YouTube title belongs to and why."""
+        if not title:
+            return TitleMatch(None, None, "no title")
+        if title in self.title_to_fbid:
+            return TitleMatch(self.title_to_fbid[title], title, "exact title", 1.0)
+        key = normalize_title_key(title)
+        if key in self.by_key:
+            return self._unique(self.by_key[key], "normalized title", 1.0)
+        if (len(title.rstrip()) >= YOUTUBE_TITLE_MAX_LENGTH - TITLE_TRIM_SLACK
+                and len(key) >= TITLE_PREFIX_MIN_LENGTH):
+            prefixed = self._guarded(title, self._prefix_titles(key), trimmed=True)
+            if prefixed:
+                score = len(key) / len(normalize_title_key(prefixed[0]))
+                return self._unique(prefixed, "trimmed title (normalized prefix)", score)
+
+        grams = title_grams(title)
+        if not grams:
+            return TitleMatch(None, None, "title has no letters or digits")
+        candidates = self._candidates(title, grams)
+        if not candidates:
+            return TitleMatch(None, None, "no local title shares its date or words")
+        candidates = self._guarded(title, candidates)
+        if not candidates:
+            return TitleMatch(None, None, "no similar local title with the same date and numbers")
+        scored = sorted(
+            (-len(grams & self.grams[candidate]) / len(grams | self.grams[candidate]), candidate)
+            for candidate in candidates
+        )
+        best_score, best_title = -scored[0][0], scored[0][1]
+        if best_score < TITLE_FUZZY_MIN_SCORE:
+            return TitleMatch(None, None, f"closest local title scored {best_score:.2f}: {best_title[:40]}", best_score)
+        tied = [candidate for score, candidate in scored if -score == best_score]
+        return self._unique(tied, "similar title", best_score)
+
+
+def build_title_to_fbid_map(verbose=False, jobs=1):
     """Build a mapping from video titles to fbids by scanning all inbox zips.
 
     Args:
         verbose: If True, show detailed progress
+        jobs: Worker processes used to parse zips missing from the inbox index
 
     Returns:
-        Dict mapping title strings to fbid strings
+        Dict mapping title strings to fbid strings. Zips are merged in sorted
+        order, so a title found in a later zip wins.
     """
     title_to_fbid = {}
     processed_zips = []
+    inbox_path = get_inbox_path()
 
-    if not os.path.exists(INBOX_PATH):
-        print_status(f"Inbox path not found: {INBOX_PATH}", 'warning')
+    if not os.path.exists(inbox_path):
+        print_status(f"Inbox path not found: {inbox_path}", 'warning')
         return title_to_fbid
 
     # Find all zip files in inbox
-    zip_files = [f for f in os.listdir(INBOX_PATH) if f.endswith('.zip')]
+    zip_files = sorted(f for f in os.listdir(inbox_path) if f.endswith('.zip'))
 
     if verbose:
-        print_status(f"Scanning {len(zip_files)} zip file(s) in inbox...", 'info')
-
-    for zip_name in zip_files:
-        zip_path = os.path.join(INBOX_PATH, zip_name)
-
-        try:
-            with extract_zip(zip_path) as temp_dir:
-                metadata_path = find_metadata_in_extracted(temp_dir)
-                if not metadata_path:
-                    if verbose:
-                        print_status(f"  {zip_name}: no metadata found", 'warning')
-                    continue
+        print_status(f"Scanning {len(zip_files)} zip file(s) in inbox (jobs={jobs})...", 'info')
 
-                entries = read_json_file(metadata_path)
+    zip_paths = [os.path.join(inbox_path, zip_name) for zip_name in zip_files]
+    scans = scan_zips_with_index(zip_paths, jobs=jobs)
 
-                for entry in entries:
-                    fbid = extract_fbid(entry)
-                    if not fbid:
-                        continue
-
-                    title = extract_video_title(entry)
-                    if title:
-                        title_to_fbid[title] = fbid
-
-                if verbose:
-                    print_status(f"  {zip_name}: found {len(entries)} entries", 'info')
-                processed_zips.append(zip_name)
-
-        except zipfile.BadZipFile:
+    for zip_name, zip_path in zip(zip_files, zip_paths):
+        scan = scans[zip_path]
+        if isinstance(scan, zipfile.BadZipFile):
             if verbose:
                 print_status(f"  {zip_name}: corrupted zip", 'error')
-        except Exception as e:
+            continue
+        if isinstance(scan, Exception):
             if verbose:
-                print_status(f"  {zip_name}: {str(e)[:50]}", 'error')
+                print_status(f"  {zip_name}: {str(scan)[:50]}", 'error')
+            continue
+        if not scan["metadata_member"]:
+            if verbose:
+                print_status(f"  {zip_name}: no metadata found", 'warning')
+            continue
+
+        for record in scan["entries"]:
+            if record["fbid"] and record["title"]:
+                title_to_fbid[record["title"]] = record["fbid"]
+
+        if verbose:
+            print_status(f"  {zip_name}: found {len(scan['entries'])} entries", 'info')
+        processed_zips.append(zip_name)
 
     return title_to_fbid
 
 
-def audit_registry(dry_run=False, verbose=False):
+def audit_registry(dry_run=False, verbose=False, jobs=1, full=False):
     """Audit and rebuild registry by matching YouTube uploads to local metadata.
 
     This function:
     1. Authenticates with YouTube
-    2. Lists all videos on the channel
+    2. Lists videos on the channel, newest first, down to the audit cursor
     3. Scans inbox zips for title-to-fbid mapping
     4. Matches YouTube titles to local fbids
-    5. Updates registry with matched fbids
+    5. Updates registry with matched fbids and the audit cursor
+
+    The cursor is the set of video ids already reconciled (matched or found
+    in the registry) plus their newest publishedAt, so later audits stop
+    paginating once they reach known videos. Unmatched videos are not part
+    of it and are retried while they are newer than the cursor.
 
     Args:
         dry_run: If True, show what would be updated without saving
         verbose: If True, show detailed output
+        jobs: Worker processes used to parse inbox zips
+        full: If True, ignore the cursor and list every upload
     """
+    with collect_run_metrics('audit'):
+        return _audit_registry(dry_run, verbose, jobs, full)
+
+
+def _audit_registry(dry_run, verbose, jobs, full):
+    """Body of audit_registry()."""
     print_status("=== AUDIT MODE ===", 'info')
 
     if dry_run:
         print_status("DRY RUN - no changes will be saved", 'warning')
 
     # Load current registry
-    registry = load_registry(REGISTRY_PATH)
-    existing_fbids = set(registry.get("uploaded_fbids", []))
+    with closing(open_registry(REGISTRY_PATH)) as registry:
+        existing_fbids = set(registry.uploaded_fbids())
+        known_video_ids, newest_published_at = (set(), None) if full else registry.audit_cursor()
     print_status(f"Current registry has {len(existing_fbids)} fbid(s)", 'info')
 
     # Authenticate with YouTube
     print_status("Authenticating with YouTube...", 'info')
     youtube = authenticate_youtube()
 
-    # List all YouTube uploads
-    print_status("Fetching uploads from YouTube...", 'info')
-    youtube_videos = list(list_youtube_uploads(youtube))
+    # List YouTube uploads down to already-audited territory
+    if known_video_ids:
+        print_status(
+            f"Fetching uploads newer than the last audit ({len(known_video_ids)} reconciled, "
+            f"newest {newest_published_at}); use --full to list everything",
+            'info'
+        )
+    else:
+        print_status("Fetching uploads from YouTube...", 'info')
+    try:
+        with current_metrics().timer('list_uploads') as fields:
+            youtube_videos = list(list_new_youtube_uploads(youtube, known_video_ids, newest_published_at))
+            fields['videos'] = len(youtube_videos)
+    except Exception:
+        # A partial listing would mis-report matches; leave the registry as it is
+        print_status("Audit aborted: could not list every upload", 'error')
+        return
     print_status(f"Found {len(youtube_videos)} video(s) on YouTube", 'info')
 
     if not youtube_videos:
-        print_status("No videos found on channel", 'warning')
+        if known_video_ids:
+            print_status("No new videos since the last audit", 'info')
+        else:
+            print_status("No videos found on channel", 'warning')
         return
 
     # Build title-to-fbid map from local zips
     print_status("Building title map from inbox zips...", 'info')
-    title_to_fbid = build_title_to_fbid_map(verbose=verbose)
+    with current_metrics().timer('title_map', jobs=jobs) as fields:
+        title_to_fbid = build_title_to_fbid_map(verbose=verbose, jobs=jobs)
+        title_index = TitleIndex(title_to_fbid)
+        fields['titles'] = len(title_to_fbid)
     print_status(f"Found {len(title_to_fbid)} title-to-fbid mappings", 'info')
 
     # Match YouTube videos to fbids
@@ -603,17 +2448,20 @@ def audit_registry(dry_run=False, verbose=False):
     for video in youtube_videos:
         title = video['title']
         video_id = video['video_id']
-
-        # Check if title matches any local entry
-        if title in title_to_fbid:
-            fbid = title_to_fbid[title]
-
+        published_at = video['published_at']
+
+        # Resolve the title through the index (exact, normalized, trimmed or similar)
+        match = title_index.match(title)
+        if match.fbid:
+            fbid = match.fbid
+            result = {'title': title, 'fbid': fbid, 'video_id': video_id, 'published_at': published_at,
+                      'reason': match.reason}
             if fbid in existing_fbids:
-                already_in_registry.append({'title': title, 'fbid': fbid, 'video_id': video_id})
+                already_in_registry.append(result)
             else:
-                matched.append({'title': title, 'fbid': fbid, 'video_id': video_id})
+                matched.append(result)
         else:
-            unmatched.append({'title': title, 'video_id': video_id})
+            unmatched.append({'title': title, 'video_id': video_id, 'reason': match.reason})
 
     # Report results
     print(f"\n{'='*50}")
@@ -627,24 +2475,27 @@ def audit_registry(dry_run=False, verbose=False):
     if verbose and matched:
         print_status("\nNew matches:", 'success')
         for m in matched[:10]:
-            print(f"  + {m['fbid']}: {m['title'][:50]}")
+            print(f"  + {m['fbid']}: {m['title'][:50]} ({m['reason']})")
         if len(matched) > 10:
             print(f"  ... and {len(matched) - 10} more")
 
     if verbose and unmatched:
         print_status("\nUnmatched YouTube videos:", 'warning')
         for u in unmatched[:10]:
-            print(f"  ? {u['title'][:60]}")
+            print(f"  ? {(u['title'] or '')[:60]} ({u['reason']})")
         if len(unmatched) > 10:
             print(f"  ... and {len(unmatched) - 10} more")
 
-    # Update registry if not dry-run
+    # Update registry and audit cursor if not dry-run
+    if not dry_run:
+        with closing(open_registry(REGISTRY_PATH)) as registry, \
+                current_metrics().timer('registry_write', op='audit', fbids=len(matched)):
+            if matched:
+                registry.add_fbids([m['fbid'] for m in matched])
+            registry.record_audited_videos(
+                (v['video_id'], v['published_at']) for v in matched + already_in_registry if v['video_id']
+            )
     if matched and not dry_run:
-        for m in matched:
-            if m['fbid'] not in registry["uploaded_fbids"]:
-                registry["uploaded_fbids"].append(m['fbid'])
-
-        save_registry_atomic(REGISTRY_PATH, registry)
         print_status(f"\nRegistry updated with {len(matched)} new fbid(s)", 'success')
     elif matched and dry_run:
         print_status(f"\nDRY RUN: Would add {len(matched)} fbid(s) to registry", 'warning')
@@ -652,10 +2503,19 @@ def audit_registry(dry_run=False, verbose=False):
         print_status("\nNo new fbids to add", 'info')
 
 
-def record_upload(registry, fbid):
-    """Record a successful upload in the registry."""
+def record_upload(registry, fbid, fingerprint=None):
+    """Record a successful upload in the registry (legacy dict or registry store).
+
+    fingerprint: Optional (size, crc32, sha256) kept by registry stores for
+        content deduplication.
+    """
     today = datetime.date.today().isoformat()
 
+    if not isinstance(registry, dict):
+        with current_metrics().timer('registry_write', op='record_upload', fbid=fbid):
+            registry.record_upload(fbid, today, fingerprint=fingerprint)
+        return
+
     # Add fbid to uploaded list
     if fbid not in registry["uploaded_fbids"]:
         registry["uploaded_fbids"].append(fbid)
@@ -725,6 +2585,8 @@ def create_oauth_flow(client_secrets_file, scopes, timeout_seconds=60):
     Raises:
         TimeoutError: If user doesn't complete auth within timeout
     """
+    import google_auth_oauthlib.flow
+
     flow = google_auth_oauthlib.flow.InstalledAppFlow.from_client_secrets_file(
         client_secrets_file, scopes)
     print_status(f"You have {timeout_seconds} seconds to complete authentication...", 'info')
@@ -736,21 +2598,292 @@ def create_oauth_flow(client_secrets_file, scopes, timeout_seconds=60):
         raise
     return credentials
 
-# Build youtube API client
-def build_youtube_client(credentials):
-    import httplib2
+# ============================================================================
+# HTTP TRANSPORT - Pooled connections and shared credentials for API clients
+# ============================================================================
+
+class PooledHttp:
+    """Thread-safe stand-in for httplib2.Http backed by a pool of connections.
+
+    httplib2.Http is not thread-safe, so each request checks out its own
+    Http object and returns it afterwards. Idle objects are reused most
+    recently used first, which keeps their keep-alive connections warm, and
+    at most `size` requests run at once (others wait for a free slot).
+    """
+
+    def __init__(self, size=None, timeout=300):
+        self.size = max(size or config.http_pool_size, 1)
+        self.timeout = timeout
+        # Resumable uploads use HTTP 308 as progress, so googleapiclient must
+        # see that response instead of httplib2 treating it as a redirect.
+        self.follow_redirects = False
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self.created = 0
+
+    def _new_http(self):
+        import httplib2
+        http = httplib2.Http(timeout=self.timeout)
+        http.follow_redirects = self.follow_redirects
+        with self._lock:
+            self.created += 1
+        return http
+
+    @contextmanager
+    def connection(self):
+        """Check out one Http object for the calling thread."""
+        with self._slots:
+            try:
+                http = self._idle.get_nowait()
+            except queue.Empty:
+                http = self._new_http()
+            try:
+                yield http
+            finally:
+                self._idle.put(http)
+
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        """Same interface as httplib2.Http.request."""
+        with self.connection() as http:
+            return http.request(uri, method, body=body, headers=headers, **kwargs)
+
+    def close(self):
+        while True:
+            try:
+                http = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            http.close()
+
+
+# Background refresher: how often it re-checks the expiry, and how long it
+# waits before retrying a failed refresh
+CREDENTIAL_REFRESH_POLL_SECONDS = 60
+CREDENTIAL_REFRESH_RETRY_SECONDS = 30
+
+# Credentials with a running background refresher (see stop_credential_refresh())
+_auto_refreshing = set()
+_auto_refreshing_lock = threading.Lock()
+
+
+class SharedCredentials:
+    """Credentials wrapper that refreshes at most once across threads.
+
+    Every worker sends requests with the same credentials. When several
+    notice an expired token (or get a 401) at the same time, the first
+    refreshes under the lock and the others reuse its new token.
+
+    With start_auto_refresh() a background thread refreshes the token
+    TOKEN_REFRESH_MARGIN seconds before it expires, so uploads in flight
+    keep a valid token instead of refreshing between chunks. Refreshed
+    tokens are saved to token_file when one is given.
+    """
+
+    def __init__(self, credentials, token_file=None):
+        self.credentials = credentials
+        self.token_file = token_file
+        self.lock = threading.RLock()
+        self.refreshed_at = float('-inf')
+        self.refresh_thread = None
+        self.stop_event = threading.Event()
+
+    def __getattr__(self, name):
+        return getattr(self.credentials, name)
+
+    def refresh(self, request):
+        waiting_since = time.monotonic()
+        with self.lock:
+            if self.refreshed_at > waiting_since and self.credentials.valid:
+                return  # Another thread refreshed while this one waited
+            self.credentials.refresh(request)
+            self.refreshed_at = time.monotonic()
+            if self.token_file:
+                try:
+                    save_credentials(self.credentials, self.token_file)
+                except OSError as e:
+                    print_status(f"Could not save refreshed token: {str(e)[:50]}", 'warning')
+
+    def before_request(self, request, method, url, headers):
+        if not self.credentials.valid:
+            self.refresh(request)
+        self.credentials.before_request(request, method, url, headers)
+
+    def seconds_until_refresh(self, margin):
+        """Seconds until the token is `margin` seconds from expiry, or None if
+        it cannot be refreshed (no expiry or no refresh token)."""
+        expiry = getattr(self.credentials, 'expiry', None)
+        if not isinstance(expiry, datetime.datetime) or not getattr(self.credentials, 'refresh_token', None):
+            return None
+        if expiry.tzinfo is None:
+            # google-auth keeps expiry as naive UTC
+            expiry = expiry.replace(tzinfo=datetime.timezone.utc)
+        now = datetime.datetime.now(datetime.timezone.utc)
+        return (expiry - now).total_seconds() - margin
+
+    def start_auto_refresh(self, margin=None):
+        """Refresh the token in a daemon thread shortly before each expiry."""
+        margin = config.token_refresh_margin if margin is None else margin
+        if self.refresh_thread is not None or self.seconds_until_refresh(margin) is None:
+            return False
+        self.stop_event.clear()
+        self.refresh_thread = threading.Thread(
+            target=self._auto_refresh_loop, args=(margin,), name='credential-refresh', daemon=True
+        )
+        self.refresh_thread.start()
+        with _auto_refreshing_lock:
+            _auto_refreshing.add(self)
+        return True
+
+    def stop_auto_refresh(self):
+        if self.refresh_thread is not None:
+            self.stop_event.set()
+            self.refresh_thread.join()
+            self.refresh_thread = None
+        with _auto_refreshing_lock:
+            _auto_refreshing.discard(self)
+
+    def _auto_refresh_loop(self, margin):
+        from google.auth.transport.requests import Request
+
+        while not self.stop_event.is_set():
+            # Re-read the expiry every time: a worker may have refreshed it
+            delay = self.seconds_until_refresh(margin)
+            if delay is None:
+                return
+            if delay > 0:
+                self.stop_event.wait(min(delay, CREDENTIAL_REFRESH_POLL_SECONDS))
+                continue
+            try:
+                self.refresh(Request())
+            except Exception as e:
+                print_status(f"Background token refresh failed: {str(e)[:50]}", 'warning')
+                self.stop_event.wait(CREDENTIAL_REFRESH_RETRY_SECONDS)
+
+
+def stop_credential_refresh():
+    """Stop every background token refresher (called when main() exits)."""
+    with _auto_refreshing_lock:
+        running = list(_auto_refreshing)
+    for credentials in running:
+        credentials.stop_auto_refresh()
+
+
+def make_authorized_http(credentials, pool_size=None):
+    """Return an AuthorizedHttp over a connection pool and shared credentials."""
     from google_auth_httplib2 import AuthorizedHttp
-    
-    # Create HTTP client with longer timeout and authorize it with credentials.
-    # Resumable uploads use HTTP 308 as progress, so googleapiclient must see
-    # that response instead of httplib2 treating it as a redirect.
-    http = httplib2.Http(timeout=300)  # 5 minutes timeout
-    http.follow_redirects = False
-    authorized_http = AuthorizedHttp(credentials, http=http)
-    
+
+    if not isinstance(credentials, SharedCredentials):
+        credentials = SharedCredentials(credentials)
+    return AuthorizedHttp(credentials, http=PooledHttp(pool_size))
+
+
+# ============================================================================
+# DISCOVERY DOCUMENT - On-disk cache of the YouTube API description
+# ============================================================================
+
+DISCOVERY_URL = 'https://www.googleapis.com/discovery/v1/apis/youtube/{version}/rest'
+DISCOVERY_CACHE_DIR = os.path.join(SCRIPT_DIR, 'discovery_cache')
+
+# (mode, version) -> document text, so rebuilt clients skip the disk too
+_discovery_documents = {}
+
+
+def discovery_cache_path(version):
+    """Return the cache file for a YouTube API version."""
+    return os.path.join(DISCOVERY_CACHE_DIR, f'youtube.{version}.json')
+
+
+def load_static_discovery_document(version):
+    """Return the YouTube discovery document bundled with googleapiclient."""
+    from googleapiclient.discovery_cache import get_static_doc
+
+    document = get_static_doc('youtube', version)
+    if document is None:
+        raise RuntimeError(f"No bundled discovery document for youtube {version}")
+    return document
+
+
+def fetch_discovery_document(version, http):
+    """Download the current discovery document; raises on HTTP or JSON errors."""
+    response, content = http.request(DISCOVERY_URL.format(version=version))
+    if response.status != 200:
+        raise RuntimeError(f"Discovery fetch failed with HTTP {response.status}")
+    document = content.decode('utf-8') if isinstance(content, bytes) else content
+    if 'rootUrl' not in json.loads(document):
+        raise RuntimeError("Discovery response is not an API description")
+    return document
+
+
+def load_cached_discovery_document(version, http, ttl_seconds):
+    """Return the on-disk document, refreshing it once it is older than the TTL.
+
+    A failed refresh keeps using the stale copy; with no copy at all the
+    bundled document is used, so client construction never needs network.
+    """
+    cache_path = discovery_cache_path(version)
+    try:
+        age = time.time() - os.path.getmtime(cache_path)
+    except OSError:
+        age = None
+    if age is not None and age < ttl_seconds:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    try:
+        document = fetch_discovery_document(version, http)
+    except Exception as e:
+        if age is not None:
+            print_status(f"Discovery refresh failed ({str(e)[:60]}); using cached copy", 'warning')
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        print_status(f"Discovery fetch failed ({str(e)[:60]}); using bundled document", 'warning')
+        return load_static_discovery_document(version)
+    write_file_atomic(cache_path, document)
+    return document
+
+
+def get_discovery_document(version, http, mode=None):
+    """Return the discovery document text for DISCOVERY_MODE, or None for 'live'.
+
+    DISCOVERY_MODE:
+        'cache':  on-disk copy under discovery_cache/, refreshed after
+                  DISCOVERY_CACHE_TTL_HOURS (default)
+        'static': document bundled with googleapiclient (fully offline)
+        'live':   let discovery.build() resolve it on every run
+    """
+    mode = mode or config.discovery_mode
+    if mode == 'live':
+        return None
+    if mode not in ('cache', 'static'):
+        raise ValueError(f"Unknown DISCOVERY_MODE: {mode!r} (expected 'cache', 'static' or 'live')")
+    key = (mode, version)
+    if key not in _discovery_documents:
+        if mode == 'static':
+            _discovery_documents[key] = load_static_discovery_document(version)
+        else:
+            ttl_seconds = config.discovery_cache_ttl_hours * 3600
+            _discovery_documents[key] = load_cached_discovery_document(version, http, ttl_seconds)
+    return _discovery_documents[key]
+
+
+# Build youtube API client
+def build_youtube_client(credentials, pool_size=None):
+    """Build a YouTube client that is safe to share between threads.
+
+    Requests go through make_authorized_http(), so concurrent calls each get
+    their own pooled connection (5 minute timeout, no redirect following).
+    The API description comes from get_discovery_document().
+    """
+    from googleapiclient import discovery
+
+    authorized_http = make_authorized_http(credentials, pool_size)
+    document = get_discovery_document(config.youtube_api_version, authorized_http)
+    if document is not None:
+        return discovery.build_from_document(document, http=authorized_http)
+
     youtube = discovery.build(
         "youtube", 
-        youtube_api_version, 
+        config.youtube_api_version, 
         http=authorized_http,
         cache_discovery=False
     )
@@ -758,8 +2891,13 @@ def build_youtube_client(credentials):
 
 # Save credentials to token file
 def save_credentials(credentials, token_file):
-    with open(token_file, 'wb') as token:
-        pickle.dump(credentials, token)
+    """Atomically replace token_file, so a crash never leaves a torn token.
+
+    The temp file from mkstemp() is created owner-only (0600).
+    """
+    if isinstance(credentials, SharedCredentials):
+        credentials = credentials.credentials
+    write_file_atomic(token_file, pickle.dumps(credentials))
 
 # Load existing credentials from token file
 def load_credentials(token_file):
@@ -775,6 +2913,8 @@ def load_credentials(token_file):
 # Check if credentials are valid and refresh if needed
 def refresh_credentials_if_needed(credentials, token_file_path):
     if credentials and credentials.expired and credentials.refresh_token:
+        from google.auth.transport.requests import Request
+
         try:
             credentials.refresh(Request())
         except Exception as e:
@@ -784,32 +2924,56 @@ def refresh_credentials_if_needed(credentials, token_file_path):
             if os.path.exists(token_file_path):
                 os.remove(token_file_path)
             return None
+        save_credentials(credentials, token_file_path)
     return credentials
 
-# Returns an authenticated YouTube API client with persistent token storage
-def authenticate_youtube():
-    os.environ["OAUTHLIB_INSECURE_TRANSPORT"] = enable_oauth_insecure_transport
+# Returns valid OAuth credentials with persistent token storage, kept
+# fresh by a background refresher (see SharedCredentials)
+def authenticate_youtube_credentials():
+    force_ipv4()
+    os.environ["OAUTHLIB_INSECURE_TRANSPORT"] = config.enable_oauth_insecure_transport
     
     # Try to load existing credentials
-    credentials = load_credentials(token_file)
+    credentials = load_credentials(config.token_file)
     
     # Refresh credentials if they exist but are expired
     if credentials:
-        credentials = refresh_credentials_if_needed(credentials, token_file)
+        credentials = refresh_credentials_if_needed(credentials, config.token_file)
     
     # If no valid credentials exist, run OAuth flow
     if not credentials or not credentials.valid:
         print("No valid credentials found. Starting OAuth flow...")
-        credentials = create_oauth_flow(client_secrets_file, scopes)
+        credentials = create_oauth_flow(config.client_secrets_file, config.scopes)
         # Save credentials for future use
-        save_credentials(credentials, token_file)
+        save_credentials(credentials, config.token_file)
         print("Credentials saved for future use.")
     else:
         print("Using existing credentials.")
-    
+    credentials = SharedCredentials(credentials, token_file=config.token_file)
+    credentials.start_auto_refresh()
+    return credentials
+
+# Returns an authenticated YouTube API client with persistent token storage
+def authenticate_youtube():
+    credentials = authenticate_youtube_credentials()
     youtube = build_youtube_client(credentials)
     return youtube
 
+
+def make_youtube_client_factory(workers=1):
+    """Return a callable that gives upload worker threads a YouTube client.
+
+    With several workers one client is shared: its pooled transport has a
+    connection for every worker plus the main thread, and refreshes the
+    shared credentials once under a lock.
+    """
+    if workers <= 1:
+        youtube = authenticate_youtube()
+    else:
+        credentials = authenticate_youtube_credentials()
+        youtube = build_youtube_client(credentials, pool_size=max(config.http_pool_size, workers + 1))
+    return lambda: youtube
+
 # Extract the video filename from an entry
 def extract_video_filename(entry):
     video_lv = next((lv for lv in entry.get('label_values', []) if lv.get('label') == 'Video'), None)
@@ -834,7 +2998,7 @@ def extract_video_title(entry, include_timestamp=True):
     """
     title = extract_label_value(entry, 'Title')
     if not title:  # for videos with no titles
-        title = default_title
+        title = config.default_title
     # Fix Facebook's broken UTF-8 encoding
     title = fix_facebook_encoding(title)
 
@@ -849,23 +3013,16 @@ def extract_video_title(entry, include_timestamp=True):
 
 # Extract metadata to build mapping of filenames to titles from the JSON file
 def build_title_map(json_file):
-    # Open and parse the JSON file
-    entries = read_json_file(json_file)
     # Build mapping
     title_map = {}
     
-    # Loop through each entry
-    for entry in entries:
-        # Extract the video filename
-        filename = extract_video_filename(entry)
-        if not filename:
+    # Stream entries from the JSON file (each parsed once)
+    for _, entry in iter_live_entries(json_file):
+        if not entry.filename:
             continue
-            
-        # Extract the title
-        title = extract_video_title(entry)
-        
+
         # Build mapping
-        title_map[filename] = title
+        title_map[entry.filename] = entry.title
     
     return title_map
 
@@ -873,7 +3030,7 @@ def build_title_map(json_file):
 def get_pending_videos(videos_dir, uploaded_list, title_map):
     pending = []
     for filename in sorted(os.listdir(videos_dir)):
-        if not filename.lower().endswith(tuple(video_file_extensions)):
+        if not filename.lower().endswith(tuple(config.video_file_extensions)):
             continue
         if filename in uploaded_list:
             continue
@@ -886,76 +3043,542 @@ def get_pending_videos(videos_dir, uploaded_list, title_map):
 # Upload a single video and print progress
 def get_effective_upload_chunk_size():
     """Return a resumable upload chunk size; -1 is too fragile for large videos."""
-    if upload_chunk_size and upload_chunk_size > 0:
-        return upload_chunk_size
+    if config.upload_chunk_size and config.upload_chunk_size > 0:
+        return config.upload_chunk_size
     return 8 * 1024 * 1024
 
 
+# Resumable upload chunks must be multiples of 256 KiB (except the last one)
+UPLOAD_CHUNK_ALIGNMENT = 256 * 1024
+
+
+def align_chunk_size(size):
+    """Round down to a 256 KiB multiple, never below one alignment unit."""
+    return max(UPLOAD_CHUNK_ALIGNMENT, int(size) // UPLOAD_CHUNK_ALIGNMENT * UPLOAD_CHUNK_ALIGNMENT)
+
+
+class AdaptiveChunkSizer:
+    """Pick the next resumable chunk size from measured per-chunk throughput.
+
+    After each chunk the size is steered so a chunk takes about
+    target_seconds at the measured throughput: at most doubling per step,
+    and only after two consecutive successful chunks (a stable link). A
+    retryable error halves it, so less progress is lost per failure on
+    flaky links. Sizes stay 256 KiB multiples within [min_size, max_size].
+    """
+
+    def __init__(self, initial=None, min_size=None, max_size=None, target_seconds=None):
+        self.min_size = align_chunk_size(config.upload_chunk_min if min_size is None else min_size)
+        self.max_size = max(self.min_size, align_chunk_size(config.upload_chunk_max if max_size is None else max_size))
+        self.target_seconds = config.upload_chunk_target_seconds if target_seconds is None else target_seconds
+        initial = get_effective_upload_chunk_size() if initial is None else initial
+        self.size = self._clamp(initial)
+        self.stable_chunks = 0
+        self.last_throughput = None  # bytes/second of the last chunk
+        self.last_latency = None  # wall seconds of the last chunk round-trip
+
+    def _clamp(self, size):
+        return min(self.max_size, max(self.min_size, align_chunk_size(size)))
+
+    def record_chunk(self, sent_bytes, seconds):
+        """Account for a successfully acknowledged chunk."""
+        self.last_latency = seconds
+        if sent_bytes <= 0 or seconds <= 0:
+            return self.size
+        self.last_throughput = sent_bytes / seconds
+        self.stable_chunks += 1
+        wanted = self.last_throughput * self.target_seconds
+        if wanted > self.size and self.stable_chunks < 2:
+            return self.size
+        self.size = self._clamp(min(wanted, self.size * 2))
+        return self.size
+
+    def record_error(self):
+        """Shrink after a retryable error."""
+        self.stable_chunks = 0
+        self.size = self._clamp(self.size // 2)
+        return self.size
+
+
+class UploadSession:
+    """Persist a video's resumable upload session in the registry store.
+
+    The session URI and the last byte offset YouTube confirmed are saved per
+    fbid after every chunk, so a run that dies mid-upload continues from
+    that offset next time instead of re-sending the whole video.
+    """
+
+    def __init__(self, registry, fbid, size=None):
+        self.registry = registry
+        self.fbid = fbid
+        self.size = size
+        self.saved = None  # (session_uri, offset) last written to the registry
+
+    def resume(self, request):
+        """Point a fresh upload request at the saved session, if any.
+
+        The request then asks YouTube for the confirmed offset on its first
+        next_chunk() call and continues from there. Returns the saved offset.
+        """
+        saved = self.registry.get_upload_session(self.fbid)
+        if not saved:
+            return 0
+        if self.size is not None and saved["size"] is not None and saved["size"] != self.size:
+            # The source video changed; the old session cannot be continued
+            self.discard()
+            return 0
+        request.resumable_uri = saved["session_uri"]
+        request.resumable_progress = saved["offset"]
+        request._in_error_state = True
+        self.saved = (saved["session_uri"], saved["offset"])
+        return saved["offset"]
+
+    def checkpoint(self, request):
+        """Save the request's session URI and confirmed offset if they changed."""
+        current = (request.resumable_uri, request.resumable_progress)
+        if current[0] and current != self.saved:
+            with current_metrics().timer('registry_write', log=False):
+                self.registry.save_upload_session(self.fbid, current[0], current[1], self.size)
+            self.saved = current
+
+    def discard(self):
+        self.registry.clear_upload_session(self.fbid)
+        self.saved = None
+
+
+def is_expired_upload_session(error):
+    """Return True when YouTube no longer knows the resumable session URI."""
+    return http_error_status(error) in (404, 410)
+
+
 def is_retryable_upload_error(error):
     """Return True for transient upload errors worth retrying."""
-    if isinstance(error, googleapiclient.errors.HttpError):
-        return error.resp.status in [500, 502, 503, 504]
+    status = http_error_status(error)
+    if status is not None:
+        return status in [500, 502, 503, 504]
     return isinstance(error, (TimeoutError, socket.timeout, OSError))
 
 
+# ============================================================================
+# BANDWIDTH SHAPING - Shared token bucket with a time-of-day schedule
+# ============================================================================
+
+class BandwidthSchedule:
+    """Upload rate limit by local time of day.
+
+    Windows come from UPLOAD_BANDWIDTH_SCHEDULE; outside every window the
+    UPLOAD_BANDWIDTH_LIMIT default applies. Rates are in Mbit/s, None is
+    unlimited. E.g. UPLOAD_BANDWIDTH_LIMIT=5 with
+    UPLOAD_BANDWIDTH_SCHEDULE=00:00-07:00=unlimited.
+    """
+
+    def __init__(self, windows, default_mbits=None):
+        self.windows = windows
+        self.default_mbits = default_mbits or None
+
+    @property
+    def limited(self):
+        return self.default_mbits is not None or any(mbits for _, _, mbits in self.windows)
+
+    def mbits_at(self, moment):
+        minute = moment.hour * 60 + moment.minute
+        for start, end, mbits in self.windows:
+            inside = start <= minute < end if start <= end else (minute >= start or minute < end)
+            if inside:
+                return mbits
+        return self.default_mbits
+
+    def bytes_per_second_at(self, moment):
+        mbits = self.mbits_at(moment)
+        return None if mbits is None else mbits * 1000 * 1000 / 8
+
+
+class BandwidthLimiter:
+    """Token bucket shared by every upload thread.
+
+    Each read of media data takes its size from the bucket, which refills
+    at the scheduled rate with up to one second of burst. A read may drive
+    the bucket negative; the reader then sleeps off the debt outside the
+    lock, so concurrent uploads queue up behind each other and their
+    combined rate stays at the limit. A resumable chunk is read whole and
+    then sent at line speed, so uploads keep chunks at chunk_size_cap().
+    """
+
+    def __init__(self, schedule, clock=time.monotonic, sleep=time.sleep, now=datetime.datetime.now):
+        self.schedule = schedule
+        self.clock = clock
+        self.sleep = sleep
+        self.now = now
+        self.lock = threading.Lock()
+        self.tokens = 0.0
+        self.updated = clock()
+
+    def chunk_size_cap(self):
+        """Return the largest chunk to send now (about one second at the
+        scheduled rate, 256 KiB aligned), or None while unlimited."""
+        rate = self.schedule.bytes_per_second_at(self.now())
+        return None if rate is None else align_chunk_size(rate)
+
+    def consume(self, nbytes):
+        """Account for nbytes about to be sent, sleeping to hold the rate."""
+        rate = self.schedule.bytes_per_second_at(self.now())
+        with self.lock:
+            now = self.clock()
+            elapsed = now - self.updated
+            self.updated = now
+            if rate is None:
+                self.tokens = 0.0
+                return 0.0
+            self.tokens = min(rate, self.tokens + elapsed * rate) - nbytes
+            wait = -self.tokens / rate if self.tokens < 0 else 0.0
+        if wait:
+            self.sleep(wait)
+        return wait
+
+
+class ThrottledStream:
+    """File object wrapper whose reads are paced by a BandwidthLimiter."""
+
+    def __init__(self, stream, limiter):
+        self.stream = stream
+        self.limiter = limiter
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+    def read(self, size=-1):
+        data = self.stream.read(size)
+        if data:
+            self.limiter.consume(len(data))
+        return data
+
+
+_upload_bandwidth_limiter = None
+_upload_bandwidth_limiter_lock = threading.Lock()
+
+
+def get_upload_bandwidth_limiter():
+    """Return the process-wide limiter, or None when uploads are never limited."""
+    global _upload_bandwidth_limiter
+    with _upload_bandwidth_limiter_lock:
+        if _upload_bandwidth_limiter is None:
+            schedule = BandwidthSchedule(config.upload_bandwidth_schedule, config.upload_bandwidth_limit)
+            _upload_bandwidth_limiter = BandwidthLimiter(schedule) if schedule.limited else False
+        return _upload_bandwidth_limiter or None
+
+
 def make_upload_request(youtube, media_file, title):
+    import googleapiclient.http
+
     body = {
-        "snippet": {"categoryId": youtube_category_id, "title": title},
-        "status": {"privacyStatus": youtube_privacy_status}
+        "snippet": {"categoryId": config.youtube_category_id, "title": title},
+        "status": {"privacyStatus": config.youtube_privacy_status}
     }
 
     # Resumable uploads keep the same YouTube upload session across transient
     # network failures, preventing timeout retries from creating duplicates.
-    media_body = googleapiclient.http.MediaFileUpload(
-        media_file,
-        chunksize=get_effective_upload_chunk_size(),
-        resumable=True
-    )
+    if hasattr(media_file, 'read'):
+        # Already-open media source (e.g. a zip member); stream it as-is.
+        # A spool that rolled over to disk has an int fd as its name.
+        name = getattr(media_file, 'name', None)
+        mimetype = (mimetypes.guess_type(name)[0] if isinstance(name, str) else None) or 'video/mp4'
+        media_body = googleapiclient.http.MediaIoBaseUpload(
+            media_file,
+            mimetype=mimetype,
+            chunksize=get_effective_upload_chunk_size(),
+            resumable=True
+        )
+    else:
+        media_body = googleapiclient.http.MediaFileUpload(
+            media_file,
+            chunksize=get_effective_upload_chunk_size(),
+            resumable=True
+        )
+    limiter = get_upload_bandwidth_limiter()
+    if limiter is not None:
+        # MediaIoBaseUpload reads every chunk through its private _fd
+        media_body._fd = ThrottledStream(media_body._fd, limiter)
     return youtube.videos().insert(part="snippet,status", body=body, media_body=media_body)
 
 
-def perform_resumable_upload(request, title, max_retries=5):
+def perform_resumable_upload(request, title, max_retries=5, chunk_sizer=None, session=None):
     response = None
     retry_count = 0
+    total_retries = 0
+    chunks = 0
+    metrics = current_metrics()
+    upload_started = time.perf_counter()
+    offset = 0
+
+    # Continue a session left behind by an interrupted run
+    if session is not None:
+        offset = session.resume(request)
+        if offset:
+            print(f"Resuming upload for '{title}' from byte {offset}")
+
+    # Adapt the chunk size between chunks when the media supports it
+    # (MediaIoBaseUpload reads its private _chunksize for every chunk)
+    media = getattr(request, 'resumable', None)
+    chunked = isinstance(getattr(media, '_chunksize', None), int) and media._chunksize > 0
+    adaptive = chunked and (chunk_sizer is not None or config.upload_chunk_adaptive)
+    if adaptive and chunk_sizer is None:
+        chunk_sizer = AdaptiveChunkSizer(initial=media._chunksize)
+    chunk_size = media._chunksize if chunked else None
+    # While bandwidth is limited a chunk holds about one second of sending
+    limiter = get_upload_bandwidth_limiter() if chunked else None
 
     while response is None:
+        if adaptive:
+            chunk_size = chunk_sizer.size
+            progress_before = request.resumable_progress
+        if chunked:
+            cap = limiter.chunk_size_cap() if limiter is not None else None
+            media._chunksize = min(chunk_size, cap) if cap else chunk_size
+        started = time.monotonic()
+        chunk_started = time.perf_counter()
         try:
             status, response = request.next_chunk()
+            chunks += 1
+            metrics.observe('upload_chunk', time.perf_counter() - chunk_started, log=False)
             retry_count = 0
+            if adaptive:
+                progress_after = status.resumable_progress if status else media.size()
+                chunk_sizer.record_chunk(progress_after - progress_before, time.monotonic() - started)
             if status:
+                if session is not None:
+                    session.checkpoint(request)
                 print(f"Uploading '{title}': {int(status.progress() * 100)}%")
         except Exception as e:
+            if session is not None and session.saved and is_expired_upload_session(e):
+                # Sessions expire server-side; start a new one from byte zero
+                print(f"Upload session for '{title}' expired; restarting from the beginning")
+                session.discard()
+                request.resumable_uri = None
+                request.resumable_progress = 0
+                request._in_error_state = False
+                continue
             if not is_retryable_upload_error(e):
                 raise
 
             retry_count += 1
             if retry_count > max_retries:
                 raise
+            total_retries += 1
+            metrics.count('upload_retries')
+            if adaptive:
+                chunk_sizer.record_error()
 
             sleep_seconds = min(2 ** retry_count, 60)
             print(f"Retrying upload for '{title}' after transient error: {str(e)[:100]}...")
             time.sleep(sleep_seconds)
 
+    seconds = time.perf_counter() - upload_started
+    size = media.size() if media is not None else None
+    sent = size - offset if isinstance(size, int) else None
+    if sent is not None:
+        metrics.count('uploaded_bytes', sent)
+    metrics.observe(
+        'upload', seconds, title=title, bytes=sent, chunks=chunks, retries=total_retries,
+        mb_per_s=round(sent / seconds / 1e6, 3) if sent and seconds else None,
+    )
     return response
 
 
-def upload_single_video(youtube, media_file, title):
+def upload_single_video(youtube, media_file, title, session=None):
     try:
         request = make_upload_request(youtube, media_file, title)
-        response = perform_resumable_upload(request, title)
+        if session is None:
+            response = perform_resumable_upload(request, title)
+        else:
+            response = perform_resumable_upload(request, title, session=session)
 
         if response and 'id' in response:
             print(f"Uploaded '{title}' with ID: {response['id']}")
             return True
     except Exception as e:
+        current_metrics().count('upload_failures')
         print(f"⚠️  Upload failed: {str(e)[:100]}...")
 
     return False
 
+class PreparedUpload:
+    """A video made ready for upload by the preparation stage."""
+
+    __slots__ = ('record', 'media', 'error', 'prepare_seconds')
+
+    def __init__(self, record, media=None, error=None, prepare_seconds=0.0):
+        self.record = record
+        self.media = media
+        self.error = error
+        self.prepare_seconds = prepare_seconds
+
+    def close(self):
+        if self.media is not None:
+            self.media.close()
+            self.media = None
+
+
+# Marks the end of the preparation stage's output
+PIPELINE_DONE = object()
+
+
+def prepare_uploads(zip_path, records, prepared, stop):
+    """Preparation stage: open the next videos while earlier ones upload.
+
+    Locates each member, checks its size against the index and opens the
+    media source (mapping stored members, decompressing deflated ones).
+    Once a video is queued its content fingerprint is computed, so the hash
+    cache is warm when the upload is recorded. Runs in a background thread
+    and blocks once `prepared` is full.
+
+    Args:
+        zip_path: Zip holding the members
+        records: Indexed records to prepare, in upload order
+        prepared: Bounded queue.Queue receiving PreparedUpload items
+        stop: threading.Event set by the consumer to stop early
+    """
+    def put(item):
+        while not stop.is_set():
+            try:
+                prepared.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        with zipfile.ZipFile(zip_path, 'r') as zf:
+            for record in records:
+                if stop.is_set():
+                    return
+                started = time.monotonic()
+                try:
+                    member = zf.getinfo(record["member_name"])
+                    if member.file_size != record["member_size"]:
+                        raise ValueError(f"{record['filename']} changed size since it was indexed")
+                    item = PreparedUpload(record, media=open_media_source(zip_path, zf, member))
+                except Exception as e:
+                    item = PreparedUpload(record, error=e)
+                item.prepare_seconds = time.monotonic() - started
+                if not put(item):
+                    item.close()
+                    return
+                if config.content_dedup and item.error is None and not stop.is_set():
+                    # Hash while the video uploads so recording it needs no extra read
+                    try:
+                        get_content_fingerprint(zip_path, record)
+                    except Exception:
+                        pass
+    except Exception as e:
+        # Zip could not be opened; fail every remaining record
+        for record in records:
+            if not put(PreparedUpload(record, error=e)):
+                return
+    finally:
+        put(PIPELINE_DONE)
+
+
+def upload_prepared(item, youtube_for_worker, sessions=None):
+    """Upload one prepared video (worker thread); returns (success, seconds).
+
+    sessions: Optional registry store used to save and resume the video's
+        resumable upload session across runs.
+    """
+    started = time.monotonic()
+    try:
+        if item.error is not None:
+            print(f"⚠️  Upload failed: {str(item.error)[:100]}...")
+            return False, 0.0
+        record = item.record
+        session = UploadSession(sessions, record["fbid"], record["member_size"]) if sessions is not None else None
+        success = upload_single_video(youtube_for_worker(), item.media, record["title"], session=session)
+        return success, time.monotonic() - started
+    finally:
+        item.close()
+
+
+def upload_records_concurrently(zip_path, records, youtube_for_worker, workers, has_upload_slot,
+                                prefetch=None, verbose=False, sessions=None):
+    """Pipeline uploads for one zip: a preparation stage feeding an upload pool.
+
+    A background thread prepares up to `prefetch` videos ahead (bounded
+    queue) while up to `workers` resumable uploads run, so the network is
+    not idle during local disk work. A new upload only starts while
+    has_upload_slot(in_flight) is True, so callers can keep run/daily caps
+    exact by counting in-flight uploads. With a registry store as
+    `sessions`, interrupted uploads resume from their last confirmed offset.
+
+    Yields:
+        (record, success) in completion order. Results are yielded in the
+        calling thread, so registry updates and counters stay serialized.
+    """
+    if prefetch is None:
+        prefetch = config.upload_prefetch
+    prepared = queue.Queue(maxsize=max(prefetch, 1))
+    stop = threading.Event()
+    producer = threading.Thread(
+        target=prepare_uploads, args=(zip_path, records, prepared, stop), daemon=True
+    )
+    producer.start()
+
+    stats = {"prepare": 0.0, "upload": 0.0, "wait": 0.0, "videos": 0}
+    exhausted = False
+    in_flight = {}
+    try:
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+            while True:
+                while not exhausted and len(in_flight) < workers and has_upload_slot(len(in_flight)):
+                    waited = time.monotonic()
+                    item = prepared.get()
+                    wait_seconds = time.monotonic() - waited
+                    stats["wait"] += wait_seconds
+                    if item is PIPELINE_DONE:
+                        exhausted = True
+                        break
+                    stats["prepare"] += item.prepare_seconds
+                    current_metrics().observe('prepare', item.prepare_seconds, file=item.record['filename'])
+                    current_metrics().observe('prepare_wait', wait_seconds, log=False)
+                    if verbose:
+                        print_status(
+                            f"    [pipeline] prepared {item.record['filename']} in {item.prepare_seconds:.2f}s, "
+                            f"queue depth {prepared.qsize()}/{prepared.maxsize}, "
+                            f"upload stage waited {time.monotonic() - waited:.2f}s",
+                            'info'
+                        )
+                    print_status(f"  Uploading: {item.record['title']}", 'info')
+                    future = pool.submit(upload_prepared, item, youtube_for_worker, sessions)
+                    in_flight[future] = item.record
+                if not in_flight:
+                    return
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    success, seconds = future.result()
+                    stats["upload"] += seconds
+                    stats["videos"] += 1
+                    yield in_flight.pop(future), success
+    finally:
+        # Stop the preparation stage and release anything it opened
+        stop.set()
+        while producer.is_alive() or not prepared.empty():
+            try:
+                item = prepared.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is not PIPELINE_DONE:
+                item.close()
+        producer.join()
+        if verbose and stats["videos"]:
+            print_status(
+                f"    [pipeline] {stats['videos']} upload(s): prepare {stats['prepare']:.2f}s, "
+                f"upload {stats['upload']:.2f}s, upload stage waiting on prepare {stats['wait']:.2f}s",
+                'info'
+            )
+
+
 # Upload multiple videos up to a limit
 def upload_videos(youtube, base_dir, pending, title_map, uploaded_list, max_per_run=None):
     if max_per_run is None:
-        max_per_run = max_videos_per_run
+        max_per_run = config.max_videos_per_run
     videos_dir = get_videos_directory(base_dir)
     
     successful_uploads = 0
@@ -997,24 +3620,21 @@ def initialize_registry(base_dir=None):
         tuple: (registry_file_path, uploaded_list) for backward compatibility
                The uploaded_list is extracted from registry["uploaded_fbids"]
     """
-    registry = load_registry(REGISTRY_PATH)
-    # For backward compatibility, return the fbids list (previously was filename list)
-    uploaded_list = registry.get("uploaded_fbids", [])
+    with closing(open_registry(REGISTRY_PATH)) as registry:
+        # For backward compatibility, return the fbids list (previously was filename list)
+        uploaded_list = registry.uploaded_fbids()
     return REGISTRY_PATH, uploaded_list
 
 
-# Saves the registry using atomic write for crash safety
+# Saves the uploaded list into the registry store (one transaction)
 def save_registry(registry_file, uploaded_list):
-    """Save registry using atomic write. Maintains backward compatibility.
+    """Save the uploaded list. Maintains backward compatibility.
 
-    This function wraps save_registry_atomic() and handles the case where
-    uploaded_list might be a simple list (old code) or we need to preserve
-    the full registry structure.
+    Replaces the store's uploaded fbids with uploaded_list while preserving
+    the other fields (processed zips, daily counters).
     """
-    # Load existing registry to preserve other fields
-    existing = load_registry(registry_file)
-    existing["uploaded_fbids"] = uploaded_list
-    save_registry_atomic(registry_file, existing)
+    with closing(open_registry(registry_file)) as registry:
+        registry.replace_uploaded_fbids(uploaded_list)
 
 # Handle video upload process
 def handle_video_upload_process(youtube, facebook_data_dir, pending, title_map, uploaded_list, videos_dir):
@@ -1030,7 +3650,8 @@ def handle_video_upload_process(youtube, facebook_data_dir, pending, title_map,
         print(f"Upload process completed")
 
 
-def process_inbox(dry_run=False, verbose=False, limit=None, force=False):
+def process_inbox(dry_run=False, verbose=False, limit=None, force=False, registry=None, workers=None,
+                  zip_names=None, client_factory=None):
     """Main entry point: process all unprocessed zips from inbox folder.
 
     Args:
@@ -1038,20 +3659,46 @@ def process_inbox(dry_run=False, verbose=False, limit=None, force=False):
         verbose: If True, show detailed output. Quiet by default.
         limit: Max videos to upload this run (1-6). Defaults to MAX_VIDEOS_PER_RUN env var.
         force: If True, bypass daily and per-run upload limits.
+        registry: Optional open registry store; opened (and closed) here if None.
+        workers: Concurrent resumable uploads. Defaults to UPLOAD_WORKERS env var.
+        zip_names: Optional inbox zip basenames to restrict this run to.
+        client_factory: Callable(workers) returning the upload client factory;
+            defaults to make_youtube_client_factory (watch mode reuses one).
 
     This function:
     1. Loads registry (uploaded_fbids, processed_zips, daily_uploads)
     2. Scans inbox for unprocessed zip files
     3. Authenticates with YouTube API (skipped in dry-run mode)
-    4. For each zip: extracts, reads metadata, processes videos
-    5. For each video: checks fbid for duplicates, uploads if new
-    6. Saves registry after EACH successful upload (crash-safe)
+    4. For each zip: reads parsed metadata from the inbox index (parsing the
+       zip only on a cache miss), processes videos
+    5. For each video: checks fbid and content fingerprint for duplicates,
+       uploads if new
+    6. Records EACH successful upload in the registry immediately (crash-safe);
+       partial uploads keep their resumable session there and resume next run
     7. Stops gracefully when daily limit reached
     8. Marks zips as processed when complete
     9. Prints summary at end
     """
+    with ExitStack() as stack:
+        if registry is None:
+            registry = stack.enter_context(closing(open_registry(REGISTRY_PATH)))
+        stack.enter_context(collect_run_metrics('upload'))
+        try:
+            return _process_inbox(
+                registry, dry_run, verbose, limit, force, workers or config.upload_workers,
+                zip_names=zip_names, client_factory=client_factory or make_youtube_client_factory,
+            )
+        finally:
+            # Fold journal/WAL back into the main registry file at end of run
+            with current_metrics().timer('registry_compact'):
+                registry.compact()
+
+
+def _process_inbox(registry, dry_run, verbose, limit, force, workers, zip_names=None,
+                   client_factory=None):
+    """Body of process_inbox() running against an open registry store."""
     # Resolve effective upload limit
-    effective_limit = limit if limit is not None else max_videos_per_run
+    effective_limit = limit if limit is not None else config.max_videos_per_run
 
     if dry_run:
         print_status("=== DRY RUN MODE - No uploads will occur ===", 'warning')
@@ -1062,26 +3709,28 @@ def process_inbox(dry_run=False, verbose=False, limit=None, force=False):
     total_skipped = 0
     total_errors = 0
     run_upload_count = 0  # Track uploads in this run for --limit enforcement
+    queued_content = {}  # (size, crc32) -> [(zip_path, record)] queued this run
     zip_files_read = []  # Inbox zip basenames we opened this run (summary / audit)
     retry_zip_files = []  # Real-run zips left unprocessed so failed/missed videos retry later
 
     # Load registry
     if verbose:
         print_status("Loading registry...", 'info')
-    registry = load_registry(REGISTRY_PATH)
-    uploaded_fbids = set(registry.get("uploaded_fbids", []))
-    processed_zips = registry.get("processed_zips", [])
+    processed_zips = set(registry.processed_zips())
 
     # Scan inbox for unprocessed zips
+    inbox_path = get_inbox_path()
     if verbose:
-        print_status(f"Scanning inbox: {INBOX_PATH}", 'info')
+        print_status(f"Scanning inbox: {inbox_path}", 'info')
     try:
         ensure_inbox_exists()
-        inbox_zip_files = sorted(f for f in os.listdir(INBOX_PATH) if f.lower().endswith('.zip'))
+        inbox_zip_files = sorted(f for f in os.listdir(inbox_path) if f.lower().endswith('.zip'))
     except OSError:
         inbox_zip_files = []
     processed_zip_files = [f for f in inbox_zip_files if f in processed_zips]
-    pending_zips = scan_inbox(INBOX_PATH, processed_zips)
+    pending_zips = scan_inbox(inbox_path, processed_zips)
+    if zip_names is not None:
+        pending_zips = [path for path in pending_zips if os.path.basename(path) in zip_names]
     queued_zip_files = [os.path.basename(path) for path in pending_zips]
 
     if not pending_zips:
@@ -1102,7 +3751,7 @@ def process_inbox(dry_run=False, verbose=False, limit=None, force=False):
     print_status(f"Found {len(pending_zips)} zip file(s) to process", 'info')
 
     # Check if we can upload today before authenticating (skip check in dry-run or force)
-    if not dry_run and not force and not can_upload_today(registry, max_videos_per_run):
+    if not dry_run and not force and not can_upload_today(registry, config.max_videos_per_run):
         print_status("Daily upload limit already reached. Use --force to override.", 'warning')
         print_summary(
             uploaded_titles,
@@ -1118,14 +3767,26 @@ def process_inbox(dry_run=False, verbose=False, limit=None, force=False):
         return
 
     # Authenticate with YouTube (skip in dry-run mode)
-    youtube = None
+    youtube_for_worker = None
     if not dry_run:
         if verbose:
             print_status("Authenticating with YouTube...", 'info')
-        youtube = authenticate_youtube()
+        youtube_for_worker = (client_factory or make_youtube_client_factory)(workers)
     elif verbose:
         print_status("Skipping YouTube authentication (dry-run)", 'info')
 
+    def run_limit_reached(in_flight):
+        # Only when --limit is explicitly set, or no --force
+        return run_upload_count + in_flight >= effective_limit and (limit is not None or not force)
+
+    def has_upload_slot(in_flight):
+        """True if one more upload may start with `in_flight` still running."""
+        if run_limit_reached(in_flight):
+            return False
+        if not dry_run and not force and not can_upload_today(registry, config.max_videos_per_run - in_flight):
+            return False
+        return True
+
     # Process each zip file
     for zip_path in pending_zips:
         zip_name = os.path.basename(zip_path)
@@ -1134,162 +3795,187 @@ def process_inbox(dry_run=False, verbose=False, limit=None, force=False):
         zip_errors = 0
 
         try:
-            with extract_zip(zip_path) as temp_dir:
-                # Find metadata file
-                metadata_path = find_metadata_in_extracted(temp_dir)
-                if not metadata_path:
-                    error_messages.append(f"{zip_name}: no metadata found")
-                    zip_errors += 1
-                    total_errors += 1
-                    if not dry_run:
-                        retry_zip_files.append(zip_name)
+            # Parsed metadata comes from the inbox index; the zip itself is
+            # only opened by upload workers
+            with current_metrics().timer('zip_scan', zip=zip_name) as fields:
+                scan = get_zip_scan(zip_path)
+                fields['videos'] = scan["video_count"]
+            if not scan["metadata_member"]:
+                error_messages.append(f"{zip_name}: no metadata found")
+                zip_errors += 1
+                total_errors += 1
+                if not dry_run:
+                    retry_zip_files.append(zip_name)
+                if verbose:
+                    print_status(f"  No live_videos.json found in {zip_name}", 'error')
+                continue
+
+            if not scan["video_count"]:
+                error_messages.append(f"{zip_name}: no videos found")
+                zip_errors += 1
+                total_errors += 1
+                if not dry_run:
+                    retry_zip_files.append(zip_name)
+                if verbose:
+                    print_status(f"  No video files found in {zip_name}", 'error')
+                continue
+
+            # Order entries by creation timestamp (oldest first) through a
+            # compact (timestamp, position) index instead of a sorted copy
+            entries = scan["entries"]
+            order = oldest_first_order(entries)
+            if verbose:
+                print_status(f"  Found {len(order)} video entries in metadata (sorted oldest first)", 'info')
+            largest_by_signature = select_largest_record_per_signature(
+                entries[position] for _, position in order
+            )
+
+            # Uploads from before fingerprints were kept have nothing to
+            # compare against until their size and CRC32 are recorded here
+            if config.content_dedup and not dry_run:
+                backfill_content_fingerprints(registry, (entries[position] for _, position in order), verbose)
+
+            # Track intra-zip duplicates
+            seen_fbids_in_zip = set()
+            zip_uploaded = 0
+            zip_skipped = 0
+            candidates = []  # Records eligible for upload, oldest first
+
+            # Filter entries down to upload candidates
+            for record in (entries[position] for _, position in order):
+                # Fbid for deduplication
+                fbid = record["fbid"]
+                if not fbid:
                     if verbose:
-                        print_status(f"  No live_videos.json found in {zip_name}", 'error')
+                        print_status(f"  Skipping entry: no fbid found", 'warning')
+                    zip_errors += 1
                     continue
 
-                # Find videos directory
-                videos_dir = find_videos_dir_in_extracted(temp_dir)
-                if not videos_dir:
-                    error_messages.append(f"{zip_name}: no videos found")
-                    zip_errors += 1
-                    total_errors += 1
-                    if not dry_run:
-                        retry_zip_files.append(zip_name)
+                signature = record["signature"]
+                selected_duplicate = largest_by_signature.get(signature) if signature else None
+                if selected_duplicate and selected_duplicate["fbid"] != fbid:
                     if verbose:
-                        print_status(f"  No video files found in {zip_name}", 'error')
+                        print_status(
+                            f"  Skipping {fbid}: smaller same-date/same-title duplicate "
+                            f"(keeping {selected_duplicate['fbid']})",
+                            'warning'
+                        )
+                    zip_skipped += 1
                     continue
 
-                # Read metadata and sort by creation timestamp (oldest first)
-                entries = read_json_file(metadata_path)
-                entries = sorted(
-                    entries,
-                    key=lambda e: extract_creation_timestamp(e) or datetime.datetime.max
-                )
-                if verbose:
-                    print_status(f"  Found {len(entries)} video entries in metadata (sorted oldest first)", 'info')
-                largest_by_signature = select_largest_video_per_signature(entries, videos_dir)
-
-                # Track intra-zip duplicates
-                seen_fbids_in_zip = set()
-                zip_uploaded = 0
-                zip_skipped = 0
+                # Check for cross-zip duplicate (already uploaded)
+                if registry.has_fbid(fbid):
+                    # Silently skip cross-zip duplicates
+                    zip_skipped += 1
+                    continue
 
-                # Process each entry
-                for entry in entries:
-                    # Check run-level limit (only when --limit is explicitly set, or no --force)
-                    if run_upload_count >= effective_limit and (limit is not None or not force):
-                        print_status(f"\nLimit of {effective_limit} video(s) reached.", 'warning')
-                        if not dry_run:
-                            save_registry_atomic(REGISTRY_PATH, registry)
-                            if zip_name not in retry_zip_files:
-                                retry_zip_files.append(zip_name)
-                        total_skipped += zip_skipped
-                        total_errors += zip_errors
-                        print_summary(
-                            uploaded_titles,
-                            total_skipped,
-                            total_errors,
-                            error_messages,
-                            zip_files_read=zip_files_read,
-                            inbox_zip_files=inbox_zip_files,
-                            processed_zip_files=processed_zip_files,
-                            queued_zip_files=queued_zip_files,
-                            retry_zip_files=retry_zip_files,
-                        )
-                        return
+                # Check for intra-zip duplicate
+                if fbid in seen_fbids_in_zip:
+                    if verbose:
+                        print_status(f"  Skipping {fbid}: duplicate within zip", 'warning')
+                    zip_skipped += 1
+                    continue
 
-                    # Extract fbid for deduplication
-                    fbid = extract_fbid(entry)
-                    if not fbid:
-                        if verbose:
-                            print_status(f"  Skipping entry: no fbid found", 'warning')
-                        zip_errors += 1
-                        continue
+                seen_fbids_in_zip.add(fbid)
 
-                    signature = video_signature(entry)
-                    selected_duplicate = largest_by_signature.get(signature) if signature else None
-                    if selected_duplicate and selected_duplicate["fbid"] != fbid:
-                        if verbose:
-                            print_status(
-                                f"  Skipping {fbid}: smaller same-date/same-title duplicate "
-                                f"(keeping {selected_duplicate['fbid']})",
-                                'warning'
-                            )
-                        zip_skipped += 1
-                        continue
+                # Get video filename
+                if not record["filename"]:
+                    if verbose:
+                        print_status(f"  Skipping {fbid}: no filename found", 'warning')
+                    zip_errors += 1
+                    continue
 
-                    # Check for cross-zip duplicate (already uploaded)
-                    if fbid in uploaded_fbids:
-                        # Silently skip cross-zip duplicates
-                        zip_skipped += 1
-                        continue
+                if record["member_name"] is None:
+                    if verbose:
+                        print_status(f"  Skipping {fbid}: video file not found", 'error')
+                    zip_errors += 1
+                    continue
 
-                    # Check for intra-zip duplicate
-                    if fbid in seen_fbids_in_zip:
+                # Same recording already uploaded (or queued) under another fbid/title
+                if config.content_dedup:
+                    duplicate_of = find_content_duplicate(registry, zip_path, record, queued_content)
+                    if duplicate_of:
                         if verbose:
-                            print_status(f"  Skipping {fbid}: duplicate within zip", 'warning')
+                            print_status(f"  Skipping {fbid}: same video content as {duplicate_of}", 'warning')
                         zip_skipped += 1
                         continue
 
-                    seen_fbids_in_zip.add(fbid)
-
-                    # Get video filename and build path
-                    filename = extract_video_filename(entry)
-                    if not filename:
-                        if verbose:
-                            print_status(f"  Skipping {fbid}: no filename found", 'warning')
-                        zip_errors += 1
-                        continue
-
-                    video_path = os.path.join(videos_dir, filename)
-                    if not os.path.exists(video_path):
-                        if verbose:
-                            print_status(f"  Skipping {fbid}: video file not found", 'error')
-                        zip_errors += 1
-                        continue
-
-                    # Get title
-                    title = extract_video_title(entry)
-
-                    if dry_run:
-                        # Dry-run: show what would be uploaded
-                        print_status(f"  [WOULD UPLOAD] {title}", 'info')
-                        if verbose:
-                            file_size_mb = os.path.getsize(video_path) / (1024 * 1024)
-                            print_status(f"    fbid: {fbid}", 'info')
-                            print_status(f"    file: {filename} ({file_size_mb:.1f} MB)", 'info')
+                candidates.append(record)
+
+            attempted = 0
+            if dry_run:
+                # Dry-run: show what would be uploaded
+                for record in candidates:
+                    if not has_upload_slot(0):
+                        break
+                    attempted += 1
+                    title = record["title"]
+                    print_status(f"  [WOULD UPLOAD] {title}", 'info')
+                    if verbose:
+                        file_size_mb = record["member_size"] / (1024 * 1024)
+                        print_status(f"    fbid: {record['fbid']}", 'info')
+                        print_status(f"    file: {record['filename']} ({file_size_mb:.1f} MB)", 'info')
+                    uploaded_titles.append(title)
+                    zip_uploaded += 1
+                    run_upload_count += 1
+            else:
+                # Actual uploads; results arrive here one at a time
+                for record, success in upload_records_concurrently(
+                    zip_path, candidates, youtube_for_worker, workers, has_upload_slot,
+                    verbose=verbose, sessions=registry
+                ):
+                    attempted += 1
+                    title = record["title"]
+                    if success:
+                        fingerprint = None
+                        if config.content_dedup:
+                            try:
+                                fingerprint = get_content_fingerprint(zip_path, record)
+                            except Exception as e:
+                                print_status(f"    Could not fingerprint {record['filename']}: {str(e)[:60]}", 'warning')
+                        # Record in registry (durable commit, crash-safe)
+                        record_upload(registry, record["fbid"], fingerprint)
                         uploaded_titles.append(title)
                         zip_uploaded += 1
                         run_upload_count += 1
+                        if verbose:
+                            print_status(f"    Uploaded successfully: {title}", 'success')
                     else:
-                        # Actual upload
-                        print_status(f"  Uploading: {title}", 'info')
-                        success = upload_single_video(youtube, video_path, title)
-
-                        if success:
-                            # Record in registry
-                            record_upload(registry, fbid)
-                            uploaded_fbids.add(fbid)
-                            uploaded_titles.append(title)
-                            zip_uploaded += 1
-                            run_upload_count += 1
-
-                            # Save registry immediately (crash-safe)
-                            save_registry_atomic(REGISTRY_PATH, registry)
-                            if verbose:
-                                print_status(f"    Uploaded successfully", 'success')
-                        else:
-                            zip_errors += 1
-                            error_messages.append(f"Upload failed: {title[:40]}")
-                            if verbose:
-                                print_status(f"    Upload failed", 'error')
-
-                # Update totals
+                        zip_errors += 1
+                        error_messages.append(f"Upload failed: {title[:40]}")
+                        if verbose:
+                            print_status(f"    Upload failed: {title}", 'error')
+
+            # Candidates left unattempted means a run or daily cap was hit
+            if attempted < len(candidates):
+                if run_limit_reached(0):
+                    print_status(f"\nLimit of {effective_limit} video(s) reached.", 'warning')
+                else:
+                    print_status("\nDaily upload limit reached. Use --force to override.", 'warning')
+                if not dry_run:
+                    if zip_name not in retry_zip_files:
+                        retry_zip_files.append(zip_name)
                 total_skipped += zip_skipped
                 total_errors += zip_errors
+                print_summary(
+                    uploaded_titles,
+                    total_skipped,
+                    total_errors,
+                    error_messages,
+                    zip_files_read=zip_files_read,
+                    inbox_zip_files=inbox_zip_files,
+                    processed_zip_files=processed_zip_files,
+                    queued_zip_files=queued_zip_files,
+                    retry_zip_files=retry_zip_files,
+                )
+                return
 
-                if verbose:
-                    print_status(f"  Zip complete: {zip_uploaded} uploaded, {zip_skipped} skipped, {zip_errors} errors", 'info')
+            # Update totals
+            total_skipped += zip_skipped
+            total_errors += zip_errors
+
+            if verbose:
+                print_status(f"  Zip complete: {zip_uploaded} uploaded, {zip_skipped} skipped, {zip_errors} errors", 'info')
 
         except zipfile.BadZipFile:
             error_messages.append(f"{zip_name}: corrupted zip")
@@ -1309,15 +3995,13 @@ def process_inbox(dry_run=False, verbose=False, limit=None, force=False):
         # Mark zip as processed only if the zip completed without entry/upload errors.
         if not dry_run:
             if zip_errors == 0:
-                if zip_name not in registry["processed_zips"]:
-                    registry["processed_zips"].append(zip_name)
-                save_registry_atomic(REGISTRY_PATH, registry)
+                with current_metrics().timer('registry_write', op='mark_zip_processed', zip=zip_name):
+                    registry.mark_zip_processed(zip_name)
                 if verbose:
                     print_status(f"  Marked {zip_name} as processed", 'success')
             else:
                 if zip_name not in retry_zip_files:
                     retry_zip_files.append(zip_name)
-                save_registry_atomic(REGISTRY_PATH, registry)
                 print_status(
                     f"  Not marking {zip_name} as processed ({zip_errors} error(s)); it will retry next run.",
                     'warning'
@@ -1352,6 +4036,205 @@ def process_inbox(dry_run=False, verbose=False, limit=None, force=False):
         )
 
 
+# ============================================================================
+# PROFILING - cProfile dumps, collapsed stacks and a hot-function table
+# ============================================================================
+
+def profile_label(func):
+    """Short 'file.py:function' label for a pstats function key."""
+    filename, line, name = func
+    if filename == '~':
+        return name.replace(';', ',')  # Built-in
+    return f"{os.path.basename(filename)}:{name}".replace(';', ',')
+
+
+def collapsed_stacks(stats, min_fraction=0.0005):
+    """Render pstats data as collapsed stacks ('a;b;c microseconds' lines).
+
+    cProfile only records caller -> callee edges, so stacks are rebuilt
+    from the call graph: each callee's share of a caller's time follows
+    the time recorded on that edge. Recursive edges are cut and branches
+    under min_fraction of the total are dropped. Good enough for
+    flamegraph.pl or speedscope, though not an exact sampled stack.
+    """
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+    roots = [func for func, (_, _, _, _, callers) in stats.items() if not callers]
+    total = sum(stats[func][3] for func in roots)
+    min_seconds = total * min_fraction
+    samples = {}
+    pending = [((root,), stats[root][3]) for root in roots]
+    while pending:
+        path, share = pending.pop()
+        func = path[-1]
+        cumulative, own = stats[func][3], stats[func][2]
+        if cumulative <= 0 or share < min_seconds:
+            continue
+        fraction = min(1.0, share / cumulative)
+        key = ';'.join(profile_label(f) for f in path)
+        samples[key] = samples.get(key, 0.0) + own * fraction
+        for callee, edge_seconds in callees.get(func, ()):
+            if callee not in path:
+                pending.append((path + (callee,), edge_seconds * fraction))
+    return ''.join(
+        f"{key} {round(seconds * 1e6)}\n"
+        for key, seconds in sorted(samples.items()) if round(seconds * 1e6) > 0
+    )
+
+
+def print_profile_table(stats, top=25):
+    """Print the top functions by cumulative time."""
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:top]
+    print(f"\n{'='*40}")
+    print_status(f"PROFILE - top {len(rows)} by cumulative time", 'info')
+    print(f"{'cum s':>9} {'self s':>9} {'calls':>9}  function")
+    for func, (_, calls, own, cumulative, _) in rows:
+        print(f"{cumulative:9.3f} {own:9.3f} {calls:9d}  {profile_label(func)}:{func[1]}")
+    print(f"{'='*40}")
+
+
+def run_profiled(kind, command, top=25, **kwargs):
+    """Run command(**kwargs) under cProfile and write the results to PROFILE_DIR.
+
+    Writes <kind>-<timestamp>.pstats (for pstats/snakeviz) and .collapsed
+    (for flamegraphs), then prints the hot-function table. Only the calling
+    thread is profiled; time spent waiting on upload worker threads shows
+    up as waits in the main thread.
+    """
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(command, **kwargs)
+    finally:
+        profile_dir = os.path.join(SCRIPT_DIR, config.profile_dir)
+        os.makedirs(profile_dir, exist_ok=True)
+        base_path = os.path.join(profile_dir, f"{kind}-{datetime.datetime.now():%Y%m%dT%H%M%S}")
+        stats = pstats.Stats(profiler)
+        stats.dump_stats(base_path + '.pstats')
+        with open(base_path + '.collapsed', 'w', encoding='utf-8') as f:
+            f.write(collapsed_stacks(stats.stats))
+        print_profile_table(stats.stats, top)
+        print_status(f"Profile written to {base_path}.pstats (collapsed stacks: .collapsed)", 'info')
+
+
+# ============================================================================
+# WATCH MODE - Long-running inbox daemon with a warm client and registry
+# ============================================================================
+
+class InboxWatcher:
+    """Track inbox zips between polls and report the ones ready to process.
+
+    A zip is ready once its size and mtime have stayed unchanged for
+    settle_seconds (so a copy still in progress is left alone) and it reads
+    as a complete zip (the central directory is written last). Zips already
+    handed out are not reported again until they change or retry_seconds
+    pass, so a zip that failed or hit the daily limit is retried later
+    instead of on every poll.
+    """
+
+    def __init__(self, inbox_path, settle_seconds, retry_seconds, clock=time.monotonic):
+        self.inbox_path = inbox_path
+        self.settle_seconds = settle_seconds
+        self.retry_seconds = retry_seconds
+        self.clock = clock
+        self.seen = {}  # name -> ((size, mtime_ns), unchanged since)
+        self.handled = {}  # name -> ((size, mtime_ns), handled at)
+
+    def poll(self, processed_zips):
+        """Return names of unprocessed zips that are ready, sorted."""
+        now = self.clock()
+        current = {}
+        try:
+            with os.scandir(self.inbox_path) as entries:
+                for entry in entries:
+                    if not entry.name.lower().endswith('.zip') or entry.name in processed_zips:
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        stat = entry.stat()
+                    except OSError:
+                        continue  # Removed between listing and stat
+                    signature = (stat.st_size, stat.st_mtime_ns)
+                    previous = self.seen.get(entry.name)
+                    if previous and previous[0] == signature:
+                        since = previous[1]
+                    elif time.time() - stat.st_mtime >= self.settle_seconds:
+                        since = now - self.settle_seconds  # Already at rest when first seen
+                    else:
+                        since = now
+                    current[entry.name] = (signature, since)
+        except OSError:
+            pass
+        self.seen = current
+
+        ready = []
+        for name, (signature, since) in sorted(current.items()):
+            if now - since < self.settle_seconds:
+                continue
+            handled = self.handled.get(name)
+            if handled and handled[0] == signature and now - handled[1] < self.retry_seconds:
+                continue
+            if not zipfile.is_zipfile(os.path.join(self.inbox_path, name)):
+                print_status(f"Skipping {name}: not a complete zip file", 'warning')
+                self.mark_handled([name])
+                continue
+            ready.append(name)
+        return ready
+
+    def mark_handled(self, names):
+        now = self.clock()
+        for name in names:
+            if name in self.seen:
+                self.handled[name] = (self.seen[name][0], now)
+
+
+def watch_inbox(dry_run=False, verbose=False, limit=None, force=False, workers=None, stop=None):
+    """Watch the inbox and process new zips as soon as they finish landing.
+
+    Polls every WATCH_POLL_SECONDS. The registry stays open and the
+    authenticated YouTube client is built once (on the first upload) and
+    reused for every later zip. Runs until `stop` is set or Ctrl+C.
+    """
+    stop = stop or threading.Event()
+    workers = workers or config.upload_workers
+    inbox_path = ensure_inbox_exists()
+    watcher = InboxWatcher(inbox_path, config.watch_settle_seconds, config.watch_retry_seconds)
+
+    clients = {}
+
+    def warm_client_factory(worker_count):
+        if worker_count not in clients:
+            clients[worker_count] = make_youtube_client_factory(worker_count)
+        return clients[worker_count]
+
+    print_status(f"Watching {inbox_path} for new exports (Ctrl+C to stop)", 'info')
+    with closing(open_registry(REGISTRY_PATH)) as registry:
+        while not stop.is_set():
+            ready = watcher.poll(set(registry.processed_zips()))
+            if ready:
+                print_status(f"New export(s) ready: {', '.join(ready)}", 'info')
+                try:
+                    process_inbox(
+                        dry_run=dry_run,
+                        verbose=verbose,
+                        limit=limit,
+                        force=force,
+                        registry=registry,
+                        workers=workers,
+                        zip_names=set(ready),
+                        client_factory=warm_client_factory,
+                    )
+                except Exception as e:
+                    print_status(f"Processing failed: {str(e)[:100]}", 'error')
+                watcher.mark_handled(ready)
+            stop.wait(config.watch_poll_seconds)
+
+
 def main():
     """Parse arguments and run the inbox processor or audit."""
     parser = argparse.ArgumentParser(
@@ -1366,8 +4249,13 @@ def main():
   python run.py -l 2         # Upload max 2 videos this run
   python run.py -l 1 -v      # Upload 1 video with verbose output
   python run.py -f           # Upload all videos, ignore limits
+  python run.py -w 3         # Run 3 resumable uploads concurrently
   python run.py --audit      # Rebuild registry from YouTube channel
   python run.py --audit -n   # Audit dry-run (show what would be updated)
+  python run.py --audit -j 4 # Audit, parsing inbox zips in 4 processes
+  python run.py --audit --full # Audit every upload, ignoring the audit cursor
+  python run.py --watch      # Keep running; upload new inbox zips as they land
+  python run.py -n --profile # Profile a dry run (pstats + collapsed stacks)
 '''
     )
     parser.add_argument(
@@ -1392,17 +4280,80 @@ def main():
         action='store_true',
         help='Bypass daily and per-run upload limits'
     )
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        metavar='N',
+        help=f'Concurrent resumable uploads (default: UPLOAD_WORKERS or {config.upload_workers})'
+    )
     parser.add_argument(
         '--audit',
         action='store_true',
         help='Audit mode: rebuild registry by matching YouTube uploads to local metadata'
     )
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='With --audit: list every YouTube upload instead of stopping at already-audited ones'
+    )
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Keep running and process new inbox zips once they finish copying'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Run under cProfile; write .pstats and .collapsed files to PROFILE_DIR'
+    )
+    parser.add_argument(
+        '--profile-top',
+        type=int,
+        default=25,
+        metavar='N',
+        help='Functions listed in the --profile summary table (default: 25)'
+    )
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=1,
+        metavar='N',
+        help='Worker processes for scanning inbox zips in --audit (default: 1)'
+    )
     args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error('--jobs must be at least 1')
+    if args.workers is not None and args.workers < 1:
+        parser.error('--workers must be at least 1')
+    if args.profile_top < 1:
+        parser.error('--profile-top must be at least 1')
+    if args.watch and args.audit:
+        parser.error('--watch cannot be combined with --audit')
 
     if args.audit:
-        audit_registry(dry_run=args.dry_run, verbose=args.verbose)
+        kind, command = 'audit', audit_registry
+        kwargs = dict(dry_run=args.dry_run, verbose=args.verbose, jobs=args.jobs, full=args.full)
     else:
-        process_inbox(dry_run=args.dry_run, verbose=args.verbose, limit=args.limit, force=args.force)
+        kind, command = ('watch', watch_inbox) if args.watch else ('upload', process_inbox)
+        kwargs = dict(
+            dry_run=args.dry_run,
+            verbose=args.verbose,
+            limit=args.limit,
+            force=args.force,
+            workers=args.workers,
+        )
+
+    try:
+        if args.profile:
+            run_profiled(kind, command, top=args.profile_top, **kwargs)
+        else:
+            command(**kwargs)
+    except KeyboardInterrupt:
+        if not args.watch:
+            raise
+        print_status("\nStopped watching inbox.", 'info')
+    finally:
+        stop_credential_refresh()
 
 
 if __name__ == "__main__":
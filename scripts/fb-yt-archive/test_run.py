@@ -2,16 +2,100 @@
 import unittest
 from unittest.mock import patch, Mock
 import datetime
+import glob
+import hashlib
+import io
 import tempfile
+import threading
+import time
 import os
+import subprocess
+import sys
 import json
+import zipfile
+from contextlib import closing
+import googleapiclient.errors
+import googleapiclient.http
+import httplib2
 import run
 
 
 load_dotenv()
 
+# Runs in this module must not write metrics into the script directory;
+# TestRunMetrics points METRICS_DIR at a temporary directory instead
+_metrics_dir_patcher = patch('run.config.metrics_dir', '', create=True)
+
+
+def setUpModule():
+    _metrics_dir_patcher.start()
+
+
+def tearDownModule():
+    _metrics_dir_patcher.stop()
+
+
+def make_live_entry(fbid, title, timestamp, prefix='video'):
+    """Build a live_videos.json entry shaped like a Facebook export."""
+    return {
+        'timestamp': timestamp,
+        'label_values': [
+            {'label': 'Title', 'value': title},
+            {'label': 'Video', 'media': [{'uri': f'your_facebook_activity/live_videos/{prefix}_{fbid}.mp4'}]},
+        ],
+    }
+
+
+def make_export_zip(zip_path, entries, videos, compression=zipfile.ZIP_STORED):
+    """Write a minimal Facebook export zip with metadata and video members.
+
+    Args:
+        zip_path: Destination path
+        entries: List of live_videos.json entries
+        videos: Dict of video filename -> bytes content
+    """
+    with zipfile.ZipFile(zip_path, 'w', compression=compression) as zf:
+        zf.writestr(
+            "this_profile's_activity_across_facebook/live_videos/live_videos.json",
+            json.dumps(entries),
+        )
+        for filename, content in videos.items():
+            zf.writestr(f'your_facebook_activity/live_videos/{filename}', content)
+
+
+class InboxTestCase(unittest.TestCase):
+    """Base for tests that run against a temporary inbox, registry and index."""
+
+    # Extra (run attribute, value) patches, e.g. ('config.max_videos_per_run', 6)
+    patches = ()
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.inbox = os.path.join(self.tmpdir.name, 'inbox')
+        os.makedirs(self.inbox)
+        self.registry_path = os.path.join(self.tmpdir.name, 'registry.json')
+        for name, value in (
+            ('INBOX_PATH', self.inbox),
+            ('REGISTRY_PATH', self.registry_path),
+            ('INBOX_INDEX_PATH', os.path.join(self.tmpdir.name, 'inbox_index.sqlite3')),
+        ) + tuple(self.patches):
+            patcher = patch(f'run.{name}', value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
 class TestRun(unittest.TestCase):
 
+    def setUp(self):
+        # Registry helpers open a store; keep it out of the script directory
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.tmpdir = tmpdir.name
+        patcher = patch('run.REGISTRY_PATH', os.path.join(self.tmpdir, 'uploaded_registry.json'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     
     @patch('os.path.join')
     def test_get_videos_directory(self, mock_join):
@@ -28,25 +112,6 @@ def test_get_videos_directory(self, mock_join):
         self.assertEqual(result, expected_path)
 
     
-    @patch('builtins.open')
-    @patch('json.load')
-    def test_read_json_file(self, mock_json_load, mock_open):
-        # Arrange
-        file_path = 'test_file.json'
-        expected_data = {'test': 'data'}
-        mock_file = Mock()
-        mock_open.return_value.__enter__.return_value = mock_file
-        mock_json_load.return_value = expected_data
-        
-        # Act
-        result = run.read_json_file(file_path)
-        
-        # Assert
-        mock_open.assert_called_once_with(file_path, 'r', encoding='utf-8')
-        mock_json_load.assert_called_once_with(mock_file)
-        self.assertEqual(result, expected_data)
-
-    
     def test_extract_label_value_found(self):
         # Arrange
         entry = {
@@ -136,6 +201,7 @@ def test_create_oauth_flow(self, mock_flow_class):
         self.assertEqual(result, mock_credentials)
 
 
+    @patch('run.config.discovery_mode', 'live', create=True)
     @patch('run.discovery.build')
     def test_build_youtube_client(self, mock_discovery_build):
         # Arrange
@@ -267,7 +333,7 @@ def test_extract_video_title_found(self, mock_extract_label):
 
 
     @patch('run.extract_label_value')
-    @patch('run.default_title', 'Default Title')
+    @patch('run.config.default_title', 'Default Title')
     def test_extract_video_title_uses_default(self, mock_extract_label):
         # Arrange
         entry = {'test': 'entry'}
@@ -462,7 +528,7 @@ def test_initialize_registry_not_exists(self):
     @patch('json.dump')
     def test_save_registry(self, mock_json_dump, mock_open):
         # Arrange
-        registry_file = 'test_registry.json'
+        registry_file = os.path.join(self.tmpdir, 'test_registry.json')
         uploaded_list = ['video1.mp4', 'video2.mp4']
         mock_file = Mock()
         mock_open.return_value.__enter__.return_value = mock_file
@@ -730,6 +796,188 @@ def test_registry_persists_between_runs(self):
             self.assertEqual(registry3["daily_uploads"]["2026-01-28"], 2)
 
 
+class TestSqliteRegistry(unittest.TestCase):
+    """Tests for the SQLite registry store and its JSON migration."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.registry_path = os.path.join(self.tmpdir.name, "registry.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _write_json(self, data):
+        with open(self.registry_path, 'w') as f:
+            json.dump(data, f)
+
+    def test_migrates_dict_format_once(self):
+        """The JSON registry is imported on first open and then ignored."""
+        self._write_json({
+            "uploaded_fbids": ["fbid1", "fbid2"],
+            "processed_zips": ["zip1.zip"],
+            "daily_uploads": {"2026-01-28": 2}
+        })
+        with closing(run.open_registry(self.registry_path)) as registry:
+            self.assertEqual(registry.to_dict(), {
+                "uploaded_fbids": ["fbid1", "fbid2"],
+                "processed_zips": ["zip1.zip"],
+                "daily_uploads": {"2026-01-28": 2}
+            })
+        self._write_json({"uploaded_fbids": ["other"]})
+        with closing(run.open_registry(self.registry_path)) as registry:
+            self.assertEqual(registry.uploaded_fbids(), ["fbid1", "fbid2"])
+
+    @patch('builtins.print')
+    def test_missing_or_unreadable_json_is_imported_later(self, mock_print):
+        """Only a successful import marks the JSON registry as migrated."""
+        with closing(run.open_registry(self.registry_path)) as registry:
+            self.assertEqual(registry.uploaded_fbids(), [])
+        with open(self.registry_path, 'w') as f:
+            f.write('{"uploaded_fbids": ["fbid1"')
+        with closing(run.open_registry(self.registry_path)) as registry:
+            self.assertEqual(registry.uploaded_fbids(), [])
+        self._write_json({"uploaded_fbids": ["fbid1"]})
+        with closing(run.open_registry(self.registry_path)) as registry:
+            self.assertEqual(registry.uploaded_fbids(), ["fbid1"])
+
+    def test_migrates_legacy_list_format(self):
+        """The legacy list-of-filenames registry is migrated to fbids."""
+        self._write_json(["prefix_123.mp4", "prefix_456.mp4"])
+        with closing(run.open_registry(self.registry_path)) as registry:
+            self.assertEqual(registry.uploaded_fbids(), ["123", "456"])
+            self.assertEqual(registry.processed_zips(), [])
+
+    def test_uses_wal_mode(self):
+        """The store runs in WAL journal mode next to the JSON path."""
+        with closing(run.open_registry(self.registry_path)) as registry:
+            mode = registry.conn.execute("PRAGMA journal_mode").fetchone()[0]
+            self.assertEqual(registry.db_path, os.path.join(self.tmpdir.name, "registry.sqlite3"))
+        self.assertEqual(mode, "wal")
+
+    def test_record_upload_and_daily_limit(self):
+        """record_upload() and can_upload_today() work on the store."""
+        with closing(run.open_registry(self.registry_path)) as registry, \
+             patch('run.datetime') as mock_datetime:
+            mock_datetime.date.today.return_value.isoformat.return_value = "2026-01-28"
+            mock_datetime.datetime.now.return_value.isoformat.return_value = "2026-01-28T00:00:00"
+            run.record_upload(registry, "fbid1")
+            run.record_upload(registry, "fbid1")
+            self.assertTrue(registry.has_fbid("fbid1"))
+            self.assertFalse(registry.has_fbid("fbid2"))
+            self.assertEqual(registry.uploaded_fbids(), ["fbid1"])
+            self.assertEqual(registry.uploads_on("2026-01-28"), 2)
+            self.assertTrue(run.can_upload_today(registry, max_per_day=3))
+            self.assertFalse(run.can_upload_today(registry, max_per_day=2))
+
+    def test_records_persist_between_connections(self):
+        """Committed uploads are visible to the next run."""
+        with closing(run.open_registry(self.registry_path)) as registry:
+            registry.record_upload("fbid1", "2026-01-28")
+            registry.mark_zip_processed("zip1.zip")
+        with closing(run.open_registry(self.registry_path)) as registry:
+            self.assertEqual(registry.uploaded_fbids(), ["fbid1"])
+            self.assertEqual(registry.processed_zips(), ["zip1.zip"])
+
+    def test_initialize_and_save_registry_use_store(self):
+        """initialize_registry()/save_registry() keep working on top of the store."""
+        with patch('run.REGISTRY_PATH', self.registry_path):
+            run.save_registry(self.registry_path, ["a", "b"])
+            registry_file, uploaded_list = run.initialize_registry()
+        self.assertEqual(registry_file, self.registry_path)
+        self.assertEqual(uploaded_list, ["a", "b"])
+
+
+class TestJournaledJsonRegistry(unittest.TestCase):
+    """Tests for the flat-file registry with an append-only journal."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.registry_path = os.path.join(self.tmpdir.name, "registry.json")
+        self.journal_path = os.path.join(self.tmpdir.name, "registry.journal.jsonl")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _open(self, max_journal_entries=None):
+        if max_journal_entries is None:
+            return run.open_registry(self.registry_path, backend='json')
+        return run.JournaledJsonRegistry(self.registry_path, max_journal_entries=max_journal_entries)
+
+    def test_record_upload_appends_without_rewriting_snapshot(self):
+        """Each upload adds one journal line and leaves the snapshot alone."""
+        with closing(self._open()) as registry:
+            registry.record_upload("fbid1", "2026-01-28")
+            registry.record_upload("fbid2", "2026-01-28")
+        self.assertFalse(os.path.exists(self.registry_path))
+        with open(self.journal_path) as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+    def test_load_replays_snapshot_and_journal(self):
+        """Reopening replays the journal on top of the snapshot."""
+        run.save_registry_atomic(self.registry_path, {
+            "uploaded_fbids": ["old"], "processed_zips": [], "daily_uploads": {}
+        })
+        with closing(self._open()) as registry:
+            registry.record_upload("new", "2026-01-28")
+            registry.mark_zip_processed("zip1.zip")
+        with closing(self._open()) as registry:
+            self.assertEqual(registry.to_dict(), {
+                "uploaded_fbids": ["old", "new"],
+                "processed_zips": ["zip1.zip"],
+                "daily_uploads": {"2026-01-28": 1}
+            })
+
+    def test_torn_journal_line_is_ignored(self):
+        """A partially written last line from a crash does not break loading."""
+        with closing(self._open()) as registry:
+            registry.record_upload("fbid1", "2026-01-28")
+        with open(self.journal_path, 'a') as f:
+            f.write('{"op": "upload", "fb')
+        with closing(self._open()) as registry:
+            self.assertEqual(registry.uploaded_fbids(), ["fbid1"])
+
+    @patch('builtins.print')
+    def test_append_after_torn_line_survives_reopen(self, mock_print):
+        """The torn tail is cut before appending, so later uploads are not lost."""
+        with closing(self._open()) as registry:
+            registry.record_upload("a", "2026-01-28")
+        with open(self.journal_path, 'a') as f:
+            f.write('{"op": "upl')
+        with closing(self._open()) as registry:
+            registry.record_upload("b", "2026-01-28")
+        with closing(self._open()) as registry:
+            self.assertEqual(registry.uploaded_fbids(), ["a", "b"])
+        with open(self.journal_path, encoding='utf-8') as f:
+            self.assertEqual([json.loads(line)["fbid"] for line in f], ["a", "b"])
+
+    def test_compact_folds_journal_into_snapshot(self):
+        """compact() writes the snapshot and empties the journal."""
+        with closing(self._open()) as registry:
+            registry.record_upload("fbid1", "2026-01-28")
+            registry.compact()
+        self.assertEqual(os.path.getsize(self.journal_path), 0)
+        self.assertEqual(run.load_registry(self.registry_path)["uploaded_fbids"], ["fbid1"])
+
+    def test_crash_during_compaction_does_not_double_count(self):
+        """Journal lines already in the snapshot are skipped on replay."""
+        with closing(self._open()) as registry:
+            registry.record_upload("fbid1", "2026-01-28")
+            snapshot = registry.to_dict()
+            snapshot["journal_seq"] = registry.seq
+        # Snapshot written but journal never truncated
+        run.save_registry_atomic(self.registry_path, snapshot)
+        with closing(self._open()) as registry:
+            self.assertEqual(registry.uploads_on("2026-01-28"), 1)
+
+    def test_compacts_when_journal_exceeds_threshold(self):
+        """Hitting the journal threshold triggers compaction automatically."""
+        with closing(self._open(max_journal_entries=2)) as registry:
+            registry.record_upload("fbid1", "2026-01-28")
+            registry.record_upload("fbid2", "2026-01-28")
+            self.assertEqual(registry.journal_entries, 0)
+        self.assertEqual(run.load_registry(self.registry_path)["uploaded_fbids"], ["fbid1", "fbid2"])
+
+
 class TestResumeWorkflow(unittest.TestCase):
     """Tests for resume workflow - skipping already uploaded videos."""
 
@@ -766,6 +1014,1695 @@ def test_extract_fbid_returns_none_when_missing(self):
         self.assertIsNone(result)
 
 
+class CountingList(list):
+    """List that counts how many times it is iterated."""
+
+    iterations = 0
+
+    def __iter__(self):
+        self.iterations += 1
+        return super().__iter__()
+
+
+class TestLiveEntry(unittest.TestCase):
+    """Tests for single-pass parsing of metadata entries."""
+
+    def setUp(self):
+        self.entries = [
+            make_live_entry('123', 'Observaci\u00c3\u00b3n lunar', 1700000000),
+            {'timestamp': 1700100000, 'label_values': [
+                {'label': 'Video', 'media': [{'uri': 'path/to/prefix_456.MP4'}]},
+            ]},
+            {'label_values': [{'label': 'Title', 'value': 'No video'}]},
+            {'timestamp': 'bad', 'label_values': []},
+        ]
+
+    def test_matches_individual_extractors(self):
+        """Parsed fields equal what the per-field extractors return."""
+        for entry in self.entries:
+            parsed = run.parse_live_entry(entry)
+            self.assertEqual(parsed.fbid, run.extract_fbid(entry))
+            self.assertEqual(parsed.filename, run.extract_video_filename(entry))
+            self.assertEqual(parsed.title, run.extract_video_title(entry))
+            self.assertEqual(parsed.created, run.extract_creation_timestamp(entry))
+        self.assertTrue(run.parse_live_entry(self.entries[0]).title.endswith('] Observaci\u00f3n lunar'))
+
+    def test_label_values_walked_once(self):
+        """Scanning an export walks each entry's label_values a single time."""
+        entry = make_live_entry('123', 'Once', 1700000000)
+        entry['label_values'] = CountingList(entry['label_values'])
+        parsed = run.parse_live_entry(entry)
+        run.select_largest_video_per_signature([parsed], member_sizes={'video_123.mp4': 1})
+        self.assertEqual(run.video_signature(parsed), parsed.signature)
+        self.assertEqual(entry['label_values'].iterations, 1)
+
+    def test_records_have_no_instance_dict(self):
+        """Parsed records are compact __slots__ objects."""
+        self.assertFalse(hasattr(run.parse_live_entry(self.entries[0]), '__dict__'))
+
+
+class TestStreamingMetadata(unittest.TestCase):
+    """Tests for reading live_videos.json incrementally."""
+
+    def setUp(self):
+        self.entries = [
+            make_live_entry('333', 'Third éclipse', 1700200000),
+            make_live_entry('111', 'First', 1700000000),
+            {'label_values': [{'label': 'Title', 'value': 'No date'}], 'views': 12345},
+            make_live_entry('222', 'Second', 1700100000),
+        ]
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.json_path = os.path.join(self.tmpdir.name, 'live_videos.json')
+        with open(self.json_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2, ensure_ascii=False)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_items_match_json_load_with_tiny_chunks(self):
+        """Chunk boundaries inside strings, numbers and multibyte text are handled."""
+        for chunk_size in (1, 7, 4096):
+            with open(self.json_path, 'rb') as f:
+                items = [item for _, item in run.iter_json_array(f, chunk_size)]
+            self.assertEqual(items, self.entries)
+
+    def test_offsets_point_at_each_item(self):
+        """Yielded byte offsets can be used to decode an item again."""
+        with open(self.json_path, 'rb') as f:
+            data = f.read()
+            f.seek(0)
+            pairs = list(run.iter_json_array(f, 16))
+        decoder = json.JSONDecoder()
+        for offset, item in pairs:
+            self.assertEqual(decoder.raw_decode(data[offset:].decode('utf-8'))[0], item)
+
+    def test_numbers_split_across_chunks(self):
+        """Top-level numbers cut by a chunk boundary are read whole."""
+        for data, expected in ((b'[1.5]', [1.5]), (b'[-1.5e10, 2]', [-1.5e10, 2]), (b'[10,-2E-3 ]', [10, -2e-3])):
+            for chunk_size in range(1, len(data) + 1):
+                with self.subTest(data=data, chunk_size=chunk_size):
+                    self.assertEqual([item for _, item in run.iter_json_array(io.BytesIO(data), chunk_size)], expected)
+
+    def test_empty_and_invalid_arrays(self):
+        """An empty array yields nothing; a non-array is rejected."""
+        self.assertEqual(list(run.iter_json_array(io.BytesIO(b' [ ] '))), [])
+        with self.assertRaises(ValueError):
+            list(run.iter_json_array(io.BytesIO(b'{"a": 1}')))
+        with self.assertRaises(ValueError):
+            list(run.iter_json_array(io.BytesIO(b'[{"a": 1}')))
+
+    def test_streams_zip_member(self):
+        """Entries stream straight from a zip member."""
+        zip_path = os.path.join(self.tmpdir.name, 'export.zip')
+        make_export_zip(zip_path, self.entries, {}, compression=zipfile.ZIP_DEFLATED)
+        with zipfile.ZipFile(zip_path) as zf:
+            with zf.open(run.find_metadata_member(zf)) as raw:
+                fbids = [entry.fbid for _, entry in run.iter_live_entries(raw, chunk_size=32)]
+        self.assertEqual(fbids, ['333', '111', None, '222'])
+
+    def test_build_title_map_streams_file(self):
+        """build_title_map reads the file through the streaming parser."""
+        with patch('run.iter_json_array', wraps=run.iter_json_array) as mock_stream, \
+             patch('json.load') as mock_load:
+            title_map = run.build_title_map(self.json_path)
+        mock_stream.assert_called_once()
+        mock_load.assert_not_called()
+        self.assertEqual(sorted(title_map), ['video_111.mp4', 'video_222.mp4', 'video_333.mp4'])
+
+
+class TestZipNativeInbox(InboxTestCase):
+    """Tests for reading export zips without extracting the whole archive."""
+
+    def setUp(self):
+        super().setUp()
+        self.entries = [
+            make_live_entry('111', 'First live', 1700000000),
+            make_live_entry('222', 'Second live', 1700100000),
+        ]
+        self.zip_path = os.path.join(self.inbox, 'facebook-export.zip')
+        make_export_zip(self.zip_path, self.entries, {
+            'video_111.mp4': b'a' * 100,
+            'video_222.mp4': b'b' * 200,
+        })
+
+    def test_find_metadata_member_uses_central_directory(self):
+        """find_metadata_member locates live_videos.json without extracting."""
+        with zipfile.ZipFile(self.zip_path) as zf:
+            member = run.find_metadata_member(zf)
+            with zf.open(member) as raw:
+                entries = [entry for _, entry in run.iter_json_array(raw)]
+        self.assertTrue(member.filename.endswith('/live_videos.json'))
+        self.assertEqual(entries, self.entries)
+
+    def test_find_video_members_maps_basenames(self):
+        """find_video_members maps video filenames to zip members."""
+        with zipfile.ZipFile(self.zip_path) as zf:
+            members = run.find_video_members(zf)
+        self.assertEqual(sorted(members), ['video_111.mp4', 'video_222.mp4'])
+        self.assertEqual(members['video_222.mp4'].file_size, 200)
+
+    def test_select_largest_uses_member_sizes(self):
+        """Duplicate selection can use central-directory sizes instead of disk."""
+        entries = [
+            make_live_entry('1', 'Same', 1700000000),
+            make_live_entry('2', 'Same', 1700000000),
+        ]
+        sizes = {'video_1.mp4': 10, 'video_2.mp4': 20}
+        selected = run.select_largest_video_per_signature(entries, member_sizes=sizes)
+        self.assertEqual([v['fbid'] for v in selected.values()], ['2'])
+
+    @patch('builtins.print')
+    def test_dry_run_never_extracts(self, mock_print):
+        """Dry-run reads metadata from the zip and never opens video members."""
+        with patch('zipfile.ZipFile.extractall') as mock_extractall, \
+             patch('run.open_media_source') as mock_open_media:
+            run.process_inbox(dry_run=True)
+        mock_extractall.assert_not_called()
+        mock_open_media.assert_not_called()
+        printed = ' '.join(str(c.args[0]) for c in mock_print.call_args_list if c.args)
+        self.assertIn('[WOULD UPLOAD]', printed)
+        self.assertIn('First live', printed)
+
+    @patch('builtins.print')
+    def test_upload_streams_from_zip_member(self, mock_print):
+        """A real run streams only the scheduled member, without a temp copy."""
+        uploaded = []
+
+        def fake_upload(youtube, media, title, session=None):
+            uploaded.append(media.read())
+            return True
+
+        with patch('run.authenticate_youtube', return_value=Mock()), \
+             patch('run.upload_single_video', side_effect=fake_upload), \
+             patch('zipfile.ZipFile.extract') as mock_extract:
+            run.process_inbox(limit=1)
+        mock_extract.assert_not_called()
+        self.assertEqual(uploaded, [b'a' * 100])
+        with closing(run.open_registry(self.registry_path)) as registry:
+            self.assertEqual(registry.uploaded_fbids(), ['111'])
+
+
+    def test_zip_scan_is_cached_in_index(self):
+        """A fresh index entry is reused without reopening the zip."""
+        first = run.get_zip_scan(self.zip_path)
+        with patch('run.scan_zip_metadata') as mock_scan:
+            second = run.get_zip_scan(self.zip_path)
+        mock_scan.assert_not_called()
+        self.assertEqual(first, second)
+        self.assertEqual([r['fbid'] for r in second['entries']], ['111', '222'])
+        self.assertEqual(second['entries'][1]['member_size'], 200)
+        self.assertTrue(second['entries'][0]['signature'][1].endswith('firstlive'))
+
+    def test_zip_scan_rebuilt_when_zip_changes(self):
+        """Changing a zip's size or mtime invalidates its index entry."""
+        run.get_zip_scan(self.zip_path)
+        make_export_zip(self.zip_path, self.entries[:1], {'video_111.mp4': b'a' * 100})
+        os.utime(self.zip_path, ns=(1, 1))
+        scan = run.get_zip_scan(self.zip_path)
+        self.assertEqual([r['fbid'] for r in scan['entries']], ['111'])
+
+    @patch('builtins.print')
+    def test_dry_run_reuses_index(self, mock_print):
+        """Repeated runs read the index instead of reparsing the zip."""
+        run.process_inbox(dry_run=True)
+        with patch('run.scan_zip_metadata') as mock_scan, \
+             patch('run.load_zip_index', wraps=run.load_zip_index) as mock_lookup, \
+             patch('zipfile.ZipFile', wraps=zipfile.ZipFile) as mock_zip:
+            run.process_inbox(dry_run=True)
+            title_map = run.build_title_to_fbid_map()
+        mock_scan.assert_not_called()
+        mock_zip.assert_not_called()
+        self.assertEqual(mock_lookup.call_count, 2)
+        self.assertEqual(sorted(title_map.values()), ['111', '222'])
+
+
+    def test_parallel_title_map_matches_serial(self):
+        """A process-pool scan merges partial maps like the serial scan, later zips winning."""
+        later_zip = os.path.join(self.inbox, 'zz-later-export.zip')
+        make_export_zip(later_zip, [make_live_entry('333', 'First live', 1700000000)],
+                        {'video_333.mp4': b'c'})
+        parallel = run.build_title_to_fbid_map(jobs=2)
+        os.remove(run.INBOX_INDEX_PATH)
+        serial = run.build_title_to_fbid_map(jobs=1)
+        self.assertEqual(parallel, serial)
+        self.assertEqual(sorted(parallel.values()), ['222', '333'])
+
+    def test_scan_zips_reports_corrupted_zip(self):
+        """Corrupted zips come back as exceptions instead of aborting the scan."""
+        bad_zip = os.path.join(self.inbox, 'broken.zip')
+        with open(bad_zip, 'wb') as f:
+            f.write(b'not a zip')
+        scans = run.scan_zips_with_index([bad_zip, self.zip_path], jobs=2)
+        self.assertIsInstance(scans[bad_zip], zipfile.BadZipFile)
+        self.assertEqual(len(scans[self.zip_path]['entries']), 2)
+
+
+class TestConcurrentUploads(InboxTestCase):
+    """Tests for the upload worker pool in process_inbox."""
+
+    patches = (('config.max_videos_per_run', 6),)
+
+    def setUp(self):
+        super().setUp()
+        entries = [make_live_entry(str(100 + i), f'Live {i}', 1700000000 + i * 86400) for i in range(8)]
+        make_export_zip(os.path.join(self.inbox, 'export.zip'), entries,
+                        {f'video_{100 + i}.mp4': b'x' * (i + 1) for i in range(8)})
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def _fake_upload(self, fail_titles=()):
+        def upload(youtube, media, title, session=None):
+            with self.lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            time.sleep(0.02)
+            with self.lock:
+                self.active -= 1
+            return title not in fail_titles
+        return upload
+
+    def _uploaded(self):
+        with closing(run.open_registry(self.registry_path)) as registry:
+            return registry.uploaded_fbids(), registry.processed_zips()
+
+    @patch('builtins.print')
+    def test_workers_run_concurrently_within_limit(self, mock_print):
+        """Uploads overlap across workers but never exceed --limit."""
+        with patch('run.authenticate_youtube_credentials', return_value=Mock()), \
+             patch('run.build_youtube_client', return_value=Mock()), \
+             patch('run.upload_single_video', side_effect=self._fake_upload()):
+            run.process_inbox(limit=5, workers=3)
+        fbids, processed = self._uploaded()
+        self.assertEqual(len(fbids), 5)
+        self.assertGreater(self.max_active, 1)
+        self.assertLessEqual(self.max_active, 3)
+        self.assertEqual(processed, [])
+
+    @patch('builtins.print')
+    def test_failed_upload_frees_its_slot(self, mock_print):
+        """A failed upload does not count toward the limit."""
+        fake = self._fake_upload(fail_titles={run.get_zip_scan(
+            os.path.join(self.inbox, 'export.zip'))['entries'][0]['title']})
+        with patch('run.authenticate_youtube_credentials', return_value=Mock()), \
+             patch('run.build_youtube_client', return_value=Mock()), \
+             patch('run.upload_single_video', side_effect=fake):
+            run.process_inbox(limit=4, workers=4)
+        fbids, _ = self._uploaded()
+        self.assertEqual(len(fbids), 4)
+        self.assertNotIn('100', fbids)
+
+    @patch('builtins.print')
+    def test_daily_cap_counts_in_flight_uploads(self, mock_print):
+        """The daily cap stays exact with several uploads in flight."""
+        with closing(run.open_registry(self.registry_path)) as registry:
+            run.record_upload(registry, 'earlier')
+            run.record_upload(registry, 'earlier2')
+        with patch('run.authenticate_youtube_credentials', return_value=Mock()), \
+             patch('run.build_youtube_client', return_value=Mock()), \
+             patch('run.upload_single_video', side_effect=self._fake_upload()):
+            run.process_inbox(workers=4)
+        fbids, _ = self._uploaded()
+        self.assertEqual(len(fbids), 6)
+
+
+    @patch('builtins.print')
+    def test_next_video_is_prepared_during_upload(self, mock_print):
+        """The preparation stage opens the next member while one is uploading."""
+        opened = []
+        prepared_during_upload = []
+        real_open = run.open_media_source
+
+        def tracking_open(zip_path, zf, member):
+            opened.append(member.filename)
+            return real_open(zip_path, zf, member)
+
+        def upload(youtube, media, title, session=None):
+            time.sleep(0.05)
+            prepared_during_upload.append(len(opened))
+            return True
+
+        with patch('run.authenticate_youtube', return_value=Mock()), \
+             patch('run.open_media_source', side_effect=tracking_open), \
+             patch('run.upload_single_video', side_effect=upload):
+            run.process_inbox(limit=2, workers=1)
+        # While the first video uploaded, at least the second was already opened
+        self.assertGreaterEqual(prepared_during_upload[0], 2)
+
+    @patch('builtins.print')
+    def test_prepared_media_closed_when_limit_reached(self, mock_print):
+        """Videos prepared ahead but never uploaded are closed."""
+        sources = []
+        second_prepared = threading.Event()
+
+        def fake_open(zip_path, zf, member):
+            media = Mock()
+            sources.append(media)
+            if len(sources) >= 2:
+                second_prepared.set()
+            return media
+
+        def upload(youtube, media, title, session=None):
+            # Hold the only upload until the producer has prepared ahead
+            self.assertTrue(second_prepared.wait(5))
+            return True
+
+        with patch('run.authenticate_youtube', return_value=Mock()), \
+             patch('run.open_media_source', side_effect=fake_open), \
+             patch('run.upload_single_video', side_effect=upload):
+            run.process_inbox(limit=1, workers=1, verbose=True)
+        self.assertGreater(len(sources), 1)
+        for media in sources:
+            media.close.assert_called_once()
+        printed = ' '.join(str(c.args[0]) for c in mock_print.call_args_list if c.args)
+        self.assertIn('queue depth', printed)
+
+
+class TestAdaptiveChunkSize(unittest.TestCase):
+    """Tests for throughput-driven resumable chunk sizing."""
+
+    MiB = 1024 * 1024
+
+    def _sizer(self, initial=8 * 1024 * 1024):
+        return run.AdaptiveChunkSizer(initial=initial, min_size=self.MiB, max_size=64 * self.MiB,
+                                      target_seconds=4)
+
+    def test_sizes_are_256k_multiples_within_bounds(self):
+        """Chunk sizes are aligned and clamped to the configured bounds."""
+        sizer = self._sizer(initial=5 * self.MiB + 12345)
+        self.assertEqual(sizer.size % run.UPLOAD_CHUNK_ALIGNMENT, 0)
+        for _ in range(10):
+            sizer.record_chunk(sizer.size, 0.01)
+            self.assertEqual(sizer.size % run.UPLOAD_CHUNK_ALIGNMENT, 0)
+        self.assertEqual(sizer.size, 64 * self.MiB)
+        for _ in range(10):
+            sizer.record_error()
+        self.assertEqual(sizer.size, self.MiB)
+
+    def test_grows_only_on_stable_fast_link(self):
+        """A single fast chunk does not grow the size; two in a row do, at most 2x."""
+        sizer = self._sizer()
+        sizer.record_chunk(8 * self.MiB, 0.5)
+        self.assertEqual(sizer.size, 8 * self.MiB)
+        sizer.record_chunk(8 * self.MiB, 0.5)
+        self.assertEqual(sizer.size, 16 * self.MiB)
+
+    def test_shrinks_on_slow_link_and_errors(self):
+        """Slow chunks and retryable errors reduce the chunk size."""
+        sizer = self._sizer()
+        sizer.record_chunk(8 * self.MiB, 16)  # 0.5 MiB/s -> 2 MiB per 4s
+        self.assertEqual(sizer.size, 2 * self.MiB)
+        sizer.record_error()
+        self.assertEqual(sizer.size, self.MiB)
+
+    @patch('builtins.print')
+    @patch('run.time.sleep')
+    def test_perform_resumable_upload_adapts_media_chunksize(self, mock_sleep, mock_print):
+        """perform_resumable_upload sets the media chunk size before each chunk."""
+        media = Mock()
+        media._chunksize = 8 * self.MiB
+        media.size.return_value = 40 * self.MiB
+        request = Mock()
+        request.resumable = media
+        request.resumable_progress = 0
+        seen_sizes = []
+
+        def next_chunk():
+            seen_sizes.append(media._chunksize)
+            if len(seen_sizes) == 3:
+                raise TimeoutError("flaky")
+            if len(seen_sizes) == 5:
+                return None, {'id': 'vid'}
+            request.resumable_progress += media._chunksize
+            status = Mock()
+            status.resumable_progress = request.resumable_progress
+            status.progress.return_value = request.resumable_progress / (40 * self.MiB)
+            return status, None
+
+        request.next_chunk.side_effect = next_chunk
+        sizer = self._sizer()
+        with patch('run.time.monotonic', side_effect=[0, 0.1, 1, 1.1, 2, 2.1, 3, 3.1, 4, 4.1]):
+            result = run.perform_resumable_upload(request, 'Title', chunk_sizer=sizer)
+        self.assertEqual(result, {'id': 'vid'})
+        self.assertEqual(seen_sizes[0], 8 * self.MiB)
+        self.assertEqual(seen_sizes[2], 2 * seen_sizes[1])
+        self.assertEqual(seen_sizes[3], seen_sizes[2] // 2)
+
+
+class RecordingHttp:
+    """Minimal httplib2.Http stand-in that replays canned responses."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        self.requests.append((method, uri, dict(headers or {})))
+        headers, content = self.responses.pop(0)
+        return httplib2.Response(headers), content
+
+
+class TestResumableSessions(unittest.TestCase):
+    """Tests for resuming interrupted uploads across runs."""
+
+    SIZE = 600 * 1024
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.registry_path = os.path.join(self.tmpdir.name, 'registry.json')
+        patcher = patch('run.config.upload_chunk_adaptive', 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _request(self, http):
+        media = googleapiclient.http.MediaIoBaseUpload(
+            io.BytesIO(b'v' * self.SIZE), mimetype='video/mp4', chunksize=256 * 1024, resumable=True
+        )
+        return googleapiclient.http.HttpRequest(
+            http, lambda resp, content: json.loads(content), 'https://upload.example/videos',
+            method='POST', body='{}', headers={'content-type': 'application/json'}, resumable=media
+        )
+
+    def test_sessions_persist_and_clear_on_upload(self):
+        """Both backends keep a session across reopen and drop it once uploaded."""
+        for backend in ('sqlite', 'json'):
+            with closing(run.open_registry(self.registry_path, backend=backend)) as registry:
+                registry.save_upload_session('111', 'https://upload/s1', 262144, self.SIZE)
+                registry.compact()
+            with closing(run.open_registry(self.registry_path, backend=backend)) as registry:
+                self.assertEqual(registry.get_upload_session('111'),
+                                 {'session_uri': 'https://upload/s1', 'size': self.SIZE, 'offset': 262144})
+                registry.record_upload('111', '2026-01-01')
+                self.assertIsNone(registry.get_upload_session('111'))
+
+    @patch('builtins.print')
+    def test_interrupted_upload_resumes_from_confirmed_offset(self, mock_print):
+        """A new run queries the saved session and continues from its offset."""
+        with closing(run.open_registry(self.registry_path)) as registry:
+            first = RecordingHttp([
+                ({'status': '200', 'location': 'https://upload/s1'}, b''),
+                ({'status': '308', 'range': 'bytes=0-262143'}, b''),
+                ({'status': '400'}, b'connection dropped'),
+            ])
+            with self.assertRaises(googleapiclient.errors.HttpError):
+                run.perform_resumable_upload(self._request(first), 'Title',
+                                             session=run.UploadSession(registry, '111', self.SIZE))
+            self.assertEqual(registry.get_upload_session('111')['offset'], 262144)
+
+        with closing(run.open_registry(self.registry_path)) as registry:
+            second = RecordingHttp([
+                ({'status': '308', 'range': 'bytes=0-262143'}, b''),
+                ({'status': '308', 'range': 'bytes=0-524287'}, b''),
+                ({'status': '200'}, b'{"id": "vid"}'),
+            ])
+            result = run.perform_resumable_upload(self._request(second), 'Title',
+                                                  session=run.UploadSession(registry, '111', self.SIZE))
+        self.assertEqual(result, {'id': 'vid'})
+        self.assertEqual([method for method, _, _ in second.requests], ['PUT', 'PUT', 'PUT'])
+        self.assertTrue(all(uri == 'https://upload/s1' for _, uri, _ in second.requests))
+        self.assertEqual(second.requests[0][2]['Content-Range'], f'bytes */{self.SIZE}')
+        self.assertEqual(second.requests[1][2]['Content-Range'], f'bytes 262144-524287/{self.SIZE}')
+
+    @patch('builtins.print')
+    def test_expired_session_restarts_upload(self, mock_print):
+        """A session YouTube no longer knows is discarded and a new one started."""
+        with closing(run.open_registry(self.registry_path)) as registry:
+            registry.save_upload_session('111', 'https://upload/old', 262144, self.SIZE)
+            http = RecordingHttp([
+                ({'status': '404'}, b'not found'),
+                ({'status': '200', 'location': 'https://upload/new'}, b''),
+                ({'status': '308', 'range': 'bytes=0-262143'}, b''),
+                ({'status': '308', 'range': 'bytes=0-524287'}, b''),
+                ({'status': '200'}, b'{"id": "vid"}'),
+            ])
+            result = run.perform_resumable_upload(self._request(http), 'Title',
+                                                  session=run.UploadSession(registry, '111', self.SIZE))
+            self.assertEqual(result, {'id': 'vid'})
+            self.assertEqual(http.requests[1][0], 'POST')
+            self.assertEqual(http.requests[2][2]['Content-Range'], f'bytes 0-262143/{self.SIZE}')
+            self.assertEqual(registry.get_upload_session('111')['session_uri'], 'https://upload/new')
+
+    def test_session_for_changed_source_is_discarded(self):
+        """A saved session for a different file size is not resumed."""
+        with closing(run.open_registry(self.registry_path)) as registry:
+            registry.save_upload_session('111', 'https://upload/s1', 262144, self.SIZE + 1)
+            request = self._request(RecordingHttp([]))
+            self.assertEqual(run.UploadSession(registry, '111', self.SIZE).resume(request), 0)
+            self.assertIsNone(request.resumable_uri)
+            self.assertIsNone(registry.get_upload_session('111'))
+
+
+class TestContentDedup(InboxTestCase):
+    """Tests for content-fingerprint deduplication across exports."""
+
+    patches = (('config.content_hash_chunk_size', 64),)
+
+    def setUp(self):
+        super().setUp()
+        self.zip_path = os.path.join(self.inbox, 'export.zip')
+        make_export_zip(self.zip_path, [
+            make_live_entry('111', 'Original title', 1700000000),
+            make_live_entry('222', 'Other live', 1700100000),
+        ], {'video_111.mp4': b'same recording' * 20, 'video_222.mp4': b'x' * 280})
+
+    def _record(self, zip_path, fbid):
+        return next(r for r in run.get_zip_scan(zip_path)['entries'] if r['fbid'] == fbid)
+
+    def test_hash_matches_for_stored_and_deflated_members(self):
+        """Stored (mmap) and deflated (streamed) members hash to the same digest."""
+        data = bytes(range(256)) * 5
+        expected = hashlib.sha256(data).hexdigest()
+        for compression in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+            zip_path = os.path.join(self.tmpdir.name, f'member-{compression}.zip')
+            with zipfile.ZipFile(zip_path, 'w', compression=compression) as zf:
+                zf.writestr('video.mp4', data)
+            with zipfile.ZipFile(zip_path) as zf:
+                self.assertEqual(run.hash_zip_member(zip_path, zf, zf.getinfo('video.mp4')), expected)
+
+    def test_fingerprint_is_cached_in_index(self):
+        """A video is hashed once; later lookups come from the hash cache."""
+        record = self._record(self.zip_path, '111')
+        first = run.get_content_fingerprint(self.zip_path, record)
+        with patch('run.hash_zip_member') as mock_hash:
+            second = run.get_content_fingerprint(self.zip_path, record)
+        mock_hash.assert_not_called()
+        self.assertEqual(first, second)
+        self.assertEqual(first[:2], (record['member_size'], record['member_crc']))
+
+    @patch('builtins.print')
+    def test_reexported_recording_is_skipped(self, mock_print):
+        """Same content under a new fbid and title is skipped; size/CRC misses are never hashed."""
+        for backend in ('sqlite', 'json'):
+            with closing(run.open_registry(self.registry_path, backend=backend)) as registry:
+                fingerprint = run.get_content_fingerprint(self.zip_path, self._record(self.zip_path, '111'))
+                registry.record_upload('111', '2026-01-01', fingerprint=fingerprint)
+                registry.mark_zip_processed('export.zip')
+                registry.compact()
+        reexport = os.path.join(self.inbox, 'reexport.zip')
+        make_export_zip(reexport, [
+            make_live_entry('999', 'Renamed title', 1700500000),
+            make_live_entry('333', 'New live', 1700600000),
+        ], {'video_999.mp4': b'same recording' * 20, 'video_333.mp4': b'new recording' * 20})
+
+        with patch('run.hash_zip_member', wraps=run.hash_zip_member) as mock_hash:
+            run.process_inbox(dry_run=True, verbose=True)
+        printed = ' '.join(str(c.args[0]) for c in mock_print.call_args_list if c.args)
+        self.assertIn('Skipping 999: same video content as 111', printed)
+        self.assertNotIn('Renamed title', printed)
+        self.assertIn('[WOULD UPLOAD] ', printed)
+        self.assertEqual(mock_hash.call_count, 1)  # only the size/CRC match is hashed
+
+        with closing(run.open_registry(self.registry_path, backend='json')) as registry:
+            self.assertEqual(registry.find_uploaded_content(*fingerprint[:2]), [('111', fingerprint[2])])
+
+    @patch('builtins.print')
+    def test_successful_upload_records_fingerprint(self, mock_print):
+        """Uploads store their fingerprint so later exports can be matched."""
+        with patch('run.authenticate_youtube_credentials', return_value=Mock()), \
+             patch('run.build_youtube_client', return_value=Mock()), \
+             patch('run.upload_single_video', return_value=True):
+            run.process_inbox(limit=1)
+        record = self._record(self.zip_path, '111')
+        with closing(run.open_registry(self.registry_path)) as registry:
+            matches = registry.find_uploaded_content(record['member_size'], record['member_crc'])
+        self.assertEqual([fbid for fbid, _ in matches], ['111'])
+
+    @patch('builtins.print')
+    def test_registered_uploads_are_backfilled(self, mock_print):
+        """Fbids uploaded before fingerprints existed get size and CRC32; only a collision is hashed."""
+        full_export = os.path.join(self.inbox, 'full.zip')
+        make_export_zip(full_export, [
+            make_live_entry('999', 'Renamed title', 1699000000),
+            make_live_entry('111', 'Original title', 1700000000),
+            make_live_entry('222', 'Other live', 1700100000),
+        ], {'video_999.mp4': b'same recording' * 20, 'video_111.mp4': b'same recording' * 20,
+            'video_222.mp4': b'x' * 280})
+        for backend in ('sqlite', 'json'):
+            with self.subTest(backend=backend):
+                for path in glob.glob(os.path.join(self.tmpdir.name, '*.*')):
+                    os.remove(path)
+                with closing(run.open_registry(self.registry_path, backend=backend)) as registry:
+                    registry.record_upload('111', '2026-01-01')
+                    registry.record_upload('222', '2026-01-01')
+                    registry.mark_zip_processed('export.zip')
+                with patch('run.config.registry_backend', backend), \
+                     patch('run.authenticate_youtube_credentials', return_value=Mock()), \
+                     patch('run.build_youtube_client', return_value=Mock()), \
+                     patch('run.upload_single_video', return_value=True) as mock_upload, \
+                     patch('run.hash_zip_member', wraps=run.hash_zip_member) as mock_hash:
+                    run.process_inbox(force=True)
+                mock_upload.assert_not_called()
+                hashed = sorted(call.args[2].filename.split('/')[-1] for call in mock_hash.call_args_list)
+                self.assertEqual(hashed, ['video_111.mp4', 'video_999.mp4'])
+                with closing(run.open_registry(self.registry_path, backend=backend)) as registry:
+                    self.assertFalse(registry.has_fbid('999'))
+                    same = self._record(full_export, '111')
+                    self.assertEqual(
+                        registry.find_uploaded_content(same['member_size'], same['member_crc']),
+                        [('111', hashlib.sha256(b'same recording' * 20).hexdigest())]
+                    )
+                    other = self._record(full_export, '222')
+                    self.assertEqual(registry.find_uploaded_content(other['member_size'], other['member_crc']),
+                                     [('222', None)])
+
+
+class TestZipMemberMedia(unittest.TestCase):
+    """Tests for zip-member media sources used by resumable uploads."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.content = bytes(range(256)) * 40
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _zip(self, compression):
+        zip_path = os.path.join(self.tmpdir.name, 'export.zip')
+        make_export_zip(zip_path, [], {'video_1.mp4': self.content}, compression=compression)
+        return zip_path
+
+    def test_stored_member_reader_is_seekable(self):
+        """ZipMemberReader serves the member's bytes and supports seeking."""
+        zip_path = self._zip(zipfile.ZIP_STORED)
+        with zipfile.ZipFile(zip_path) as zf:
+            member = zf.getinfo('your_facebook_activity/live_videos/video_1.mp4')
+            with closing(run.open_media_source(zip_path, zf, member)) as media:
+                self.assertIsInstance(media, run.ZipMemberReader)
+                self.assertEqual(media.seek(0, os.SEEK_END), len(self.content))
+                media.seek(100)
+                self.assertEqual(media.read(50), self.content[100:150])
+                media.seek(0)
+                self.assertEqual(media.read(), self.content)
+                self.assertEqual(media.read(10), b'')
+
+    def test_deflated_member_falls_back_to_spool(self):
+        """Compressed members are decompressed into a bounded spooled buffer."""
+        zip_path = self._zip(zipfile.ZIP_DEFLATED)
+        with zipfile.ZipFile(zip_path) as zf:
+            member = zf.getinfo('your_facebook_activity/live_videos/video_1.mp4')
+            with patch('run.config.zip_spool_max_bytes', 1024):
+                with closing(run.open_media_source(zip_path, zf, member)) as media:
+                    self.assertNotIsInstance(media, run.ZipMemberReader)
+                    self.assertEqual(media.read(), self.content)
+
+    @patch('run.googleapiclient.http.MediaIoBaseUpload')
+    def test_make_upload_request_streams_file_objects(self, mock_io_upload):
+        """make_upload_request wraps open media sources in MediaIoBaseUpload."""
+        mock_youtube = Mock()
+        zip_path = self._zip(zipfile.ZIP_STORED)
+        with zipfile.ZipFile(zip_path) as zf:
+            member = zf.getinfo('your_facebook_activity/live_videos/video_1.mp4')
+            with closing(run.open_media_source(zip_path, zf, member)) as media:
+                run.make_upload_request(mock_youtube, media, 'Title')
+        mock_io_upload.assert_called_once_with(
+            media, mimetype='video/mp4', chunksize=8 * 1024 * 1024, resumable=True)
+
+    @patch('run.googleapiclient.http.MediaIoBaseUpload')
+    def test_make_upload_request_accepts_rolled_over_spool(self, mock_io_upload):
+        """A spool that rolled over to disk (int fd name) still gets a mimetype."""
+        zip_path = self._zip(zipfile.ZIP_DEFLATED)
+        with zipfile.ZipFile(zip_path) as zf:
+            member = zf.getinfo('your_facebook_activity/live_videos/video_1.mp4')
+            with patch('run.config.zip_spool_max_bytes', 1024):
+                with closing(run.open_media_source(zip_path, zf, member)) as media:
+                    self.assertIsInstance(media.name, int)
+                    run.make_upload_request(Mock(), media, 'Title')
+        self.assertEqual(mock_io_upload.call_args.kwargs['mimetype'], 'video/mp4')
+
+
+class FakeYouTube:
+    """YouTube client stand-in serving the uploads playlist in pages."""
+
+    def __init__(self, videos, page_size=2):
+        # videos: [(video_id, title, published_at)], newest first
+        self.pages = [videos[i:i + page_size] for i in range(0, len(videos), page_size)] or [[]]
+        self.page_requests = []
+
+    def channels(self):
+        channels = Mock()
+        channels.list.return_value.execute.return_value = {
+            'items': [{'contentDetails': {'relatedPlaylists': {'uploads': 'UU123'}}}]
+        }
+        return channels
+
+    def playlistItems(self):
+        items = Mock()
+        items.list.side_effect = self._list
+        return items
+
+    def _list(self, playlistId, part, maxResults, pageToken=None):
+        index = int(pageToken or 0)
+        self.page_requests.append(index)
+        response = {'items': [
+            {'snippet': {'resourceId': {'videoId': video_id}, 'title': title, 'publishedAt': published_at}}
+            for video_id, title, published_at in self.pages[index]
+        ]}
+        if index + 1 < len(self.pages):
+            response['nextPageToken'] = str(index + 1)
+        request = Mock()
+        request.execute.return_value = response
+        return request
+
+
+class TestIncrementalAudit(InboxTestCase):
+    """Tests for the audit cursor that stops at already-reconciled uploads."""
+
+    def setUp(self):
+        super().setUp()
+        entries = [make_live_entry(str(n), f'Live {n}', 1700000000 + n * 86400) for n in range(1, 7)]
+        make_export_zip(os.path.join(self.inbox, 'export.zip'), entries, {})
+        # Channel listing is newest first
+        self.videos = [
+            (f'yt{n}', run.extract_video_title(entries[n - 1]), f'2023-11-{14 + n:02d}T00:00:00Z')
+            for n in range(6, 0, -1)
+        ]
+
+    def _audit(self, youtube, **kwargs):
+        with patch('run.authenticate_youtube', return_value=youtube), patch('builtins.print'):
+            run.audit_registry(**kwargs)
+
+    def test_second_audit_stops_at_known_videos(self):
+        """Only pages above the cursor are fetched once the channel was audited."""
+        self._audit(FakeYouTube(self.videos[2:]))
+        with closing(run.open_registry(self.registry_path)) as registry:
+            self.assertEqual(sorted(registry.uploaded_fbids()), ['1', '2', '3', '4'])
+            video_ids, newest = registry.audit_cursor()
+        self.assertEqual(video_ids, {'yt1', 'yt2', 'yt3', 'yt4'})
+        self.assertEqual(newest, '2023-11-18T00:00:00Z')
+
+        youtube = FakeYouTube(self.videos)
+        self._audit(youtube)
+        self.assertEqual(youtube.page_requests, [0, 1])
+        with closing(run.open_registry(self.registry_path)) as registry:
+            self.assertEqual(sorted(registry.uploaded_fbids()), ['1', '2', '3', '4', '5', '6'])
+
+    def test_full_audit_ignores_cursor(self):
+        """--full lists every page again."""
+        self._audit(FakeYouTube(self.videos))
+        youtube = FakeYouTube(self.videos)
+        self._audit(youtube, full=True)
+        self.assertEqual(youtube.page_requests, [0, 1, 2])
+
+    def test_dry_run_does_not_move_cursor(self):
+        """A dry-run audit leaves the cursor untouched."""
+        self._audit(FakeYouTube(self.videos), dry_run=True)
+        with closing(run.open_registry(self.registry_path)) as registry:
+            self.assertEqual(registry.audit_cursor(), (set(), None))
+
+    def test_json_backend_persists_cursor(self):
+        """The journaled JSON registry keeps the cursor across compaction."""
+        registry = run.JournaledJsonRegistry(self.registry_path)
+        registry.record_audited_videos([('yt1', '2023-11-15T00:00:00Z'), ('yt2', '2023-11-16T00:00:00Z')])
+        registry.compact()
+        registry.close()
+        reopened = run.JournaledJsonRegistry(self.registry_path)
+        self.assertEqual(reopened.audit_cursor(), ({'yt1', 'yt2'}, '2023-11-16T00:00:00Z'))
+
+
+class TestPooledTransport(unittest.TestCase):
+    """Tests for the thread-safe pooled HTTP transport."""
+
+    class SlowHttp:
+        """httplib2.Http stand-in that records which threads used it."""
+
+        def __init__(self, timeout=None):
+            self.timeout = timeout
+            self.follow_redirects = True
+            self.users = set()
+            self.closed = False
+
+        def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+            self.users.add(threading.get_ident())
+            time.sleep(0.02)
+            return httplib2.Response({'status': 200}), b'{}'
+
+        def close(self):
+            self.closed = True
+
+    def test_concurrent_requests_use_separate_connections(self):
+        """Each in-flight request gets its own Http; idle ones are reused."""
+        created = []
+
+        def make_http(timeout=None):
+            created.append(self.SlowHttp(timeout))
+            return created[-1]
+
+        pool = run.PooledHttp(size=3)
+        with patch('httplib2.Http', side_effect=make_http):
+            threads = [threading.Thread(target=pool.request, args=('https://example.test/',)) for _ in range(6)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            pool.request('https://example.test/')
+        self.assertLessEqual(len(created), 3)
+        self.assertGreater(len(created), 1)
+        self.assertTrue(all(not http.follow_redirects and http.timeout == 300 for http in created))
+        pool.close()
+        self.assertTrue(all(http.closed for http in created))
+
+    def test_shared_credentials_refresh_once(self):
+        """Threads that all see an expired token trigger a single refresh."""
+        credentials = Mock()
+        credentials.valid = False
+        refreshes = []
+
+        def refresh(request):
+            time.sleep(0.05)
+            refreshes.append(request)
+            credentials.valid = True
+
+        credentials.refresh.side_effect = refresh
+        shared = run.SharedCredentials(credentials)
+        threads = [
+            threading.Thread(target=shared.before_request, args=(Mock(), 'GET', 'https://example.test/', {}))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(refreshes), 1)
+        self.assertEqual(credentials.before_request.call_count, 5)
+
+    def test_workers_share_one_pooled_client(self):
+        """The upload client factory builds one client sized for the workers."""
+        with patch('run.authenticate_youtube_credentials', return_value=Mock()), \
+             patch('run.build_youtube_client', return_value=Mock()) as mock_build:
+            youtube_for_worker = run.make_youtube_client_factory(workers=6)
+        self.assertIs(youtube_for_worker(), youtube_for_worker())
+        self.assertEqual(mock_build.call_args.kwargs['pool_size'], 7)
+
+
+class TestFastStartup(unittest.TestCase):
+    """Import-time regression tests: importing run.py stays cheap."""
+
+    HEAVY_MODULES = ('googleapiclient', 'google_auth_oauthlib', 'google.auth', 'httplib2', 'colorama', 'dotenv')
+
+    def _python(self, *args):
+        env = {k: v for k, v in os.environ.items() if k not in ('SCOPES', 'TOKEN_FILE', 'FACEBOOK_DATA_DIR')}
+        return subprocess.run(
+            [sys.executable, *args], capture_output=True, text=True, env=env, timeout=60,
+            cwd=os.path.dirname(os.path.abspath(run.__file__)),
+        )
+
+    def test_import_skips_google_stack(self):
+        """python -X importtime shows no Google client, colorama or dotenv imports."""
+        result = self._python('-X', 'importtime', '-c',
+                              'import socket; orig = socket.getaddrinfo; import run; '
+                              'assert socket.getaddrinfo is orig')
+        self.assertEqual(result.returncode, 0, result.stderr[-500:])
+        imported = {}
+        for line in result.stderr.splitlines():
+            if line.startswith('import time:') and not line.endswith('| imported package'):
+                _, cumulative, name = line.split('|')
+                imported[name.strip()] = int(cumulative)
+        heavy = [name for name in imported if name.startswith(self.HEAVY_MODULES)]
+        self.assertEqual(heavy, [])
+        # Cumulative microseconds for run itself; generous bound for slow CI boxes
+        self.assertLess(imported['run'], 500000)
+
+    def test_help_runs_without_credentials_settings(self):
+        """--help works with OAuth settings missing from the environment."""
+        result = self._python('run.py', '--help')
+        self.assertEqual(result.returncode, 0, result.stderr[-500:])
+        self.assertIn('--dry-run', result.stdout)
+
+    def test_config_reads_settings_on_first_use(self):
+        """Settings parse on access; missing required ones fail only when read."""
+        config = run.Config({'MAX_VIDEOS_PER_RUN': '3', 'UPLOAD_CHUNK_ADAPTIVE': '0'})
+        self.assertEqual(config.max_videos_per_run, 3)
+        self.assertFalse(config.upload_chunk_adaptive)
+        self.assertEqual(config.video_file_extensions, ['.mp4'])
+        with self.assertRaises(RuntimeError):
+            config.scopes
+
+
+class TestTitleIndex(unittest.TestCase):
+    """Tests for matching YouTube titles to fbids through the inverted index."""
+
+    def setUp(self):
+        self.index = run.TitleIndex({
+            '[2023-11-15] Observación de la Luna llena desde el observatorio de Arecibo': '111',
+            '[2023-11-16] Charla: Cometas y asteroides cercanos a la Tierra': '222',
+            '[2023-11-17] En VIVO - Sociedad de Astronomía del Caribe': '333',
+            '[2023-11-18] En VIVO - Sociedad de Astronomía del Caribe': '444',
+        })
+
+    def test_exact_and_normalized_titles(self):
+        """Exact titles and re-encoded/re-spaced ones resolve with their reason."""
+        exact = self.index.match('[2023-11-16] Charla: Cometas y asteroides cercanos a la Tierra')
+        self.assertEqual((exact.fbid, exact.reason), ('222', 'exact title'))
+        normalized = self.index.match('[2023-11-16]  CHARLA - Cometas y asteroides cercanos a la tierra!')
+        self.assertEqual((normalized.fbid, normalized.reason), ('222', 'normalized title'))
+
+    def test_trimmed_title_matches_prefix(self):
+        """A title cut at YouTube's 100 characters matches the local title it starts."""
+        stem = '[2023-11-20] Observación de la Luna llena desde el observatorio de Arecibo, telescopio Zeiss'
+        # Cut inside "Parte 12": the shown "Parte 1" may only continue as 12, not 3
+        index = run.TitleIndex({stem + ' Parte 12 (en vivo)': '555', stem + ' Parte 3 (en vivo)': '666'})
+        trimmed = (stem + ' Parte 12 (en vivo)')[:run.YOUTUBE_TITLE_MAX_LENGTH]
+        self.assertTrue(trimmed.endswith('Parte 1'))
+        result = index.match(trimmed)
+        self.assertEqual(result.fbid, '555')
+        self.assertIn('trimmed', result.reason)
+
+    def test_short_title_is_not_a_prefix_match(self):
+        """A title under YouTube's limit was not trimmed, so it never matches a longer one."""
+        index = run.TitleIndex({'[2023-05-01] Observacion de la Luna parte 2': '222'})
+        result = index.match('[2023-05-01] Observacion de la Luna')
+        self.assertIsNone(result.fbid)
+        self.assertNotIn('trimmed', result.reason)
+
+    def test_similar_title_uses_date_candidates(self):
+        """A lightly edited title matches by n-gram similarity within its date."""
+        result = self.index.match('[2023-11-16] Charla sobre cometas y asteroides cercanos a la Tierra')
+        self.assertEqual(result.fbid, '222')
+        self.assertEqual(result.reason, 'similar title')
+
+    def test_similar_title_requires_same_date_and_numbers(self):
+        """Other parts and other dates of a series never match by similarity."""
+        index = run.TitleIndex({'[2023-01-05] Noche de observación astronómica - Parte 1': '111'})
+        other_part = index.match('[2023-01-05] Noche de observación astronómica - Parte 2')
+        self.assertIsNone(other_part.fbid)
+        self.assertIn('same date and numbers', other_part.reason)
+        self.assertIsNone(index.match('[2023-01-06] Noche de observación astronómica - Parte 1').fbid)
+        self.assertEqual(index.match('[2023-01-05] Noche de observación astronómica, Parte 1 (en vivo)').fbid, '111')
+
+    def test_unmatched_and_ambiguous_titles_explain_why(self):
+        """Misses and ties carry a reason instead of an fbid."""
+        miss = self.index.match('Totally different upload')
+        self.assertIsNone(miss.fbid)
+        self.assertTrue(miss.reason)
+        tie = self.index.match('En VIVO - Sociedad de Astronomía del Caribe')
+        self.assertIsNone(tie.fbid)
+        self.assertIn('ambiguous', tie.reason)
+        self.assertIn('333', tie.reason)
+
+    def test_large_index_matches_quickly(self):
+        """100k titles index and match without pairwise comparison."""
+        base = datetime.date(2000, 1, 1)
+        titles = {
+            f'[{base + datetime.timedelta(days=n // 3)}] Live number {n} topic {n % 97}': str(n)
+            for n in range(100000)
+        }
+        index = run.TitleIndex(titles)
+        started = time.monotonic()
+        for n in range(0, 100000, 1000):
+            day = base + datetime.timedelta(days=n // 3)
+            self.assertEqual(index.match(f'[{day}] Live number {n} topic {n % 97}').fbid, str(n))
+            self.assertEqual(index.match(f'[{day}] live NUMBER {n}, topic {n % 97}').fbid, str(n))
+        self.assertLess(time.monotonic() - started, 2)
+
+
+class TestUploadsPagination(unittest.TestCase):
+    """Tests for streaming, prefetching pagination of the uploads playlist."""
+
+    def _videos(self, count):
+        return [(f'yt{n}', f'Video {n}', f'2024-01-01T00:00:{n % 60:02d}Z') for n in range(count)]
+
+    def test_lists_past_old_cap(self):
+        """Listings are no longer truncated at 500 videos."""
+        youtube = FakeYouTube(self._videos(620), page_size=50)
+        videos = list(run.list_youtube_uploads(youtube))
+        self.assertEqual(len(videos), 620)
+        self.assertEqual(videos[-1]['video_id'], 'yt619')
+        self.assertEqual(len(list(run.list_youtube_uploads(FakeYouTube(self._videos(620)), max_results=7))), 7)
+
+    def test_next_page_fetched_while_consuming(self):
+        """The following page is requested before the caller finishes the current one."""
+        youtube = FakeYouTube(self._videos(6), page_size=2)
+        listing = run.list_youtube_uploads(youtube)
+        next(listing)
+        deadline = time.monotonic() + 2
+        while len(youtube.page_requests) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(youtube.page_requests[:2], [0, 1])
+        listing.close()
+
+    @patch('run.time.sleep')
+    def test_transient_page_errors_are_retried(self, mock_sleep):
+        """A 503 on one page is retried instead of ending the listing."""
+        youtube = FakeYouTube(self._videos(4), page_size=2)
+        real_list = youtube._list
+        failures = [googleapiclient.errors.HttpError(httplib2.Response({'status': 503}), b'busy')]
+
+        def flaky_list(**kwargs):
+            request = real_list(**kwargs)
+            if kwargs.get('pageToken') == '1' and failures:
+                request.execute.side_effect = [failures.pop(), request.execute.return_value]
+            return request
+
+        youtube._list = flaky_list
+        with patch('builtins.print'):
+            videos = list(run.list_youtube_uploads(youtube, prefetch=False))
+        self.assertEqual(len(videos), 4)
+        mock_sleep.assert_called_once()
+
+    @patch('run.time.sleep')
+    def test_persistent_errors_are_raised(self, mock_sleep):
+        """Errors that outlast the retries surface instead of truncating."""
+        youtube = FakeYouTube(self._videos(4), page_size=2)
+        real_list = youtube._list
+
+        def failing_list(**kwargs):
+            request = real_list(**kwargs)
+            if kwargs.get('pageToken') == '1':
+                request.execute.side_effect = TimeoutError('timed out')
+            return request
+
+        youtube._list = failing_list
+        with patch('builtins.print'), self.assertRaises(TimeoutError):
+            list(run.list_youtube_uploads(youtube, max_retries=2))
+        self.assertEqual(mock_sleep.call_count, 2)
+
+
+class TestDiscoveryCache(unittest.TestCase):
+    """Tests for the on-disk discovery document cache."""
+
+    DOCUMENT = json.dumps({"rootUrl": "https://youtube.googleapis.com/", "resources": {}})
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = temp_dir.name
+        patches = [
+            patch('run.DISCOVERY_CACHE_DIR', self.temp_dir),
+            patch.dict(run._discovery_documents, clear=True),
+            patch('builtins.print'),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.http = Mock()
+        self.http.request.return_value = (Mock(status=200), self.DOCUMENT.encode('utf-8'))
+
+    def test_cache_miss_fetches_and_writes_versioned_file(self):
+        document = run.get_discovery_document('v3', self.http, mode='cache')
+
+        self.assertEqual(document, self.DOCUMENT)
+        self.assertTrue(run.discovery_cache_path('v3').endswith('youtube.v3.json'))
+        with open(run.discovery_cache_path('v3'), encoding='utf-8') as f:
+            self.assertEqual(f.read(), self.DOCUMENT)
+
+    def test_fresh_cache_needs_no_network(self):
+        run.write_file_atomic(run.discovery_cache_path('v3'), self.DOCUMENT)
+
+        document = run.get_discovery_document('v3', self.http, mode='cache')
+
+        self.assertEqual(document, self.DOCUMENT)
+        self.http.request.assert_not_called()
+
+    def test_expired_cache_is_refetched(self):
+        cache_path = run.discovery_cache_path('v3')
+        run.write_file_atomic(cache_path, '{"rootUrl": "old"}')
+        stale = time.time() - 48 * 3600
+        os.utime(cache_path, (stale, stale))
+
+        with patch('run.config.discovery_cache_ttl_hours', 24, create=True):
+            document = run.get_discovery_document('v3', self.http, mode='cache')
+
+        self.assertEqual(document, self.DOCUMENT)
+        self.http.request.assert_called_once()
+
+    def test_failed_refresh_keeps_stale_copy(self):
+        cache_path = run.discovery_cache_path('v3')
+        run.write_file_atomic(cache_path, '{"rootUrl": "old"}')
+        stale = time.time() - 48 * 3600
+        os.utime(cache_path, (stale, stale))
+        self.http.request.side_effect = OSError("offline")
+
+        with patch('run.config.discovery_cache_ttl_hours', 24, create=True):
+            document = run.get_discovery_document('v3', self.http, mode='cache')
+
+        self.assertEqual(document, '{"rootUrl": "old"}')
+
+    def test_failed_fetch_without_cache_uses_bundled_document(self):
+        self.http.request.return_value = (Mock(status=503), b'')
+
+        document = run.get_discovery_document('v3', self.http, mode='cache')
+
+        self.assertIn('rootUrl', json.loads(document))
+        self.assertFalse(os.path.exists(run.discovery_cache_path('v3')))
+
+    def test_document_is_memoized_in_process(self):
+        run.get_discovery_document('v3', self.http, mode='cache')
+        os.remove(run.discovery_cache_path('v3'))
+
+        run.get_discovery_document('v3', self.http, mode='cache')
+
+        self.http.request.assert_called_once()
+
+    def test_static_mode_builds_client_offline(self):
+        with patch('run.config.discovery_mode', 'static', create=True):
+            youtube = run.build_youtube_client(Mock(token='t', expired=False))
+
+        self.assertTrue(hasattr(youtube, 'videos'))
+        self.assertFalse(os.listdir(self.temp_dir))
+
+    def test_live_mode_returns_none(self):
+        self.assertIsNone(run.get_discovery_document('v3', self.http, mode='live'))
+
+    def test_unknown_mode_raises(self):
+        with self.assertRaises(ValueError):
+            run.get_discovery_document('v3', self.http, mode='bogus')
+
+
+class TestCredentialRefresh(unittest.TestCase):
+    """Tests for background token refresh and atomic token persistence."""
+
+    class FakeCredentials:
+        """Picklable credentials whose refresh extends the expiry by an hour."""
+
+        def __init__(self, expires_in):
+            self.refresh_token = 'refresh'
+            self.expiry = self.utcnow() + datetime.timedelta(seconds=expires_in)
+            self.refreshes = 0
+
+        @staticmethod
+        def utcnow():
+            return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+        @property
+        def valid(self):
+            return self.expiry > self.utcnow()
+
+        def refresh(self, request):
+            self.refreshes += 1
+            self.expiry = self.utcnow() + datetime.timedelta(hours=1)
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.token_file = os.path.join(temp_dir.name, 'token.json')
+
+    def wait_for(self, condition, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return condition()
+
+    def test_save_credentials_round_trip_is_atomic(self):
+        credentials = self.FakeCredentials(expires_in=600)
+        with open(self.token_file, 'wb') as f:
+            f.write(b'old token')
+
+        with patch('run.os.replace', side_effect=OSError("disk full")), self.assertRaises(OSError):
+            run.save_credentials(credentials, self.token_file)
+        with open(self.token_file, 'rb') as f:
+            self.assertEqual(f.read(), b'old token')
+        self.assertEqual(os.listdir(os.path.dirname(self.token_file)), ['token.json'])
+
+        run.save_credentials(run.SharedCredentials(credentials), self.token_file)
+        loaded = run.load_credentials(self.token_file)
+        self.assertEqual(loaded.expiry, credentials.expiry)
+
+    def test_background_refresh_before_expiry_persists_token(self):
+        credentials = self.FakeCredentials(expires_in=60)
+        shared = run.SharedCredentials(credentials, token_file=self.token_file)
+
+        with patch('run.CREDENTIAL_REFRESH_POLL_SECONDS', 0.01):
+            self.assertTrue(shared.start_auto_refresh(margin=120))
+            self.addCleanup(shared.stop_auto_refresh)
+            self.assertTrue(self.wait_for(lambda: credentials.refreshes == 1))
+
+        # Refreshed before the old token expired, and the new one is on disk
+        self.assertTrue(self.wait_for(lambda: os.path.exists(self.token_file)))
+        self.assertGreater(run.load_credentials(self.token_file).expiry, credentials.utcnow())
+        shared.stop_auto_refresh()
+        self.assertEqual(credentials.refreshes, 1)
+
+    def test_main_stops_background_refresh_on_exit(self):
+        shared = run.SharedCredentials(self.FakeCredentials(expires_in=3600))
+
+        def command(**kwargs):
+            self.assertTrue(shared.start_auto_refresh(margin=300))
+            raise KeyboardInterrupt
+
+        with patch('sys.argv', ['run.py', '--watch']), patch('run.watch_inbox', side_effect=command), \
+             patch('builtins.print'):
+            run.main()
+        self.assertIsNone(shared.refresh_thread)
+        self.assertNotIn(shared, run._auto_refreshing)
+
+    def test_no_background_refresh_far_from_expiry(self):
+        credentials = self.FakeCredentials(expires_in=3600)
+        shared = run.SharedCredentials(credentials)
+
+        with patch('run.CREDENTIAL_REFRESH_POLL_SECONDS', 0.01):
+            shared.start_auto_refresh(margin=300)
+            time.sleep(0.1)
+            shared.stop_auto_refresh()
+
+        self.assertEqual(credentials.refreshes, 0)
+
+    def test_auto_refresh_needs_refresh_token_and_expiry(self):
+        credentials = self.FakeCredentials(expires_in=60)
+        credentials.refresh_token = None
+        self.assertFalse(run.SharedCredentials(credentials).start_auto_refresh(margin=120))
+        self.assertFalse(run.SharedCredentials(Mock()).start_auto_refresh(margin=120))
+
+    def test_failed_background_refresh_is_retried(self):
+        credentials = self.FakeCredentials(expires_in=60)
+        original_refresh = credentials.refresh
+        attempts = []
+
+        def flaky_refresh(request):
+            attempts.append(request)
+            if len(attempts) == 1:
+                raise OSError("network down")
+            original_refresh(request)
+
+        credentials.refresh = flaky_refresh
+        shared = run.SharedCredentials(credentials)
+
+        with patch('run.CREDENTIAL_REFRESH_POLL_SECONDS', 0.01), \
+             patch('run.CREDENTIAL_REFRESH_RETRY_SECONDS', 0.01), \
+             patch('builtins.print'):
+            shared.start_auto_refresh(margin=120)
+            self.addCleanup(shared.stop_auto_refresh)
+            self.assertTrue(self.wait_for(lambda: credentials.refreshes == 1))
+        self.assertEqual(len(attempts), 2)
+
+
+class TestBandwidthShaping(unittest.TestCase):
+    """Tests for the scheduled upload bandwidth limiter."""
+
+    class FakeClock:
+        """Monotonic clock whose sleep() just advances it."""
+
+        def __init__(self):
+            self.now = 0.0
+            self.slept = []
+
+        def clock(self):
+            return self.now
+
+        def sleep(self, seconds):
+            self.slept.append(seconds)
+            self.now += seconds
+
+    def limiter_at(self, hour, windows, default_mbits):
+        fake = self.FakeClock()
+        schedule = run.BandwidthSchedule(windows, default_mbits)
+        moment = datetime.datetime(2024, 1, 1, hour, 30)
+        limiter = run.BandwidthLimiter(schedule, clock=fake.clock, sleep=fake.sleep, now=lambda: moment)
+        return limiter, fake
+
+    def test_parse_schedule(self):
+        windows = run.parse_bandwidth_schedule('00:00-07:00=unlimited, 22:00-02:00=2.5,12:00-13:00=0')
+        self.assertEqual(windows, [(0, 420, None), (1320, 120, 2.5), (720, 780, None)])
+        self.assertEqual(run.parse_bandwidth_schedule(''), [])
+        for bad in ('00:00-07:00', '7-=5', '00:00-25:00=5', '00:00-07:00=fast'):
+            with self.assertRaises(ValueError):
+                run.parse_bandwidth_schedule(bad)
+
+    def test_schedule_windows_and_default(self):
+        schedule = run.BandwidthSchedule(run.parse_bandwidth_schedule('00:00-07:00=unlimited,22:00-02:00=20'), 5)
+        self.assertIsNone(schedule.mbits_at(datetime.time(3, 0)))
+        self.assertEqual(schedule.mbits_at(datetime.time(12, 0)), 5)
+        self.assertEqual(schedule.mbits_at(datetime.time(23, 15)), 20)
+        self.assertEqual(schedule.bytes_per_second_at(datetime.time(7, 0)), 625000)
+        self.assertTrue(schedule.limited)
+        self.assertFalse(run.BandwidthSchedule(run.parse_bandwidth_schedule('00:00-07:00=0'), 0).limited)
+
+    def test_limited_window_holds_rate(self):
+        limiter, fake = self.limiter_at(12, [(0, 420, None)], 8)  # 1 MB/s
+        for _ in range(10):
+            limiter.consume(500000)
+        self.assertAlmostEqual(fake.now, 5.0)
+
+    def test_unlimited_window_never_sleeps(self):
+        limiter, fake = self.limiter_at(3, [(0, 420, None)], 8)
+        for _ in range(10):
+            limiter.consume(500000)
+        self.assertEqual(fake.slept, [])
+
+    def test_limit_is_shared_across_threads(self):
+        schedule = run.BandwidthSchedule([], 16)  # 2 MB/s
+        limiter = run.BandwidthLimiter(schedule)
+        payload = io.BytesIO(b'x' * (20 * 8192))
+
+        def upload():
+            stream = run.ThrottledStream(io.BytesIO(payload.getvalue()), limiter)
+            while stream.read(8192):
+                pass
+
+        started = time.monotonic()
+        threads = [threading.Thread(target=upload) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # 4 x 160 KiB at 2 MB/s takes ~0.33s; each thread alone would take ~0.08s
+        self.assertGreater(time.monotonic() - started, 0.3)
+
+    def test_make_upload_request_throttles_media_reads(self):
+        limiter = Mock()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'video.mp4')
+            with open(path, 'wb') as f:
+                f.write(b'v' * 1000)
+            with patch('run._upload_bandwidth_limiter', limiter), open(path, 'rb') as media:
+                for source in (path, media):
+                    youtube = Mock()
+                    run.make_upload_request(youtube, source, 'Title')
+                    media_body = youtube.videos().insert.call_args.kwargs['media_body']
+                    self.assertIsInstance(media_body.stream(), run.ThrottledStream)
+                    self.assertEqual(media_body.getbytes(0, 400), b'v' * 400)
+                    media_body.stream().close()
+        self.assertEqual(limiter.consume.call_count, 2)
+        limiter.consume.assert_called_with(400)
+
+    def test_limited_window_caps_chunk_size(self):
+        """Chunks hold about one second at the limit, so no chunk bursts for longer."""
+        chunk_sizes = []
+        for hour, expected in ((12, 3 * run.UPLOAD_CHUNK_ALIGNMENT), (3, 8 * 1024 * 1024)):
+            limiter, _ = self.limiter_at(hour, [(0, 420, None)], 8)  # 1 MB/s outside 00:00-07:00
+            request = Mock()
+            request.resumable = Mock(_chunksize=8 * 1024 * 1024)
+            request.resumable.size.return_value = 1000
+            request.next_chunk.side_effect = lambda: (chunk_sizes.append(request.resumable._chunksize)
+                                                       or (None, {'id': 'vid'}))
+            with patch('run._upload_bandwidth_limiter', limiter), \
+                 patch('run.config.upload_chunk_adaptive', False, create=True):
+                run.perform_resumable_upload(request, 'Title')
+            self.assertEqual(chunk_sizes[-1], expected)
+
+    def test_no_limiter_when_unconfigured(self):
+        with patch('run._upload_bandwidth_limiter', None), \
+             patch('run.config.upload_bandwidth_limit', 0, create=True), \
+             patch('run.config.upload_bandwidth_schedule', [], create=True):
+            self.assertIsNone(run.get_upload_bandwidth_limiter())
+
+
+class TestWatchMode(InboxTestCase):
+    """Tests for the --watch inbox daemon."""
+
+    def setUp(self):
+        super().setUp()
+        self.now = 0.0
+        self.watcher = run.InboxWatcher(self.inbox, settle_seconds=5, retry_seconds=60, clock=lambda: self.now)
+
+    def export(self, name, fbid):
+        path = os.path.join(self.inbox, name)
+        make_export_zip(path, [make_live_entry(fbid, f'Live {fbid}', 1700000000)], {f'video_{fbid}.mp4': fbid.encode() * 10})
+        return path
+
+    def test_zip_ready_only_after_size_is_stable(self):
+        path = self.export('a.zip', '1')
+        self.assertEqual(self.watcher.poll(set()), [])
+        self.now = 3
+        with open(path, 'ab') as f:
+            f.write(b'more')  # Still being copied
+        self.assertEqual(self.watcher.poll(set()), [])
+        self.now = 7
+        self.assertEqual(self.watcher.poll(set()), [])
+        self.now = 8
+        self.assertEqual(self.watcher.poll(set()), ['a.zip'])
+
+    def test_old_zips_are_ready_immediately(self):
+        path = self.export('old.zip', '1')
+        os.utime(path, (time.time() - 60, time.time() - 60))
+        self.assertEqual(self.watcher.poll(set()), ['old.zip'])
+        self.assertEqual(self.watcher.poll({'old.zip'}), [])
+
+    def test_handled_zip_waits_for_retry_or_change(self):
+        path = self.export('a.zip', '1')
+        os.utime(path, (time.time() - 60, time.time() - 60))
+        self.watcher.mark_handled(self.watcher.poll(set()))
+        self.now = 30
+        self.assertEqual(self.watcher.poll(set()), [])
+        self.now = 61
+        self.assertEqual(self.watcher.poll(set()), ['a.zip'])
+
+    def test_incomplete_zip_is_reported_once(self):
+        path = os.path.join(self.inbox, 'partial.zip')
+        with open(path, 'wb') as f:
+            f.write(b'PK\x03\x04 truncated')
+        os.utime(path, (time.time() - 60, time.time() - 60))
+        with patch('builtins.print') as mock_print:
+            self.assertEqual(self.watcher.poll(set()), [])
+            self.assertEqual(self.watcher.poll(set()), [])
+        self.assertEqual(mock_print.call_count, 1)
+
+    @patch('builtins.print')
+    def test_watch_reuses_client_across_exports(self, mock_print):
+        uploaded = []
+
+        def fake_upload(youtube, media, title, session=None):
+            uploaded.append(title)
+            return True
+
+        def wait_for(count):
+            deadline = time.monotonic() + 5
+            while len(uploaded) < count and time.monotonic() < deadline:
+                time.sleep(0.01)
+            return len(uploaded)
+
+        stop = threading.Event()
+        with patch('run.config.watch_poll_seconds', 0.01, create=True), \
+             patch('run.config.watch_settle_seconds', 0, create=True), \
+             patch('run.make_youtube_client_factory', return_value=lambda: Mock()) as mock_factory, \
+             patch('run.upload_single_video', side_effect=fake_upload):
+            self.export('first.zip', '1')
+            watcher = threading.Thread(target=run.watch_inbox, kwargs={'stop': stop, 'force': True})
+            watcher.start()
+            try:
+                self.assertEqual(wait_for(1), 1)
+                self.export('second.zip', '2')
+                self.assertEqual(wait_for(2), 2)
+            finally:
+                stop.set()
+                watcher.join()
+        mock_factory.assert_called_once()
+        with closing(run.open_registry(self.registry_path)) as registry:
+            self.assertEqual(sorted(registry.processed_zips()), ['first.zip', 'second.zip'])
+
+    def test_watch_rejects_audit(self):
+        with patch('sys.argv', ['run.py', '--watch', '--audit']), \
+             patch('sys.stderr', io.StringIO()), self.assertRaises(SystemExit):
+            run.main()
+
+
+class TestRunMetrics(unittest.TestCase):
+    """Tests for per-phase run metrics and their JSON-lines/Prometheus output."""
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.metrics_dir = os.path.join(tmpdir.name, 'metrics')
+        self.inbox = os.path.join(tmpdir.name, 'inbox')
+        os.makedirs(self.inbox)
+        for target, value in (
+            ('run.config.metrics_dir', self.metrics_dir),
+            ('run.INBOX_PATH', self.inbox),
+            ('run.REGISTRY_PATH', os.path.join(tmpdir.name, 'registry.sqlite3')),
+            ('run.INBOX_INDEX_PATH', os.path.join(tmpdir.name, 'inbox_index.sqlite3')),
+        ):
+            patcher = patch(target, value, create=True)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_log(self):
+        with open(os.path.join(self.metrics_dir, 'run_log.jsonl'), encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_phases_counters_and_prometheus_text(self):
+        now = [0.0]
+        metrics = run.RunMetrics('upload', clock=lambda: now[0])
+        # Two workers: A runs 1-3 s, B runs 0-6 s, so uploads span 6 s of wall time
+        now[0] = 3.0
+        metrics.observe('upload', 2.0, title='A', bytes=4000000)
+        now[0] = 6.0
+        metrics.observe('upload', 6.0, title='B', bytes=8000000)
+        metrics.observe('upload_chunk', 0.5, log=False)
+        metrics.count('uploaded_bytes', 12000000)
+
+        summary = metrics.summary()
+        self.assertEqual(summary['phases']['upload'], {'count': 2, 'seconds': 8.0, 'max_seconds': 6.0})
+        self.assertEqual(summary['upload_wall_seconds'], 6.0)
+        self.assertEqual(summary['upload_mb_per_s'], 2.0)
+        self.assertEqual([e['phase'] for e in metrics.events], ['upload', 'upload'])
+
+        text = metrics.prometheus_text()
+        self.assertIn('fb_yt_archive_phase_seconds_sum{kind="upload",phase="upload"} 8.0', text)
+        self.assertIn('fb_yt_archive_uploaded_bytes{kind="upload"} 12000000', text)
+        self.assertIn('# TYPE fb_yt_archive_upload_mb_per_s gauge', text)
+
+    def test_disabled_metrics_record_nothing(self):
+        metrics = run.RunMetrics('idle', enabled=False)
+        with metrics.timer('zip_scan'):
+            pass
+        metrics.count('upload_retries')
+        self.assertEqual((metrics.events, metrics.phases, metrics.counters), ([], {}, {}))
+
+    def test_collect_run_metrics_writes_log_and_textfile(self):
+        with run.collect_run_metrics('audit') as metrics:
+            self.assertIs(run.current_metrics(), metrics)
+            request = Mock()
+            request.execute.side_effect = [TimeoutError('slow'), {'items': []}]
+            with patch('run.time.sleep'), patch('builtins.print'):
+                run.execute_with_retries(request, description='uploads page')
+        self.assertFalse(run.current_metrics().enabled)
+
+        events = self.run_log()
+        self.assertEqual(events[0]['phase'], 'api_call')
+        self.assertEqual(events[0]['retries'], 1)
+        self.assertEqual(events[-1]['phase'], 'run')
+        self.assertEqual(events[-1]['counters'], {'api_retries': 1})
+        self.assertEqual({e['run_id'] for e in events}, {metrics.run_id})
+        with open(os.path.join(self.metrics_dir, 'fb_yt_archive_audit.prom'), encoding='utf-8') as f:
+            self.assertIn('fb_yt_archive_api_retries{kind="audit"} 1', f.read())
+
+    def test_empty_metrics_dir_disables_output(self):
+        with patch('run.config.metrics_dir', '', create=True):
+            with run.collect_run_metrics('upload') as metrics:
+                run.current_metrics().observe('zip_scan', 1.0)
+        self.assertFalse(metrics.enabled)
+        self.assertFalse(os.path.exists(self.metrics_dir))
+
+    def test_resumable_upload_records_bytes_and_retries(self):
+        request = Mock()
+        request.resumable.size.return_value = 5000000
+        request.resumable._chunksize = None
+        request.next_chunk.side_effect = [TimeoutError('flaky'), (None, {'id': 'vid'})]
+        with run.collect_run_metrics('upload'), patch('run.time.sleep'), patch('builtins.print'):
+            run.perform_resumable_upload(request, 'Title')
+
+        upload = next(e for e in self.run_log() if e['phase'] == 'upload')
+        self.assertEqual((upload['title'], upload['bytes'], upload['retries'], upload['chunks']), ('Title', 5000000, 1, 1))
+        summary = self.run_log()[-1]
+        self.assertEqual(summary['counters'], {'upload_retries': 1, 'uploaded_bytes': 5000000})
+        self.assertEqual(summary['phases']['upload_chunk']['count'], 1)
+
+    @patch('builtins.print')
+    def test_process_inbox_records_zip_scan(self, mock_print):
+        make_export_zip(os.path.join(self.inbox, 'export.zip'),
+                        [make_live_entry('111', 'First live', 1700000000)], {'video_111.mp4': b'a' * 10})
+        run.process_inbox(dry_run=True)
+
+        scan = next(e for e in self.run_log() if e['phase'] == 'zip_scan')
+        self.assertEqual((scan['zip'], scan['videos']), ('export.zip', 1))
+        self.assertTrue(os.path.exists(os.path.join(self.metrics_dir, 'fb_yt_archive_upload.prom')))
+
+
+class TestProfiling(unittest.TestCase):
+    """Tests for --profile output."""
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.tmpdir = tmpdir.name
+        self.profile_dir = os.path.join(tmpdir.name, 'profiles')
+        inbox = os.path.join(tmpdir.name, 'inbox')
+        os.makedirs(inbox)
+        for target, value in (
+            ('run.config.profile_dir', self.profile_dir),
+            ('run.config.metrics_dir', ''),
+            ('run.INBOX_PATH', inbox),
+            ('run.REGISTRY_PATH', os.path.join(tmpdir.name, 'registry.sqlite3')),
+            ('run.INBOX_INDEX_PATH', os.path.join(tmpdir.name, 'inbox_index.sqlite3')),
+        ):
+            patcher = patch(target, value, create=True)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.entries = [make_live_entry(str(n), f'Live {n}', 1700000000 + n * 86400) for n in range(1, 4)]
+        make_export_zip(os.path.join(inbox, 'export.zip'), self.entries,
+                        {f'video_{n}.mp4': str(n).encode() * 10 for n in range(1, 4)})
+
+    def profile_files(self, suffix):
+        return sorted(os.path.join(self.profile_dir, name) for name in os.listdir(self.profile_dir)
+                      if name.endswith(suffix))
+
+    def test_collapsed_stacks_split_time_along_call_edges(self):
+        a, b, c = ('run.py', 1, 'a'), ('run.py', 2, 'b'), ('~', 0, "<built-in method x;y>")
+        stats = {
+            # func: (primitive calls, calls, self seconds, cumulative seconds, callers)
+            a: (1, 1, 1.0, 10.0, {}),
+            b: (2, 2, 6.0, 6.0, {a: (2, 2, 6.0, 6.0)}),
+            c: (4, 4, 3.0, 3.0, {a: (1, 1, 1.0, 1.0), b: (3, 3, 2.0, 2.0)}),
+        }
+        lines = run.collapsed_stacks(stats).splitlines()
+        self.assertEqual(lines, [
+            'run.py:a 1000000',
+            'run.py:a;<built-in method x,y> 1000000',
+            'run.py:a;run.py:b 6000000',
+            'run.py:a;run.py:b;<built-in method x,y> 2000000',
+        ])
+
+    def test_collapsed_stacks_cut_recursion(self):
+        f = ('run.py', 1, 'walk')
+        stats = {f: (1, 5, 5.0, 5.0, {f: (4, 4, 4.0, 4.0)})}
+        self.assertEqual(run.collapsed_stacks(stats), '')  # No root outside the cycle
+
+    def test_profiled_dry_run_writes_pstats_and_stacks(self):
+        import pstats
+
+        with patch('sys.argv', ['run.py', '--dry-run', '--profile', '--profile-top', '5']), \
+             patch('builtins.print') as mock_print:
+            run.main()
+
+        stats = pstats.Stats(self.profile_files('.pstats')[0])
+        self.assertTrue(any(name == '_process_inbox' for _, _, name in stats.stats))
+        with open(self.profile_files('.collapsed')[0], encoding='utf-8') as f:
+            self.assertIn('run.py:process_inbox;run.py:_process_inbox', f.read())
+        printed = [str(c.args[0]) for c in mock_print.call_args_list if c.args]
+        self.assertTrue(any('top 5 by cumulative time' in line for line in printed))
+        self.assertTrue(any('[WOULD UPLOAD]' in line for line in printed))
+
+    def test_profiled_audit_against_fake_youtube(self):
+        videos = [(f'yt{n}', run.extract_video_title(self.entries[n - 1]), f'2023-11-1{n}T00:00:00Z')
+                  for n in range(3, 0, -1)]
+        with patch('sys.argv', ['run.py', '--audit', '--dry-run', '--profile']), \
+             patch('run.authenticate_youtube', return_value=FakeYouTube(videos)), \
+             patch('builtins.print'):
+            run.main()
+        self.assertEqual(len(self.profile_files('.pstats')), 1)
+        self.assertTrue(os.path.basename(self.profile_files('.pstats')[0]).startswith('audit-'))
+
+
+class TestBenchmarks(unittest.TestCase):
+    """Smoke tests for the synthetic export generator and benchmark report."""
+
+    def setUp(self):
+        patcher = patch.dict(os.environ)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        import bench_run
+        self.bench_run = bench_run
+
+    def test_generated_entries_look_like_facebook_exports(self):
+        entries, filenames = self.bench_run.make_entries(300, duplicate_ratio=0.2, seed=1)
+        records = [run.parse_live_entry(entry) for entry in entries]
+        self.assertEqual([r.filename for r in records], filenames)
+        self.assertEqual(len({r.fbid for r in records}), 300)
+        # Titles are stored as mojibake and repaired by the script
+        raw_titles = [run.extract_label_value(entry, 'Title') for entry in entries]
+        self.assertTrue(any('Ã' in title for title in raw_titles if title))
+        self.assertFalse(any('Ã' in r.title for r in records))
+        self.assertGreater(len(records) - len({r.signature for r in records}), 20)
+
+    def test_report_covers_every_benchmark(self):
+        with tempfile.TemporaryDirectory() as workdir, patch('run.config.metrics_dir', '', create=True):
+            report = self.bench_run.run_benchmarks(
+                workdir, entries=40, videos=10, video_bytes=1024, zips=2, fbids=50, repeat=1
+            )
+        json.dumps(report)
+        self.assertEqual(sorted(report['results']), [
+            'build_title_to_fbid_map_cold', 'build_title_to_fbid_map_warm', 'parse_metadata',
+            'process_inbox_dry_run_cold', 'process_inbox_dry_run_warm',
+            'registry_load_json', 'registry_load_sqlite', 'registry_save_json', 'registry_save_sqlite',
+            'scan_inbox', 'select_largest_video_per_signature',
+        ])
+        self.assertEqual(report['results']['registry_load_sqlite']['items'], 50)
+        self.assertEqual(report['results']['scan_inbox']['items'], 2)
+        self.assertEqual(report['meta']['params']['entries'], 40)
+
+
 if __name__ == "__main__":
     unittest.main()
 